@@ -0,0 +1,125 @@
+# Micro-benchmark: dialog normalization with per-call timestamp parsing vs pre-parsed RadistMessage records.
+# Usage (from repo root): python scripts/bench_dialog_norm.py [--chats 300] [--messages 300]
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "server"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "synkro.settings")
+
+from core import connectors  # noqa: E402
+
+_parse_calls = 0
+_original_parse = connectors._parse_datetime
+
+
+def _counting_parse(value):
+    global _parse_calls
+    _parse_calls += 1
+    return _original_parse(value)
+
+
+def _legacy_fetch(batch, window_start, window_end):
+    # Pre-change _radist_fetch_messages_in_window: parse for the window check, then again in the sort key.
+    messages = []
+    for message in batch:
+        created_at = connectors._parse_datetime(message.get("created_at"))
+        if created_at and window_start <= created_at < window_end:
+            messages.append(message)
+    messages.sort(
+        key=lambda item: connectors._parse_datetime(item.get("created_at"))
+        or datetime.min.replace(tzinfo=dt_timezone.utc)
+    )
+    return messages
+
+
+def _legacy_format(messages):
+    # Pre-change _format_dialog_norm: parse in the sort key and again per line.
+    lines = []
+    sorted_messages = sorted(
+        messages,
+        key=lambda item: connectors._parse_datetime(item.get("created_at"))
+        or datetime.min.replace(tzinfo=dt_timezone.utc),
+    )
+    for message in sorted_messages:
+        created = connectors._parse_datetime(message.get("created_at"))
+        ts = created.astimezone(dt_timezone.utc).strftime("%Y-%m-%d %H:%M:%S") if created else "unknown-time"
+        direction = str(message.get("direction") or "").lower()
+        actor = "client" if direction == "inbound" else "agent"
+        text = connectors._extract_message_text(message)
+        files = connectors._extract_attachments(message)
+        line = f"{ts}  {actor}:"
+        if text:
+            line += f" {text}"
+        if files:
+            line += " [files: " + ", ".join(sorted(set(files))) + "]"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def _current_fetch(batch, window_start, window_end):
+    records = []
+    for message in batch:
+        created_at = connectors._parse_datetime(message.get("created_at"))
+        if created_at and window_start <= created_at < window_end:
+            records.append(connectors._message_record(message, created_at))
+    records.sort(key=connectors._message_sort_key)
+    return records
+
+
+def _make_chats(chats: int, messages: int):
+    rng = random.Random(42)
+    now = datetime(2026, 1, 15, 12, 0, tzinfo=dt_timezone.utc)
+    result = []
+    for chat_no in range(chats):
+        batch = []
+        for index in range(messages):
+            created = now - timedelta(seconds=rng.randint(0, 86_000))
+            message = {
+                "message_id": f"{chat_no}-{index}",
+                "created_at": created.isoformat().replace("+00:00", "Z"),
+                "direction": rng.choice(["inbound", "outbound"]),
+                "text": {"text": f"message {index}"},
+            }
+            if index % 17 == 0:
+                message["file"] = {"name": f"doc-{index}.pdf", "caption": ""}
+            batch.append(message)
+        result.append(batch)
+    return result, now - timedelta(days=1), now
+
+
+def _run(label, chats, window_start, window_end, fetch, fmt):
+    global _parse_calls
+    _parse_calls = 0
+    started = time.perf_counter()
+    outputs = [fmt(fetch(batch, window_start, window_end)) for batch in chats]
+    elapsed = time.perf_counter() - started
+    print(f"{label:8s} {elapsed * 1000:9.1f} ms  parse calls: {_parse_calls:>9,}")
+    return outputs, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chats", type=int, default=300)
+    parser.add_argument("--messages", type=int, default=300)
+    args = parser.parse_args()
+
+    connectors._parse_datetime = _counting_parse
+    chats, window_start, window_end = _make_chats(args.chats, args.messages)
+    print(f"{args.chats} chats x {args.messages} messages")
+    legacy, legacy_time = _run("legacy", chats, window_start, window_end, _legacy_fetch, _legacy_format)
+    current, current_time = _run(
+        "records", chats, window_start, window_end, _current_fetch, connectors._format_dialog_norm
+    )
+    if legacy != current:
+        raise SystemExit("dialog_norm output differs between legacy and record paths")
+    print(f"speedup: {legacy_time / current_time:.2f}x, identical output")
+
+
+if __name__ == "__main__":
+    main()
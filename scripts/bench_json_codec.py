@@ -0,0 +1,109 @@
+# Benchmark: core.jsoncodec with orjson vs the stdlib fallback on deal/dialog payloads.
+# Usage (from repo root): python scripts/bench_json_codec.py [--deals 500] [--messages 80] [--rounds 5]
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "server"))
+
+from core import jsoncodec  # noqa: E402
+
+PHRASES = [
+    "Здравствуйте! Подскажите, пожалуйста, стоимость доставки в Алматы",
+    "Добрый день, счет отправили на почту, проверьте",
+    "Можно оплатить картой при получении?",
+    "Спасибо, ждем подтверждения от менеджера 👍",
+    "Hello, is the order still available?",
+]
+
+
+def _make_deals(count: int, messages: int) -> list[dict]:
+    rng = random.Random(7)
+    now = datetime(2026, 1, 15, 12, 0, tzinfo=dt_timezone.utc)
+    deals = []
+    for deal_id in range(1, count + 1):
+        dialog = []
+        for index in range(messages):
+            created = now - timedelta(seconds=rng.randint(0, 86_000))
+            dialog.append(
+                {
+                    "message_id": f"{deal_id}-{index}",
+                    "chat_id": deal_id,
+                    "created_at": created.isoformat().replace("+00:00", "Z"),
+                    "direction": rng.choice(["inbound", "outbound"]),
+                    "status": "delivered",
+                    "text": {"text": rng.choice(PHRASES)},
+                }
+            )
+        deals.append(
+            {
+                "tenant_id": "demo",
+                "deal_id": 30_000_000 + deal_id,
+                "deal_name": f"Сделка #{deal_id}",
+                "status_id": 142,
+                "status": "Успешно реализовано",
+                "responsible": "manager@example.com",
+                "phone": f"7701{deal_id:07d}",
+                "chat_id": deal_id,
+                "first_message_at": dialog[0]["created_at"],
+                "last_message_at": dialog[-1]["created_at"],
+                "messages_count": len(dialog),
+                "deal_attrs_json": {"source": "amocrm", "pipeline_id": 7, "price": 125000, "updated_at": 1768478400},
+                "contact_attrs_json": {"contact_ids": [deal_id * 3], "phones": [f"7701{deal_id:07d}"]},
+                "dialog_raw": dialog,
+                "dialog_norm": "\n".join(f"{m['created_at']}  agent: {m['text']['text']}" for m in dialog),
+                "comment": "",
+            }
+        )
+    return deals
+
+
+def _time(func, rounds: int) -> tuple[float, object]:
+    best = float("inf")
+    result = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--deals", type=int, default=500)
+    parser.add_argument("--messages", type=int, default=80)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    fast_backend = jsoncodec.orjson
+    if fast_backend is None:
+        raise SystemExit("orjson is not installed (or JSON_BACKEND=stdlib); nothing to compare.")
+    deals = _make_deals(args.deals, args.messages)
+    secrets = {"access_token": "x" * 900, "refresh_token": "y" * 700, "api_key": "z" * 40}
+    body = jsoncodec.dumps_bytes(deals)
+
+    cases = [
+        ("upsert rows", lambda: [jsoncodec.dumps_bytes(row) for row in deals]),
+        ("deals read", lambda: jsoncodec.loads(body)),
+        ("secrets x1000", lambda: [jsoncodec.loads(jsoncodec.dumps_bytes(secrets)) for _ in range(1000)]),
+    ]
+    print(f"{args.deals} deals x {args.messages} messages, payload {len(body) / 1024 / 1024:.1f} MiB")
+    print(f"{'case':14s} {'stdlib ms':>10s} {'orjson ms':>10s} {'speedup':>8s}")
+    for label, func in cases:
+        jsoncodec.orjson = None
+        slow, slow_result = _time(func, args.rounds)
+        jsoncodec.orjson = fast_backend
+        fast, fast_result = _time(func, args.rounds)
+        if slow_result != fast_result:
+            raise SystemExit(f"{label}: backends produced different results")
+        print(f"{label:14s} {slow * 1000:10.1f} {fast * 1000:10.1f} {slow / fast:7.1f}x")
+    # Fingerprints use canonical_bytes (always stdlib), so they are not part of the comparison.
+    print("outputs identical across backends on this payload")
+
+
+if __name__ == "__main__":
+    main()
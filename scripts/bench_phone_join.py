@@ -0,0 +1,180 @@
+# Benchmark: amocrm_radist phone join in _merge_rows, string-compared dict + next() scan vs the indexed merge.
+# Usage (from repo root): python scripts/bench_phone_join.py [--deals 50000] [--dialogs 50000] [--messages 3] [--rounds 3]
+
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "server"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "synkro.settings")
+
+from core import connectors  # noqa: E402
+
+
+def _legacy_normalize_phone(value: str) -> str:
+    raw = str(value or "")
+    digits = "".join(ch for ch in raw if ch.isdigit())
+    if not digits:
+        return ""
+    if len(digits) == 10:
+        digits = "7" + digits
+    elif len(digits) == 11 and digits.startswith("8"):
+        digits = "7" + digits[1:]
+    elif len(digits) > 11:
+        digits = digits[-11:]
+    return digits
+
+
+def _legacy_merge(tenant_slug, amo_rows, radist_dialogs):
+    # Pre-change amocrm_radist branch: ISO string comparison, first phone wins, transcript per row.
+    dialog_by_phone = {}
+    for dialog in radist_dialogs:
+        phone = dialog.get("phone") or ""
+        if not phone:
+            continue
+        prev = dialog_by_phone.get(phone)
+        if not prev:
+            dialog_by_phone[phone] = dialog
+            continue
+        if (prev.get("last_message_at") or "") < (dialog.get("last_message_at") or ""):
+            dialog_by_phone[phone] = dialog
+    for row in amo_rows:
+        phones = row.get("_phones", [])
+        dialog = next((dialog_by_phone.get(phone) for phone in phones if dialog_by_phone.get(phone)), None)
+        if not dialog:
+            yield connectors._finalize_supabase_row(tenant_slug, row)
+            continue
+        yield connectors._finalize_supabase_row(
+            tenant_slug,
+            {
+                **row,
+                "phone": dialog.get("phone") or row.get("phone") or "",
+                "chat_id": dialog.get("chat_id"),
+                "first_message_at": dialog.get("first_message_at"),
+                "last_message_at": dialog.get("last_message_at"),
+                "messages_count": len(dialog.get("messages") or []),
+                "dialog_raw": [message.raw for message in dialog.get("messages") or []],
+                "dialog_norm": connectors._format_dialog_norm(dialog.get("messages") or []),
+            },
+        )
+
+
+def _make_data(deals: int, dialogs: int, messages: int):
+    rng = random.Random(11)
+    now = datetime(2026, 1, 15, 12, 0, tzinfo=dt_timezone.utc)
+    phones = [f"7701{index:07d}" for index in range(max(deals, dialogs))]
+    rows = []
+    for deal_id in range(1, deals + 1):
+        # Most deals have one phone; every third is a repeat customer sharing the previous deal's
+        # contact, every seventh has a second phone.
+        own = [phones[deal_id - 1] if deal_id % 3 else phones[deal_id - 2]]
+        if deal_id % 7 == 0:
+            own.append(phones[rng.randrange(len(phones))])
+        rows.append(
+            {
+                "deal_id": deal_id,
+                "deal_name": f"Deal {deal_id}",
+                "status_id": 142,
+                "status": "won",
+                "responsible": "1",
+                "phone": own[0],
+                "deal_attrs_json": {"source": "amocrm"},
+                "contact_attrs_json": {"contact_ids": [deal_id], "phones": own},
+                "_phones": own,
+            }
+        )
+    chats = []
+    for chat_id in range(1, dialogs + 1):
+        # A tenth of the phones get a second chat (e.g. WhatsApp and WABA).
+        phone = phones[chat_id - 1] if chat_id % 10 else phones[rng.randrange(len(phones))]
+        records = []
+        for index in range(messages):
+            created = now - timedelta(seconds=rng.randint(0, 86_000))
+            raw = {
+                "message_id": f"{chat_id}-{index}",
+                "created_at": created.isoformat().replace("+00:00", "Z"),
+                "direction": "inbound" if index % 2 else "outbound",
+                "text": {"text": f"message {index}"},
+            }
+            records.append(connectors._message_record(raw, created))
+        records.sort(key=connectors._message_sort_key)
+        chats.append(
+            {
+                "chat_id": chat_id,
+                "phone": phone,
+                "messages": records,
+                "first_message_at": connectors._dt_to_iso(records[0].created_at),
+                "last_message_at": connectors._dt_to_iso(records[-1].created_at),
+            }
+        )
+    return rows, chats
+
+
+def _best_of(func, rounds: int):
+    best = float("inf")
+    result = None
+    for _ in range(rounds):
+        result = None
+        gc.collect()
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--deals", type=int, default=50_000)
+    parser.add_argument("--dialogs", type=int, default=50_000)
+    parser.add_argument("--messages", type=int, default=3)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    rows, chats = _make_data(args.deals, args.dialogs, args.messages)
+    print(f"{args.deals} deals x {args.dialogs} dialogs, {args.messages} messages per dialog")
+
+    def run_legacy():
+        original_normalize = connectors._normalize_phone
+        connectors._normalize_phone = _legacy_normalize_phone
+        try:
+            return list(_legacy_merge("bench", rows, iter(chats)))
+        finally:
+            connectors._normalize_phone = original_normalize
+
+    def run_current():
+        return list(
+            connectors._merge_rows(
+                tenant_slug="bench", mode="amocrm_radist", amo_rows=rows, radist_dialogs=iter(chats)
+            )
+        )
+
+    # Join only (row finalization, i.e. fingerprinting, stubbed out), then end to end.
+    finalize = connectors._finalize_supabase_row
+    connectors._finalize_supabase_row = lambda tenant_slug, row: row
+    legacy_join, _ = _best_of(run_legacy, args.rounds)
+    current_join, _ = _best_of(run_current, args.rounds)
+    connectors._finalize_supabase_row = finalize
+    legacy_time, legacy = _best_of(run_legacy, args.rounds)
+    current_time, current = _best_of(run_current, args.rounds)
+
+    matched = sum(1 for row in current if row["chat_id"])
+    single_phone = [index for index, row in enumerate(rows) if len(row["_phones"]) == 1]
+    # The streaming join emits deals without a chat first: compare by deal id, not position.
+    current_by_deal = {row["deal_id"]: row for row in current}
+    differs = sum(
+        1 for index in single_phone if legacy[index]["chat_id"] != current_by_deal[rows[index]["deal_id"]]["chat_id"]
+    )
+    print(f"{'':8s} {'join ms':>10s} {'total ms':>10s}")
+    print(f"{'legacy':8s} {legacy_join * 1000:10.1f} {legacy_time * 1000:10.1f}")
+    print(f"{'indexed':8s} {current_join * 1000:10.1f} {current_time * 1000:10.1f}")
+    print(f"speedup: join {legacy_join / current_join:.2f}x, total {legacy_time / current_time:.2f}x")
+    print(f"matched deals: {matched}, single-phone deals with a different chat: {differs}")
+
+
+if __name__ == "__main__":
+    main()
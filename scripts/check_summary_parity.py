@@ -0,0 +1,174 @@
+# Parity check: the deals_window_summary and deals_hourly_summary SQL functions (supabase/migrations/004,
+# 005) vs the Python _build_summary fallback and rollup buckets in server/core; exits 1 when they disagree.
+# Usage (from repo root):
+#   python scripts/check_summary_parity.py --database-url postgresql://...
+#       synthetic edge-case deals inside a rolled-back transaction (any Postgres with 001, 004 and 005 applicable)
+#   python scripts/check_summary_parity.py --tenant <slug> --start 2026-01-01T00:00:00+05:00 --end 2026-01-02T00:00:00+05:00
+#       a real tenant window through its Supabase integration (RPC vs paged row read)
+
+import argparse
+import os
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "server"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "synkro.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from core import pipeline, rollups  # noqa: E402
+from core.models import JobRun, Tenant  # noqa: E402
+
+WINDOW_START = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+WINDOW_END = WINDOW_START + timedelta(days=1)
+
+
+def _synthetic_rows() -> list[tuple]:
+    # (deal_id, status, responsible, messages_count, last_message_at, updated_at)
+    # Unicode spaces (NBSP, em, ideographic, narrow NBSP) must be trimmed like ASCII ones.
+    statuses = [
+        "won", " won ", "", None, "\tlost\n", "В работе", "unknown", "\u00a0won\u3000", "\u2003"
+    ]
+    responsibles = ["a@synkro.kz", None, "  ", "b@synkro.kz", "a@synkro.kz ", "\u00a0b@synkro.kz\u202f"]
+    times = [
+        WINDOW_START,
+        WINDOW_START - timedelta(seconds=1),
+        WINDOW_END,
+        WINDOW_END - timedelta(microseconds=1),
+        WINDOW_START + timedelta(hours=5),
+        None,
+    ]
+    rows = []
+    for deal_id in range(1, 211):
+        rows.append(
+            (
+                deal_id,
+                statuses[deal_id % len(statuses)],
+                responsibles[deal_id % len(responsibles)],
+                [0, 1, 2, 7, 0, 3][deal_id % 6],
+                times[deal_id % len(times)],
+                times[(deal_id // 2) % (len(times) - 1)],
+            )
+        )
+    return rows
+
+
+def _window_records(cursor, tenant_id: str, filter_field: str, min_messages: int) -> list[dict]:
+    # The rows the paged PostgREST read returns for the window.
+    cursor.execute(
+        f"select status, responsible, messages_count, {filter_field} from public.deals "
+        f"where tenant_id = %s and messages_count >= %s and {filter_field} >= %s and {filter_field} < %s",
+        (tenant_id, min_messages, WINDOW_START, WINDOW_END),
+    )
+    return [
+        {"status": status, "responsible": responsible, "messages_count": messages_count, filter_field: value}
+        for status, responsible, messages_count, value in cursor.fetchall()
+    ]
+
+
+def check_synthetic(database_url: str) -> bool:
+    import psycopg
+
+    tenant_id = f"parity-{uuid.uuid4().hex[:8]}"
+    ok = True
+    with psycopg.connect(database_url) as connection:
+        with connection.cursor() as cursor:
+            for name in ("001_init.sql", "004_deals_window_summary.sql", "005_deals_hourly_summary.sql"):
+                cursor.execute((ROOT / "supabase" / "migrations" / name).read_text(encoding="utf-8"))
+            cursor.executemany(
+                "insert into public.deals "
+                "(tenant_id, deal_id, deal_name, status, responsible, messages_count, last_message_at) "
+                "values (%s, %s, %s, %s, %s, %s, %s)",
+                [(tenant_id, row[0], f"Deal {row[0]}", *row[1:5]) for row in _synthetic_rows()],
+            )
+            # updated_at is owned by the trigger on insert/update; set it directly for the check.
+            cursor.execute("alter table public.deals disable trigger deals_set_updated_at")
+            for row in _synthetic_rows():
+                cursor.execute(
+                    "update public.deals set updated_at = %s where tenant_id = %s and deal_id = %s",
+                    (row[5], tenant_id, row[0]),
+                )
+            for filter_field in ("last_message_at", "updated_at"):
+                for min_messages in (0, 1, 2):
+                    cursor.execute(
+                        "select public.deals_window_summary(%s, %s, %s, %s, %s)",
+                        (tenant_id, WINDOW_START, WINDOW_END, filter_field, min_messages),
+                    )
+                    sql_summary = pipeline._summary_counts(cursor.fetchone()[0])
+                    records = _window_records(cursor, tenant_id, filter_field, min_messages)
+                    label = f"{filter_field}, min_messages={min_messages}"
+                    ok = _report(label, sql_summary, pipeline._build_summary(records)) and ok
+                    cursor.execute(
+                        "select public.deals_hourly_summary(%s, %s, %s, %s, %s)",
+                        (tenant_id, WINDOW_START, WINDOW_END, filter_field, min_messages),
+                    )
+                    sql_hourly = rollups.parse_bucket_summaries(cursor.fetchone()[0])
+                    buckets = rollups.bucket_records(records, filter_field, WINDOW_START, WINDOW_END)
+                    for bucket_start, rows in buckets.items():
+                        if rows or bucket_start in sql_hourly:
+                            sql_bucket = pipeline._summary_counts(sql_hourly.get(bucket_start) or {})
+                            bucket_label = f"{label}, hour {bucket_start:%H:%M}"
+                            ok = _report(bucket_label, sql_bucket, pipeline._build_summary(rows)) and ok
+                    merged = pipeline._summary_counts(rollups.merge_summaries(sql_hourly.values()))
+                    ok = _report(f"{label}, merged hours", merged, sql_summary) and ok
+        connection.rollback()
+    return ok
+
+
+def check_tenant(slug: str, start: str, end: str) -> bool:
+    tenant = Tenant.objects.get(slug=slug)
+    config = pipeline.get_or_create_runtime_config(tenant)
+    config.metadata = {**(config.metadata or {}), "max_report_rows": 200000}
+    integrations = pipeline._load_integrations(tenant)
+    # Unsaved job: only carries the tenant and window for the readers.
+    job = JobRun(
+        tenant=tenant,
+        job_type=JobRun.JobType.REPORT_BUILD,
+        mode=config.mode,
+        window_start=datetime.fromisoformat(start),
+        window_end=datetime.fromisoformat(end),
+    )
+    sql_summary = pipeline._fetch_window_aggregates(job, config, integrations)
+    if sql_summary is None:
+        print("deals_window_summary is not deployed (apply supabase/migrations/004_deals_window_summary.sql)")
+        return False
+    python_summary = pipeline._build_summary(pipeline._fetch_deals_for_window(job, config, integrations))
+    return _report(f"{slug} {start} .. {end}", sql_summary, python_summary)
+
+
+def _report(label: str, sql_summary: dict, python_summary: dict) -> bool:
+    same = sql_summary == python_summary and list(sql_summary["status_counts"]) == list(
+        python_summary["status_counts"]
+    )
+    print(f"{'OK  ' if same else 'DIFF'} {label}: {sql_summary['total_deals']} deals")
+    if not same:
+        print(f"  sql:    {sql_summary}")
+        print(f"  python: {python_summary}")
+    return same
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", default="")
+    parser.add_argument("--tenant", default="")
+    parser.add_argument("--start", default="")
+    parser.add_argument("--end", default="")
+    args = parser.parse_args()
+    if args.tenant:
+        if not args.start or not args.end:
+            parser.error("--tenant needs --start and --end")
+        ok = check_tenant(args.tenant, args.start, args.end)
+    elif args.database_url:
+        ok = check_synthetic(args.database_url)
+    else:
+        parser.error("pass --database-url or --tenant")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,11 @@ from django.contrib import admin
 
 from .models import (
     AuditLog,
+    HourlyRollup,
     IntegrationConfig,
     JobRunEvent,
     JobRun,
+    RadistWatermark,
     Report,
     ReportMessage,
     Tenant,
@@ -87,6 +89,28 @@ class ReportAdmin(admin.ModelAdmin):
     readonly_fields = ("created_at", "updated_at")
 
 
+@admin.register(HourlyRollup)
+class HourlyRollupAdmin(admin.ModelAdmin):
+    list_display = (
+        "tenant",
+        "bucket_start",
+        "bucket_end",
+        "total_deals",
+        "with_dialogs",
+        "coverage",
+        "capped",
+    )
+    list_filter = ("capped",)
+    search_fields = ("tenant__name", "tenant__slug")
+    readonly_fields = ("created_at", "updated_at")
+
+
+@admin.register(RadistWatermark)
+class RadistWatermarkAdmin(admin.ModelAdmin):
+    list_display = ("tenant", "chat_id", "covered_from", "covered_until", "updated_at")
+    search_fields = ("tenant__slug", "chat_id")
+
+
 @admin.register(TenantRuntimeConfig)
 class TenantRuntimeConfigAdmin(admin.ModelAdmin):
     list_display = (
@@ -0,0 +1,139 @@
+import math
+
+from .connectors import AMO_CONTACTS_PAGE_SIZE, FETCH_LIMIT_BOUNDS
+from .models import JobRun, Tenant, TenantRuntimeConfig
+
+AUTOTUNE_HISTORY = 5
+HEADROOM = 1.5
+# Share of the sync time target that each parallel stage may take.
+RADIST_TIME_SHARE = 0.6
+AMO_CONTACTS_TIME_SHARE = 0.2
+
+
+def truncation_counts(sync_stats: dict) -> dict[str, int | None]:
+    # Items a fetch cap dropped in one run. amoCRM leads are a lower bound (unread pages count as
+    # one); Radist contacts past the page cap are never listed, so their count is None (unknown).
+    counts = {
+        "amo_leads": sync_stats.get("amo_leads_dropped", 0) if sync_stats.get("amo_leads_capped") else 0,
+        "amo_contacts": sync_stats.get("amo_contacts_dropped", 0),
+        "radist_chats": sync_stats.get("radist_chats_capped", 0),
+        "radist_contacts": None if sync_stats.get("radist_contact_pages_capped") else 0,
+    }
+    return {key: value for key, value in counts.items() if value != 0}
+
+
+def plan_fetch_limits(tenant: Tenant, config: TenantRuntimeConfig, *, exclude_job_id: int | None = None) -> dict:
+    # Caps and concurrency for the next sync from the volumes and timings of recent runs.
+    # Empty without history or with fetch_autotune = false: the static metadata values apply.
+    metadata = config.metadata or {}
+    if metadata.get("fetch_autotune") is False:
+        return {}
+    runs = (
+        JobRun.objects.filter(tenant=tenant, job_type=JobRun.JobType.REPORT_BUILD, status=JobRun.Status.SUCCESS)
+        .exclude(id=exclude_job_id)
+        .order_by("-created_at")
+        .values_list("metadata", flat=True)[: AUTOTUNE_HISTORY * 2]
+    )
+    history = []
+    for job_metadata in runs:
+        stats = (job_metadata or {}).get("sync_stats") or {}
+        if stats.get("fetch_limits") and not stats.get("sync_error") and stats.get("mode") == config.mode:
+            history.append(stats)
+        if len(history) >= AUTOTUNE_HISTORY:
+            break
+    return plan_from_history(history, metadata) if history else {}
+
+
+def plan_from_history(history: list[dict], metadata: dict) -> dict:
+    # history: sync_stats of recent runs, newest first.
+    try:
+        target_seconds = int(metadata.get("sync_time_target_seconds") or 300)
+    except (TypeError, ValueError):
+        target_seconds = 300
+    target_ms = max(30, min(target_seconds, 1800)) * 1000
+    last_limits = history[0]["fetch_limits"]
+    plan = {}
+
+    if any("amo_sync_mode" in stats for stats in history):
+        plan["max_amo_leads"] = _cap(
+            history,
+            "max_amo_leads",
+            volume=lambda stats: stats.get("amo_rows", 0) + stats.get("amo_leads_dropped", 0),
+            capped=lambda stats: stats.get("amo_leads_capped"),
+            step=50,
+        )
+        plan["max_amo_contacts"] = _cap(
+            history,
+            "max_amo_contacts",
+            volume=lambda stats: stats.get("amo_contacts_requested", 0) + stats.get("amo_contacts_dropped", 0),
+            capped=lambda stats: stats.get("amo_contacts_dropped"),
+            step=50,
+        )
+        page_ms = _unit_cost_ms(history, "amo_contacts_ms", "amo_contact_pages", "amo_contact_workers")
+        if page_ms is not None:
+            # Pages hold fewer ids than AMO_CONTACTS_PAGE_SIZE when the URL length caps them.
+            page_ids = [stats["amo_contact_page_ids"] for stats in history if stats.get("amo_contact_page_ids")]
+            pages = math.ceil(plan["max_amo_contacts"] / min(page_ids or [AMO_CONTACTS_PAGE_SIZE]))
+            plan["amo_contact_workers"] = _bounded(
+                "amo_contact_workers", math.ceil(pages * page_ms / (target_ms * AMO_CONTACTS_TIME_SHARE))
+            )
+
+    if any("radist_chats_fetched" in stats for stats in history):
+        candidates = _cap(
+            history,
+            "max_radist_candidates",
+            volume=lambda stats: stats.get("radist_chats_fetched", 0) + stats.get("radist_chats_capped", 0),
+            capped=lambda stats: stats.get("radist_chats_capped"),
+            step=10,
+        )
+        plan["max_radist_candidates"] = candidates
+        plan["radist_fetch_limit"] = _bounded("radist_fetch_limit", candidates)
+        pages_used = max(stats.get("radist_contact_pages", 0) for stats in history)
+        if history[0].get("radist_contact_pages_capped"):
+            pages_used = last_limits.get("max_radist_contact_pages", pages_used) * 2
+        plan["max_radist_contact_pages"] = _bounded("max_radist_contact_pages", pages_used + 2)
+        chat_ms = _unit_cost_ms(
+            history,
+            "radist_messages_ms",
+            "radist_chats_fetched",
+            "radist_fetch_workers",
+            skipped_key="radist_chats_skipped_deadline",
+        )
+        if chat_ms is not None:
+            chats = min(
+                candidates,
+                max(stats.get("radist_chats_fetched", 0) + stats.get("radist_chats_capped", 0) for stats in history),
+            )
+            plan["radist_fetch_workers"] = _bounded(
+                "radist_fetch_workers", math.ceil(chats * chat_ms / (target_ms * RADIST_TIME_SHARE))
+            )
+    return plan
+
+
+def _cap(history: list[dict], key: str, *, volume, capped, step: int) -> int:
+    # Double the cap right after a truncation, otherwise peak volume plus headroom (this also
+    # shrinks oversized caps); older truncated runs still count through their volume.
+    if capped(history[0]):
+        value = history[0]["fetch_limits"].get(key, 0) * 2
+        value = max(value, max(volume(stats) for stats in history))
+    else:
+        value = max(volume(stats) for stats in history) * HEADROOM
+    return _bounded(key, math.ceil(value / step) * step)
+
+
+def _unit_cost_ms(
+    history: list[dict], elapsed_key: str, units_key: str, workers_key: str, *, skipped_key: str = ""
+) -> float | None:
+    # Worker-milliseconds per unit (contact page, chat), averaged over runs that did the work.
+    costs = []
+    for stats in history:
+        units = stats.get(units_key, 0) - (stats.get(skipped_key, 0) if skipped_key else 0)
+        workers = stats["fetch_limits"].get(workers_key, 1)
+        if units > 0 and stats.get(elapsed_key):
+            costs.append(stats[elapsed_key] * min(workers, units) / units)
+    return sum(costs) / len(costs) if costs else None
+
+
+def _bounded(key: str, value) -> int:
+    minimum, maximum = FETCH_LIMIT_BOUNDS[key]
+    return max(minimum, min(int(value), maximum))
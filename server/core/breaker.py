@@ -0,0 +1,141 @@
+import logging
+import threading
+import time
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+BREAKER_CACHE_PREFIX = "synkro:cb"
+# Consecutive upstream failures (network errors, 408/5xx) within failure_window seconds open
+# the circuit for open_seconds; every failed half-open probe doubles that up to max_open_seconds.
+DEFAULT_BREAKER = {
+    "failure_threshold": 5,
+    "failure_window": 120,
+    "open_seconds": 60,
+    "max_open_seconds": 600,
+}
+PROBE_SECONDS = 30
+CIRCUIT_ERROR_PREFIX = "Circuit open"
+
+
+# Breaker for one integration host + credential. State lives in the Django cache (Redis in
+# production), so every worker sees the same open/closed decision.
+class CircuitBreaker:
+    def __init__(self, key: str, kind: str):
+        self.key = key
+        self.kind = kind
+        self.last_used = 0.0
+        self._state_key = f"{BREAKER_CACHE_PREFIX}:{key}:state"
+        self._failures_key = f"{BREAKER_CACHE_PREFIX}:{key}:failures"
+        self._probe_key = f"{BREAKER_CACHE_PREFIX}:{key}:probe"
+        # Set in the thread whose request is the half-open probe.
+        self._local = threading.local()
+
+    def allow(self) -> bool:
+        self.last_used = time.monotonic()
+        state = self._get(self._state_key)
+        self._local.probe = False
+        if not state:
+            return True
+        if time.time() < state.get("opened_until", 0):
+            return False
+        # Half-open: a single probe across all workers; everyone else keeps failing fast.
+        try:
+            self._local.probe = bool(cache.add(self._probe_key, 1, timeout=PROBE_SECONDS))
+        except Exception:
+            logger.warning("Circuit breaker probe lock failed for %s", self.kind, exc_info=True)
+            return True
+        return self._local.probe
+
+    def record_success(self) -> None:
+        # Shared state, so a success resets failures recorded by any worker.
+        self._local.probe = False
+        try:
+            if cache.get_many([self._state_key, self._failures_key]):
+                cache.delete_many([self._state_key, self._failures_key, self._probe_key])
+        except Exception:
+            logger.warning("Circuit breaker reset failed for %s", self.kind, exc_info=True)
+
+    def record_failure(self, error: str) -> None:
+        probe = getattr(self._local, "probe", False)
+        self._local.probe = False
+        state = self._get(self._state_key)
+        if state and not probe:
+            # Only the half-open probe escalates. Requests that were in flight when the circuit
+            # opened, or that fail after opened_until without holding the probe token, just return.
+            return
+        try:
+            cache.add(self._failures_key, 0, timeout=DEFAULT_BREAKER["failure_window"])
+            failures = cache.incr(self._failures_key)
+        except Exception:
+            logger.warning("Circuit breaker counter failed for %s", self.kind, exc_info=True)
+            return
+        if state:
+            # The half-open probe failed: back off longer before the next one.
+            open_seconds = min(state.get("open_seconds", 0) * 2, DEFAULT_BREAKER["max_open_seconds"])
+        elif failures >= DEFAULT_BREAKER["failure_threshold"]:
+            open_seconds = DEFAULT_BREAKER["open_seconds"]
+        else:
+            return
+        open_seconds = max(open_seconds, DEFAULT_BREAKER["open_seconds"])
+        now = time.time()
+        try:
+            cache.set(
+                self._state_key,
+                {
+                    "opened_at": now,
+                    "opened_until": now + open_seconds,
+                    "open_seconds": open_seconds,
+                    "failures": failures,
+                    "last_error": (error or "")[:300],
+                },
+                timeout=max(open_seconds * 4, 3600),
+            )
+            cache.delete(self._probe_key)
+        except Exception:
+            logger.warning("Circuit breaker open failed for %s", self.kind, exc_info=True)
+
+    def snapshot(self) -> dict:
+        state = self._get(self._state_key)
+        if not state:
+            return {"state": "closed"}
+        return {
+            "state": "open" if time.time() < state.get("opened_until", 0) else "half_open",
+            "opened_until": int(state.get("opened_until", 0)),
+            "failures": state.get("failures", 0),
+            "last_error": state.get("last_error", ""),
+        }
+
+    def _get(self, key: str):
+        try:
+            return cache.get(key)
+        except Exception:
+            logger.warning("Circuit breaker read failed for %s", self.kind, exc_info=True)
+            return None
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(key: str, kind: str) -> CircuitBreaker:
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = _breakers[key] = CircuitBreaker(key, kind)
+        return breaker
+
+
+def circuit_snapshots(since: float) -> dict[str, dict]:
+    # Breakers used by this process since the given monotonic time, worst state per kind.
+    rank = {"closed": 0, "half_open": 1, "open": 2}
+    with _breakers_lock:
+        breakers = [breaker for breaker in _breakers.values() if breaker.last_used >= since]
+    snapshots: dict[str, dict] = {}
+    for breaker in breakers:
+        snapshot = breaker.snapshot()
+        current = snapshots.get(breaker.kind)
+        if current is None or rank[snapshot["state"]] > rank[current["state"]]:
+            snapshots[breaker.kind] = snapshot
+    return snapshots
@@ -1,16 +1,91 @@
+import gzip
 import hashlib
-import json
+import heapq
+import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone as dt_timezone
-from urllib.error import HTTPError, URLError
-from urllib.parse import urlencode
-from urllib.request import Request, urlopen
+from typing import Iterable, Iterator, NamedTuple
+from urllib.parse import urlencode, urlsplit
+
+from django.core.cache import cache
+
+from .breaker import CIRCUIT_ERROR_PREFIX, get_circuit_breaker
+from .http_client import HTTPResponse, HTTPTransportError, get_http_client
+from .jsoncodec import JSONDecodeError, canonical_bytes, dumps_bytes, loads
+from .memory import current_rss_mb
+from .ratelimit import TokenBucket, backoff_delay, get_rate_limiter, parse_retry_after
+from .refcache import (
+    DEFAULT_REFERENCE_TTL,
+    amocrm_reference_scope,
+    get_reference,
+    radist_reference_scope,
+    reference_cache_key,
+    set_reference,
+)
+from .telemetry import integration_kind, record_http_retry
+
+AMO_CONTACTS_PAGE_SIZE = 250
+# Contact ids go into the query string; stay well under the ~8 KB URL limit of common proxies.
+AMO_CONTACTS_MAX_URL_BYTES = 6 * 1024
+# (min, max) of every fetch cap and worker count, for metadata values and autotuned plans alike.
+FETCH_LIMIT_BOUNDS = {
+    "max_amo_leads": (50, 2000),
+    "max_amo_contacts": (50, 2000),
+    "amo_contact_workers": (1, 8),
+    "max_radist_contact_pages": (1, 80),
+    "max_radist_candidates": (50, 500),
+    "radist_fetch_limit": (10, 500),
+    "radist_fetch_workers": (1, 16),
+}
+SUPABASE_UPSERT_MAX_ROWS = 200
+SUPABASE_UPSERT_MAX_BYTES = 4 * 1024 * 1024
+SUPABASE_FINGERPRINT_BATCH = 150
+# A Supabase gateway that rejected a gzip body is sent plain JSON by every worker for a day.
+GZIP_UNSUPPORTED_CACHE_PREFIX = "synkro:gzip-unsupported"
+GZIP_UNSUPPORTED_TTL = 24 * 60 * 60
+# Statuses that mean the upstream itself is failing (as opposed to a bad request or throttling).
+BREAKER_FAILURE_STATUSES = {408, 500, 502, 503, 504}
+MIN_MESSAGE_TIME = datetime.min.replace(tzinfo=dt_timezone.utc)
+# Columns the report reads back from public.deals (transcripts are fetched for the prompt sample only).
+WINDOW_RECORD_FIELDS = (
+    "deal_id",
+    "deal_name",
+    "status",
+    "responsible",
+    "messages_count",
+    "first_message_at",
+    "last_message_at",
+)
 
 
 class ConnectorError(Exception):
     pass
 
 
+# Bytes on the wire per integration for this worker process; sync_sources_to_supabase reports
+# the delta of one run.
+_traffic: dict[str, dict[str, int]] = {}
+_traffic_lock = threading.Lock()
+
+
+def traffic_stats() -> dict[str, dict[str, int]]:
+    with _traffic_lock:
+        return {kind: dict(counters) for kind, counters in _traffic.items()}
+
+
+# Radist message with its timestamp, text and attachments extracted once at fetch time.
+# raw is kept untouched for dialog_raw.
+class RadistMessage(NamedTuple):
+    created_at: datetime
+    message_id: str
+    actor: str
+    text: str
+    files: tuple[str, ...]
+    raw: dict
+
+
 def sync_sources_to_supabase(
     *,
     tenant_slug: str,
@@ -24,7 +99,20 @@ def sync_sources_to_supabase(
     amocrm_secret: dict | None,
     radist_public: dict | None,
     radist_secret: dict | None,
+    amo_cursor: dict | None = None,
+    full_resync: bool = False,
+    radist_watermarks: dict | None = None,
+    deadline: float | None = None,
+    fetch_limits: dict | None = None,
+    records_limit: int = 0,
+    records_min_messages: int = 0,
 ) -> dict:
+    # deadline (time.monotonic()): past it, fetching stops and whatever was collected is stored.
+    # fetch_limits: caps and concurrency picked by core.autotune, over the static metadata values.
+    # records_limit: also return the report projection of the newest rows in the window (by last
+    # message, at least records_min_messages messages) as "window_records", when nothing capped
+    # or cut the window short.
+    traffic_before = traffic_stats()
     supabase_url = (supabase_public or {}).get("url", "").rstrip("/")
     service_key = (supabase_secret or {}).get("service_role_key") or (
         supabase_secret or {}
@@ -32,32 +120,127 @@ def sync_sources_to_supabase(
     if not supabase_url or not service_key:
         raise ConnectorError("Supabase credentials are incomplete.")
 
-    radist_fetch_limit = max(int(getattr(runtime_config, "radist_fetch_limit", 200) or 200), 10)
     runtime_meta = getattr(runtime_config, "metadata", {}) or {}
-    max_amo_leads = _bounded_int(runtime_meta.get("max_amo_leads"), 300, 50, 2000)
-    max_amo_contacts = _bounded_int(runtime_meta.get("max_amo_contacts"), 400, 50, 2000)
+    limits = {**runtime_meta, **(fetch_limits or {})}
+    # Above max_radist_candidates the fetch limit has no effect, so its upper bound changes nothing.
+    radist_fetch_limit = _bounded_int(
+        limits.get("radist_fetch_limit") or getattr(runtime_config, "radist_fetch_limit", 200) or 200,
+        200,
+        *FETCH_LIMIT_BOUNDS["radist_fetch_limit"],
+    )
+    max_amo_leads = _bounded_int(limits.get("max_amo_leads"), 300, *FETCH_LIMIT_BOUNDS["max_amo_leads"])
+    max_amo_contacts = _bounded_int(
+        limits.get("max_amo_contacts"), 400, *FETCH_LIMIT_BOUNDS["max_amo_contacts"]
+    )
+    amo_contact_workers = _bounded_int(
+        limits.get("amo_contact_workers"), 4, *FETCH_LIMIT_BOUNDS["amo_contact_workers"]
+    )
+    full_resync = full_resync or (runtime_meta.get("amo_sync_mode") or "").strip() == "full"
     max_radist_contact_pages = _bounded_int(
-        runtime_meta.get("max_radist_contact_pages"), 10, 1, 80
+        limits.get("max_radist_contact_pages"), 10, *FETCH_LIMIT_BOUNDS["max_radist_contact_pages"]
     )
     max_radist_candidates = _bounded_int(
-        runtime_meta.get("max_radist_candidates"), max(radist_fetch_limit, 120), 50, 500
+        limits.get("max_radist_candidates"),
+        max(radist_fetch_limit, 120),
+        *FETCH_LIMIT_BOUNDS["max_radist_candidates"],
     )
     max_radist_message_pages = _bounded_int(
         runtime_meta.get("max_radist_message_pages"), 4, 1, 20
     )
+    radist_fetch_workers = _bounded_int(
+        limits.get("radist_fetch_workers"), 4, *FETCH_LIMIT_BOUNDS["radist_fetch_workers"]
+    )
+    reference_ttl = _bounded_int(
+        runtime_meta.get("reference_cache_ttl_seconds"), DEFAULT_REFERENCE_TTL, 0, 7 * 24 * 60 * 60
+    )
+    cache_stats = {"reference_cache_hits": 0, "reference_cache_misses": 0, "reference_cache_revalidated": 0}
+    upsert_workers = _bounded_int(runtime_meta.get("supabase_upsert_workers"), 3, 1, 8)
+    upsert_max_rows = _bounded_int(
+        runtime_meta.get("supabase_upsert_max_rows"), SUPABASE_UPSERT_MAX_ROWS, 10, 1000
+    )
+    upsert_max_bytes = _bounded_int(
+        runtime_meta.get("supabase_upsert_max_bytes"),
+        SUPABASE_UPSERT_MAX_BYTES,
+        256 * 1024,
+        32 * 1024 * 1024,
+    )
+    upsert_gzip = bool((supabase_public or {}).get("gzip_upserts", True))
+    sync_batch_rows = _bounded_int(runtime_meta.get("sync_batch_rows"), 200, 10, 2000)
+    sync_memory_limit_mb = _bounded_int(runtime_meta.get("sync_memory_limit_mb"), 1024, 128, 16384)
 
     amo_rows = []
-    radist_dialogs = []
-    if mode in {"amocrm_radist", "amocrm_only"}:
-        amo_rows = _collect_amo_rows(
-            amocrm_public or {},
-            amocrm_secret or {},
-            window_start=window_start,
-            window_end=window_end,
-            max_leads=max_amo_leads,
-            max_contacts=max_amo_contacts,
-        )
-    if mode in {"amocrm_radist", "radist_only"}:
+    amo_stats = {}
+    supabase_limiter = get_rate_limiter("supabase", supabase_url, service_key, supabase_public)
+    radist_stats = {}
+    collect_amo = mode in {"amocrm_radist", "amocrm_only"}
+    collect_radist = mode in {"amocrm_radist", "radist_only"}
+    stage_ms = {}
+    # Each branch gets its own counters so the two threads never update the same dict.
+    amo_cache_stats = {}
+    radist_cache_stats = {}
+
+    def run_amo() -> tuple[list[dict], dict]:
+        started = time.monotonic()
+        try:
+            return _collect_amo_rows(
+                amocrm_public or {},
+                amocrm_secret or {},
+                window_start=window_start,
+                window_end=window_end,
+                max_leads=max_amo_leads,
+                max_contacts=max_amo_contacts,
+                contact_workers=amo_contact_workers,
+                cursor=amo_cursor,
+                full_resync=full_resync,
+                tenant_slug=tenant_slug,
+                supabase_url=supabase_url,
+                service_key=service_key,
+                supabase_limiter=supabase_limiter,
+                reference_ttl=reference_ttl,
+                cache_stats=amo_cache_stats,
+                deadline=deadline,
+            )
+        finally:
+            stage_ms["amo_collect_ms"] = int((time.monotonic() - started) * 1000)
+
+    def run_radist_discovery() -> dict:
+        started = time.monotonic()
+        try:
+            return _discover_radist_chats(
+                radist_public or {},
+                radist_secret or {},
+                window_start=window_start,
+                max_contact_pages=max_radist_contact_pages,
+                reference_ttl=reference_ttl,
+                cache_stats=radist_cache_stats,
+                deadline=deadline,
+            )
+        finally:
+            stage_ms["radist_discovery_ms"] = int((time.monotonic() - started) * 1000)
+
+    # Dependency graph: amoCRM collection and Radist discovery (sources + contact paging) are
+    # independent and run side by side; only the Radist candidate filter and message fetch
+    # need the amoCRM phones.
+    collect_started = time.monotonic()
+    discovery = None
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="synkro-stage") as executor:
+        amo_future = executor.submit(run_amo) if collect_amo else None
+        discovery_future = executor.submit(run_radist_discovery) if collect_radist else None
+        if amo_future is not None:
+            amo_rows, amo_stats = amo_future.result()
+        if discovery_future is not None:
+            discovery = discovery_future.result()
+    stage_ms["sync_collect_ms"] = int((time.monotonic() - collect_started) * 1000)
+    for counters in (amo_cache_stats, radist_cache_stats):
+        for key, value in counters.items():
+            cache_stats[key] = cache_stats.get(key, 0) + value
+
+    # Stream the rest: dialogs are fetched, merged, finalized and upserted batch by batch so that
+    # only one batch of transcripts and JSON bodies is alive at a time.
+    batch_budget = {"rows": sync_batch_rows}
+    chat_plan = []
+    chat_slices = iter(())
+    if discovery is not None:
         target_phones = None
         if mode == "amocrm_radist":
             target_phones = {
@@ -66,33 +249,121 @@ def sync_sources_to_supabase(
                 for phone in row.get("_phones", [])
                 if phone
             }
-        radist_dialogs = _collect_radist_dialogs(
-            radist_public or {},
-            radist_secret or {},
+        candidates = _plan_radist_chats(
+            discovery,
+            radist_stats,
             window_start=window_start,
-            window_end=window_end,
             fetch_limit=radist_fetch_limit,
             target_phones=target_phones,
-            max_contact_pages=max_radist_contact_pages,
             max_candidates=max_radist_candidates,
+        )
+        chat_plan = [
+            (candidate["phone"], _to_int(candidate["chat"].get("chat_id"))) for candidate in candidates
+        ]
+        chat_slices = _fetch_radist_chats(
+            discovery,
+            candidates,
+            radist_stats,
+            window_start=window_start,
+            window_end=window_end,
             max_message_pages=max_radist_message_pages,
+            max_workers=radist_fetch_workers,
+            watermarks=radist_watermarks,
+            tenant_slug=tenant_slug,
+            supabase_url=supabase_url,
+            service_key=service_key,
+            supabase_limiter=supabase_limiter,
+            batch_budget=batch_budget,
+            deadline=deadline,
         )
-
-    rows = _merge_rows(
+    merged_rows = _merge_rows(
         tenant_slug=tenant_slug,
         mode=mode,
         amo_rows=amo_rows,
-        radist_dialogs=radist_dialogs,
+        chat_plan=chat_plan,
+        chat_slices=chat_slices,
+    )
+    window_records = None
+    window_stats = {}
+    if records_limit > 0:
+        window_records = []
+        window_stats["window_rows"] = 0
+        merged_rows = _tap_window_records(
+            merged_rows,
+            window_records,
+            window_stats,
+            window_start=window_start,
+            window_end=window_end,
+            limit=records_limit,
+            min_messages=records_min_messages,
+        )
+    stream_started = time.monotonic()
+    upsert_stats, stored_chat_ids = _upsert_rows_in_batches(
+        merged_rows,
+        supabase_url=supabase_url,
+        service_key=service_key,
+        tenant_slug=tenant_slug,
+        limiter=supabase_limiter,
+        batch_budget=batch_budget,
+        memory_limit_mb=sync_memory_limit_mb,
+        max_workers=upsert_workers,
+        max_rows=upsert_max_rows,
+        max_bytes=upsert_max_bytes,
+        compress=upsert_gzip,
     )
-    if rows:
-        _supabase_upsert_deals(supabase_url, service_key, rows)
+    stage_ms["sync_stream_ms"] = int((time.monotonic() - stream_started) * 1000)
+    if "radist_watermarks" in radist_stats:
+        # Per-chat updates (None drops one). A watermark is only valid for chats whose dialog
+        # actually lands in a stored row.
+        radist_stats["radist_watermarks"] = {
+            chat_id: watermark
+            for chat_id, watermark in radist_stats["radist_watermarks"].items()
+            if watermark is None or chat_id in stored_chat_ids
+        }
 
-    return {
+    coverage = [
+        value
+        for value in (amo_stats.get("amo_coverage"), radist_stats.get("radist_coverage"))
+        if value is not None
+    ]
+    sync_deadline_hit = bool(amo_stats.get("amo_deadline_hit") or radist_stats.get("radist_deadline_hit"))
+    # The merged rows are the whole window only when no deadline, cap or failed chat cut it short.
+    window_complete = not (
+        sync_deadline_hit
+        or amo_stats.get("amo_leads_capped")
+        or amo_stats.get("amo_contacts_dropped")
+        or (collect_amo and len(amo_rows) >= max_amo_leads)
+        or radist_stats.get("radist_chats_capped")
+        or radist_stats.get("radist_contact_pages_capped")
+        or radist_stats.get("radist_chat_errors")
+    )
+    result = {
         "mode": mode,
         "amo_rows": len(amo_rows),
-        "radist_dialogs": len(radist_dialogs),
-        "upsert_rows": len(rows),
+        **amo_stats,
+        **radist_stats,
+        "radist_dialogs": radist_stats.get("radist_dialogs", 0),
+        **cache_stats,
+        **stage_ms,
+        **upsert_stats,
+        **window_stats,
+        "sync_deadline_hit": sync_deadline_hit,
+        "sync_coverage": min(coverage, default=1.0),
+        "sync_window_complete": window_complete,
+        "fetch_limits": {
+            "max_amo_leads": max_amo_leads,
+            "max_amo_contacts": max_amo_contacts,
+            "amo_contact_workers": amo_contact_workers,
+            "max_radist_contact_pages": max_radist_contact_pages,
+            "max_radist_candidates": max_radist_candidates,
+            "radist_fetch_limit": radist_fetch_limit,
+            "radist_fetch_workers": radist_fetch_workers,
+        },
+        "traffic": _traffic_delta(traffic_before, traffic_stats()),
     }
+    if window_records is not None and window_complete:
+        result["window_records"] = window_records
+    return result
 
 
 def _collect_amo_rows(
@@ -103,7 +374,17 @@ def _collect_amo_rows(
     window_end: datetime,
     max_leads: int,
     max_contacts: int,
-) -> list[dict]:
+    contact_workers: int = 1,
+    cursor: dict | None = None,
+    full_resync: bool = False,
+    tenant_slug: str = "",
+    supabase_url: str = "",
+    service_key: str = "",
+    supabase_limiter: TokenBucket | None = None,
+    reference_ttl: int = DEFAULT_REFERENCE_TTL,
+    cache_stats: dict | None = None,
+    deadline: float | None = None,
+) -> tuple[list[dict], dict]:
     domain = (amocrm_public.get("domain") or "").strip()
     token = (amocrm_secret.get("access_token") or "").strip()
     if not domain or not token:
@@ -111,8 +392,43 @@ def _collect_amo_rows(
 
     base = domain if domain.startswith("http") else f"https://{domain}"
     base = base.rstrip("/")
-    status_map = _amo_status_map(base, token)
-    leads = _amo_fetch_leads(base, token, window_start, window_end, max_leads=max_leads)
+    limiter = get_rate_limiter("amocrm", base, token, amocrm_public)
+    from_ts = int(window_start.astimezone(dt_timezone.utc).timestamp())
+    to_ts = int(window_end.astimezone(dt_timezone.utc).timestamp())
+    prior_cursor = _usable_amo_cursor(cursor, base, from_ts)
+    if not (supabase_url and service_key and tenant_slug):
+        prior_cursor = None
+    incremental = prior_cursor is not None and not full_resync
+
+    fetch_start = window_start
+    if incremental:
+        fetch_start = datetime.fromtimestamp(max(from_ts, prior_cursor["updated_at"]), tz=dt_timezone.utc)
+    leads = []
+    deadline_hit = False
+    leads_dropped = 0
+    if fetch_start < window_end:
+        leads, deadline_hit, leads_dropped = _amo_fetch_leads(
+            base, token, fetch_start, window_end, max_leads=max_leads, limiter=limiter, deadline=deadline
+        )
+    truncated = len(leads) >= max_leads or deadline_hit
+    coverage = 1.0
+    if deadline_hit and leads:
+        # Leads come newest first, so the covered part of the window is [oldest fetched, end).
+        oldest = min(_to_int(lead.get("updated_at")) for lead in leads)
+        span = int(window_end.timestamp()) - int(fetch_start.timestamp())
+        coverage = max(0.0, min(1.0, (int(window_end.timestamp()) - oldest) / span)) if span > 0 else 1.0
+    elif deadline_hit:
+        coverage = 0.0
+    status_map = {}
+    if leads:
+        status_map = _amo_status_map(
+            base,
+            token,
+            limiter=limiter,
+            cache_key=reference_cache_key("amocrm", amocrm_reference_scope(amocrm_public), "pipelines"),
+            ttl=reference_ttl,
+            cache_stats=cache_stats if cache_stats is not None else {},
+        )
 
     contact_ids = {
         _to_int(contact.get("id"))
@@ -121,7 +437,14 @@ def _collect_amo_rows(
         if contact.get("id")
     }
     contact_ids.discard(0)
-    contacts_map = _amo_fetch_contacts(base, token, sorted(contact_ids), max_contacts=max_contacts)
+    contacts_map, stats = _amo_fetch_contacts(
+        base,
+        token,
+        sorted(contact_ids),
+        max_contacts=max_contacts,
+        max_workers=contact_workers,
+        limiter=limiter,
+    )
 
     rows = []
     for lead in leads:
@@ -169,15 +492,162 @@ def _collect_amo_rows(
                 "_phones": normalized_phones,
             }
         )
-    return rows
+
+    reused_rows = []
+    if incremental:
+        # Every fetched lead (the cursor's own second included) is built fresh above; its stored
+        # copy may predate the lead's current updated_at and is never reused.
+        fetched_ids = {row["deal_id"] for row in rows}
+        stored_rows = _supabase_fetch_amo_rows(
+            supabase_url,
+            service_key,
+            tenant_slug=tenant_slug,
+            from_ts=from_ts,
+            to_ts=to_ts,
+            limit=max_leads,
+            limiter=supabase_limiter,
+        )
+        reused_rows = [row for row in stored_rows if row["deal_id"] not in fetched_ids]
+
+    next_cursor = prior_cursor
+    if not truncated:
+        # Every lead updated between the cursor start and covered_until is now stored in Supabase.
+        covered_until = min(to_ts, int(time.time())) - 1
+        marks = [_amo_lead_mark(lead) for lead in leads]
+        marks.append((covered_until, 0))
+        if prior_cursor:
+            marks.append((prior_cursor["updated_at"], prior_cursor["lead_id"]))
+        updated_at, lead_id = max(marks)
+        next_cursor = {
+            "domain": base,
+            "synced_from": prior_cursor["synced_from"] if prior_cursor else from_ts,
+            "updated_at": updated_at,
+            "lead_id": lead_id,
+        }
+    stats.update(
+        {
+            "amo_sync_mode": "incremental" if incremental else "full",
+            "amo_leads_fetched": len(rows),
+            "amo_leads_reused": len(reused_rows),
+            "amo_deadline_hit": deadline_hit,
+            "amo_leads_capped": len(leads) >= max_leads and not deadline_hit,
+            "amo_leads_dropped": leads_dropped,
+            "amo_coverage": round(coverage, 3),
+            "amo_cursor": next_cursor,
+        }
+    )
+    # Same order as a full fetch (newest first, ties by id), so the cap keeps the same leads.
+    merged = sorted(rows + reused_rows, key=_amo_row_mark, reverse=True)
+    return merged[:max_leads], stats
+
+
+def _usable_amo_cursor(cursor: dict | None, base_url: str, from_ts: int) -> dict | None:
+    if not isinstance(cursor, dict) or cursor.get("domain") != base_url:
+        return None
+    synced_from = _to_int(cursor.get("synced_from"))
+    updated_at = _to_int(cursor.get("updated_at"))
+    # Incremental only when the stored range reaches the window start without a gap.
+    if synced_from <= 0 or not synced_from <= from_ts <= updated_at + 1:
+        return None
+    return {
+        "synced_from": synced_from,
+        "updated_at": updated_at,
+        "lead_id": _to_int(cursor.get("lead_id")),
+    }
 
 
-def _amo_status_map(base_url: str, token: str) -> dict[int, str]:
+def _amo_lead_mark(lead: dict) -> tuple[int, int]:
+    return _to_int(lead.get("updated_at")), _to_int(lead.get("id"))
+
+
+def _amo_row_mark(row: dict) -> tuple[int, int]:
+    return _to_int((row.get("deal_attrs_json") or {}).get("updated_at")), row["deal_id"]
+
+
+def _supabase_fetch_amo_rows(
+    supabase_url: str,
+    service_key: str,
+    *,
+    tenant_slug: str,
+    from_ts: int,
+    to_ts: int,
+    limit: int,
+    limiter: TokenBucket | None = None,
+) -> list[dict]:
+    # amoCRM updated_at is a 10-digit epoch, so text comparison via ->> keeps numeric order.
+    # Newest first like the leads API, so the limit drops the same (oldest) leads as a full fetch.
+    params = [
+        (
+            "select",
+            "deal_id,deal_name,status_id,status,responsible,phone,deal_attrs_json,contact_attrs_json",
+        ),
+        ("tenant_id", f"eq.{tenant_slug}"),
+        ("deal_id", "gt.0"),
+        ("deal_attrs_json->>source", "eq.amocrm"),
+        ("deal_attrs_json->>updated_at", f"gte.{from_ts}"),
+        ("deal_attrs_json->>updated_at", f"lt.{to_ts}"),
+        ("order", "deal_attrs_json->>updated_at.desc,deal_id.desc"),
+        ("limit", str(limit)),
+    ]
     payload = _request_json(
         "GET",
+        f"{supabase_url}/rest/v1/deals?{urlencode(params)}",
+        headers={
+            "apikey": service_key,
+            "Authorization": f"Bearer {service_key}",
+            "User-Agent": "synkro-etl/1.0",
+        },
+        timeout=15,
+        max_attempts=3,
+        limiter=limiter,
+    )
+    rows = []
+    for item in payload if isinstance(payload, list) else []:
+        deal_id = _to_int(item.get("deal_id"))
+        if deal_id <= 0:
+            continue
+        contact_attrs = item.get("contact_attrs_json") or {}
+        phones = [phone for phone in contact_attrs.get("phones") or [] if phone]
+        rows.append(
+            {
+                "deal_id": deal_id,
+                "deal_name": item.get("deal_name") or f"Deal {deal_id}",
+                "status_id": item.get("status_id"),
+                "status": item.get("status") or "",
+                "responsible": item.get("responsible") or "",
+                "phone": item.get("phone") or (phones[0] if phones else ""),
+                "chat_id": None,
+                "first_message_at": None,
+                "last_message_at": None,
+                "messages_count": 0,
+                "deal_attrs_json": item.get("deal_attrs_json") or {},
+                "contact_attrs_json": contact_attrs,
+                "dialog_raw": [],
+                "dialog_norm": "",
+                "comment": "",
+                "_phones": phones,
+            }
+        )
+    return rows
+
+
+def _amo_status_map(
+    base_url: str,
+    token: str,
+    *,
+    limiter: TokenBucket | None = None,
+    cache_key: str,
+    ttl: int,
+    cache_stats: dict,
+) -> dict[int, str]:
+    payload = _request_reference_json(
         f"{base_url}/api/v4/leads/pipelines",
+        cache_key=cache_key,
+        ttl=ttl,
+        cache_stats=cache_stats,
         headers={"Authorization": f"Bearer {token}", "User-Agent": "synkro/1.0"},
-    )
+        limiter=limiter,
+    ) or {}
     result: dict[int, str] = {}
     for pipeline in (payload.get("_embedded") or {}).get("pipelines", []) or []:
         for status in (pipeline.get("_embedded") or {}).get("statuses", []) or []:
@@ -188,8 +658,18 @@ def _amo_status_map(base_url: str, token: str) -> dict[int, str]:
 
 
 def _amo_fetch_leads(
-    base_url: str, token: str, window_start: datetime, window_end: datetime, *, max_leads: int
-) -> list[dict]:
+    base_url: str,
+    token: str,
+    window_start: datetime,
+    window_end: datetime,
+    *,
+    max_leads: int,
+    limiter: TokenBucket | None = None,
+    deadline: float | None = None,
+) -> tuple[list[dict], bool, int]:
+    # Newest first, so a cap or a deadline keeps the most recent leads.
+    # Returns (leads, deadline_hit, dropped). The API exposes no total, so dropped is a lower bound:
+    # leads past max_leads on the last page plus one if a next page was left unread.
     from_ts = int(window_start.astimezone(dt_timezone.utc).timestamp())
     to_ts = int(window_end.astimezone(dt_timezone.utc).timestamp())
     params = {
@@ -198,41 +678,95 @@ def _amo_fetch_leads(
         "page": "1",
         "filter[updated_at][from]": str(from_ts),
         "filter[updated_at][to]": str(to_ts),
+        "order[updated_at]": "desc",
     }
     next_url = f"{base_url}/api/v4/leads?{urlencode(params)}"
     all_leads: list[dict] = []
+    dropped = 0
     page_no = 0
     while next_url and len(all_leads) < max_leads and page_no < 50:
+        if _past_deadline(deadline):
+            return all_leads, True, 0
         payload = _request_json(
             "GET",
             next_url,
             headers={"Authorization": f"Bearer {token}", "User-Agent": "synkro/1.0"},
             timeout=15,
             max_attempts=3,
+            limiter=limiter,
         )
         batch = (payload.get("_embedded") or {}).get("leads", []) or []
         remaining = max_leads - len(all_leads)
         all_leads.extend(batch[:remaining])
+        dropped = max(0, len(batch) - remaining)
         next_url = ((payload.get("_links") or {}).get("next") or {}).get("href")
         page_no += 1
-    return all_leads
+    return all_leads, False, dropped + (1 if next_url and len(all_leads) >= max_leads else 0)
 
 
 def _amo_fetch_contacts(
-    base_url: str, token: str, contact_ids: list[int], *, max_contacts: int
-) -> dict[int, dict]:
-    result: dict[int, dict] = {}
-    for contact_id in contact_ids[:max_contacts]:
+    base_url: str,
+    token: str,
+    contact_ids: list[int],
+    *,
+    max_contacts: int,
+    max_workers: int = 1,
+    limiter: TokenBucket | None = None,
+) -> tuple[dict[int, dict], dict]:
+    started = time.monotonic()
+    requested = contact_ids[:max_contacts]
+    endpoint = f"{base_url}/api/v4/contacts?{urlencode([('limit', str(AMO_CONTACTS_PAGE_SIZE))])}"
+    pages = _amo_contact_pages(endpoint, requested)
+
+    def fetch_page(page_ids: list[int]) -> list[dict]:
         payload = _request_json(
             "GET",
-            f"{base_url}/api/v4/contacts/{contact_id}",
+            endpoint + "".join(f"&{urlencode([('filter[id][]', contact_id)])}" for contact_id in page_ids),
             headers={"Authorization": f"Bearer {token}", "User-Agent": "synkro/1.0"},
             timeout=15,
             max_attempts=3,
+            limiter=limiter,
         )
-        phones = _extract_phones_from_custom_fields(payload.get("custom_fields_values") or [])
-        result[contact_id] = {"phones": [p for p in {_normalize_phone(x) for x in phones} if p]}
-    return result
+        return (payload.get("_embedded") or {}).get("contacts", []) or []
+
+    result: dict[int, dict] = {}
+    for batch in _map_concurrently(fetch_page, pages, max_workers=max_workers):
+        for contact in batch:
+            contact_id = _to_int(contact.get("id"))
+            if contact_id <= 0:
+                continue
+            phones = _extract_phones_from_custom_fields(contact.get("custom_fields_values") or [])
+            result[contact_id] = {"phones": [p for p in {_normalize_phone(x) for x in phones} if p]}
+    stats = {
+        "amo_contacts_requested": len(requested),
+        "amo_contacts_dropped": len(contact_ids) - len(requested),
+        "amo_contacts_resolved": len(result),
+        "amo_contact_pages": len(pages),
+        # Ids that fit one request under the URL cap; only known once a request was full.
+        "amo_contact_page_ids": max(len(page) for page in pages[:-1]) if len(pages) > 1 else 0,
+        "amo_contacts_ms": int((time.monotonic() - started) * 1000),
+    }
+    return result, stats
+
+
+def _amo_contact_pages(endpoint: str, contact_ids: list[int]) -> list[list[int]]:
+    # Up to AMO_CONTACTS_PAGE_SIZE ids per request, fewer when the encoded URL would pass
+    # AMO_CONTACTS_MAX_URL_BYTES (each id adds "&filter%5Bid%5D%5B%5D=<id>").
+    param_bytes = len("&" + urlencode([("filter[id][]", "")]))
+    pages: list[list[int]] = []
+    page: list[int] = []
+    url_bytes = len(endpoint)
+    for contact_id in contact_ids:
+        size = param_bytes + len(str(contact_id))
+        if page and (len(page) >= AMO_CONTACTS_PAGE_SIZE or url_bytes + size > AMO_CONTACTS_MAX_URL_BYTES):
+            pages.append(page)
+            page = []
+            url_bytes = len(endpoint)
+        page.append(contact_id)
+        url_bytes += size
+    if page:
+        pages.append(page)
+    return pages
 
 
 def _extract_phones_from_custom_fields(custom_fields: list[dict]) -> list[str]:
@@ -249,18 +783,17 @@ def _extract_phones_from_custom_fields(custom_fields: list[dict]) -> list[str]:
     return phones
 
 
-def _collect_radist_dialogs(
+def _discover_radist_chats(
     radist_public: dict,
     radist_secret: dict,
     *,
     window_start: datetime,
-    window_end: datetime,
-    fetch_limit: int,
-    target_phones: set[str] | None,
     max_contact_pages: int,
-    max_candidates: int,
-    max_message_pages: int,
-) -> list[dict]:
+    reference_ttl: int = DEFAULT_REFERENCE_TTL,
+    cache_stats: dict | None = None,
+    deadline: float | None = None,
+) -> dict:
+    # Everything that does not depend on amoCRM: credentials, WhatsApp sources and contact paging.
     api_key = (radist_secret.get("api_key") or "").strip()
     company_id = _to_int(radist_public.get("company_id"))
     base_url = (radist_public.get("api_base_url") or "https://api.radist.online/v2").rstrip("/")
@@ -268,12 +801,14 @@ def _collect_radist_dialogs(
         raise ConnectorError("Radist credentials are incomplete.")
 
     headers = {"X-Api-Key": api_key, "User-Agent": "synkro/1.0"}
-    sources = _request_json(
-        "GET",
+    limiter = get_rate_limiter("radist", base_url, api_key, radist_public)
+    sources = _request_reference_json(
         f"{base_url}/companies/{company_id}/messaging/chats/sources/",
+        cache_key=reference_cache_key("radist", radist_reference_scope(radist_public), "sources"),
+        ttl=reference_ttl,
+        cache_stats=cache_stats if cache_stats is not None else {},
         headers=headers,
-        timeout=15,
-        max_attempts=3,
+        limiter=limiter,
     )
     connection_ids = {
         _to_int(item.get("connection_id"))
@@ -282,13 +817,31 @@ def _collect_radist_dialogs(
         and item.get("connection_id")
     }
     connection_ids.discard(0)
+    discovery = {
+        "base_url": base_url,
+        "company_id": company_id,
+        "headers": headers,
+        "limiter": limiter,
+        "connection_ids": connection_ids,
+        "contacts": [],
+        "contact_pages": 0,
+        "stopped_early": False,
+        "deadline_hit": False,
+    }
     if not connection_ids:
-        return []
+        return discovery
 
     contacts = []
     cursor = None
     page_no = 0
+    stopped_early = False
+    deadline_hit = False
+    pages_capped = False
     while True:
+        if page_no and _past_deadline(deadline):
+            # Pages already read hold the most recently active contacts.
+            deadline_hit = True
+            break
         params = {"limit": "100"}
         if cursor:
             params["cursor"] = cursor
@@ -298,21 +851,62 @@ def _collect_radist_dialogs(
             headers=headers,
             timeout=15,
             max_attempts=3,
+            limiter=limiter,
         )
-        contacts.extend(payload.get("data") or [])
+        page = payload.get("data") or []
+        contacts.extend(page)
         cursor = ((payload.get("response_metadata") or {}).get("next_cursor") or "").strip()
         page_no += 1
         if not cursor:
             break
         if page_no >= max_contact_pages:
+            pages_capped = True
             break
+        # Contacts come most recently active first: once a whole page is older than the
+        # window, later pages cannot hold chats with messages in it.
+        page_activity = [_contact_last_activity(contact) for contact in page]
+        if page_activity and all(
+            activity is not None and activity < window_start for activity in page_activity
+        ):
+            stopped_early = True
+            break
+    discovery.update(
+        {
+            "contacts": contacts,
+            "contact_pages": page_no,
+            "stopped_early": stopped_early,
+            "deadline_hit": deadline_hit,
+            "pages_capped": pages_capped,
+        }
+    )
+    return discovery
+
+
+def _plan_radist_chats(
+    discovery: dict,
+    stats: dict,
+    *,
+    window_start: datetime,
+    fetch_limit: int,
+    target_phones: set[str] | None,
+    max_candidates: int,
+) -> list[dict]:
+    # Chats to fetch, most recently active first, picked from contact metadata alone.
+    connection_ids = discovery["connection_ids"]
+    if not connection_ids:
+        return []
+    contacts = discovery["contacts"]
 
     candidates = []
+    pruned_stale = 0
     target_phones = target_phones or set()
     for contact in contacts:
         contact_name = (contact.get("contact_name") or "").strip()
         contact_id = contact.get("contact_id")
-        last_chat_updated_at = _parse_datetime(contact.get("last_chat_updated_at"))
+        last_chat_updated_at = _contact_last_activity(contact)
+        if last_chat_updated_at is not None and last_chat_updated_at < window_start:
+            pruned_stale += sum(1 for _ in contact.get("chats") or [])
+            continue
         for chat in contact.get("chats") or []:
             connection_id = _to_int(chat.get("connection_id"))
             if connection_id not in connection_ids:
@@ -339,41 +933,203 @@ def _collect_radist_dialogs(
     candidate_cap = max_candidates
     if target_phones:
         candidate_cap = min(candidate_cap, max(fetch_limit, len(target_phones) * 2))
+    capped = max(0, len(candidates) - candidate_cap)
     candidates = candidates[:candidate_cap]
 
-    dialogs = []
-    for candidate in candidates:
-        chat = candidate["chat"]
-        chat_id = _to_int(chat.get("chat_id"))
-        if chat_id <= 0:
-            continue
-        messages = _radist_fetch_messages_in_window(
-            base_url=base_url,
-            company_id=company_id,
-            headers=headers,
-            chat_id=chat_id,
-            window_start=window_start,
-            window_end=window_end,
-            max_pages=max_message_pages,
-        )
-        if not messages:
-            continue
-        first_dt = _parse_datetime(messages[0].get("created_at"))
-        last_dt = _parse_datetime(messages[-1].get("created_at"))
-        dialogs.append(
-            {
-                "contact_id": candidate["contact_id"],
-                "contact_name": candidate["contact_name"] or candidate["phone"],
-                "phone": candidate["phone"],
-                "connection_id": chat.get("connection_id"),
-                "chat_id": chat_id,
-                "source_chat_id": chat.get("source_chat_id"),
-                "messages": messages,
-                "first_message_at": _dt_to_iso(first_dt) if first_dt else None,
-                "last_message_at": _dt_to_iso(last_dt) if last_dt else None,
+    candidates = [
+        candidate for candidate in candidates if _to_int(candidate["chat"].get("chat_id")) > 0
+    ]
+
+    stats.update(
+        {
+            "radist_contact_pages": discovery["contact_pages"],
+            "radist_contact_paging_stopped_early": discovery["stopped_early"],
+            "radist_contact_pages_capped": discovery.get("pages_capped", False),
+            "radist_chats_pruned_stale": pruned_stale,
+            "radist_chats_capped": capped,
+            "radist_chats_fetched": len(candidates),
+            "radist_chat_errors": 0,
+            "radist_messages_ms": 0,
+            "radist_chats_incremental": 0,
+            "radist_chats_served_from_store": 0,
+            "radist_messages_reused": 0,
+            "radist_dialogs": 0,
+            "radist_chats_skipped_deadline": 0,
+            "radist_deadline_hit": discovery.get("deadline_hit", False),
+            "radist_coverage": 1.0,
+            "radist_watermarks": {},
+        }
+    )
+    return candidates
+
+
+def _fetch_radist_chats(
+    discovery: dict,
+    candidates: list[dict],
+    stats: dict,
+    *,
+    window_start: datetime,
+    window_end: datetime,
+    max_message_pages: int,
+    max_workers: int = 1,
+    watermarks: dict | None = None,
+    tenant_slug: str = "",
+    supabase_url: str = "",
+    service_key: str = "",
+    supabase_limiter: TokenBucket | None = None,
+    batch_budget: dict | None = None,
+    deadline: float | None = None,
+) -> Iterator[list[tuple[str, int, dict | None]]]:
+    # Fetches the planned chats slice by slice and yields (phone, chat_id, dialog or None) for
+    # every chat of the slice, so consumers know which chats are done; fills stats as it goes.
+    if not candidates:
+        return
+    base_url = discovery["base_url"]
+    company_id = discovery["company_id"]
+    headers = discovery["headers"]
+    limiter = discovery["limiter"]
+    window_start_ts = int(window_start.timestamp())
+    window_end_ts = int(window_end.timestamp())
+    batch_budget = batch_budget if batch_budget is not None else {"rows": len(candidates) or 1}
+    first_error = ""
+    position = 0
+    while position < len(candidates):
+        if _past_deadline(deadline):
+            # Candidates are sorted by recent activity: what is left is the least recent tail.
+            stats["radist_chats_skipped_deadline"] += len(candidates) - position
+            stats["radist_deadline_hit"] = True
+            break
+        # Fetch one bounded slice of chats at a time; the consumer may shrink the slice under memory pressure.
+        batch = candidates[position : position + max(1, batch_budget["rows"])]
+        position += len(batch)
+        usable_watermarks = {}
+        for candidate in batch:
+            chat_id = _to_int(candidate["chat"].get("chat_id"))
+            watermark = _usable_radist_watermark((watermarks or {}).get(str(chat_id)), window_start_ts)
+            if watermark:
+                usable_watermarks[chat_id] = watermark
+        stored_messages = {}
+        if usable_watermarks and supabase_url and service_key:
+            try:
+                stored_messages = _supabase_fetch_stored_dialogs(
+                    supabase_url,
+                    service_key,
+                    tenant_slug=tenant_slug,
+                    chat_ids=list(usable_watermarks),
+                    limiter=supabase_limiter,
+                )
+            except ConnectorError:
+                stored_messages = {}
+
+        def fetch_chat(candidate: dict) -> tuple[list[RadistMessage], str, dict]:
+            if _past_deadline(deadline):
+                return [], "", {"skipped": True}
+            chat_id = _to_int(candidate["chat"].get("chat_id"))
+            watermark = usable_watermarks.get(chat_id)
+            stored = stored_messages.get(chat_id)
+            if watermark and (stored is None or _newest_message_id(stored) != watermark["message_id"]):
+                # Stored dialog no longer matches the watermark: refetch the whole window.
+                watermark = None
+            fetch_from = window_start
+            if watermark:
+                fetch_from = max(window_start, datetime.fromtimestamp(watermark["until"], tz=dt_timezone.utc))
+            fetched = []
+            complete = True
+            requests_made = False
+            if fetch_from < window_end:
+                requests_made = True
+                try:
+                    fetched, complete = _radist_fetch_messages_in_window(
+                        base_url=base_url,
+                        company_id=company_id,
+                        headers=headers,
+                        chat_id=chat_id,
+                        window_start=fetch_from,
+                        window_end=window_end,
+                        max_pages=max_message_pages,
+                        limiter=limiter,
+                        stop_message_id=watermark["message_id"] if watermark else "",
+                        deadline=deadline,
+                    )
+                except ConnectorError as exc:
+                    return [], str(exc), {"watermark": None}
+            reused = []
+            if watermark:
+                reuse_until = min(window_end, fetch_from)
+                reused = [message for message in stored if window_start <= message.created_at < reuse_until]
+            messages = _union_messages(reused, fetched)
+            next_watermark = None
+            if complete and messages:
+                next_watermark = {
+                    "from": window_start_ts,
+                    # Small margin for messages that reach Radist with a slightly older created_at.
+                    "until": min(window_end_ts, int(time.time()) - 60),
+                    "message_id": _newest_message_id(messages),
+                }
+            return messages, "", {
+                "watermark": next_watermark,
+                "reused": len(reused),
+                "incremental": bool(watermark),
+                "requests_made": requests_made,
             }
-        )
-    return dialogs
+
+        started = time.monotonic()
+        results = _map_concurrently(fetch_chat, batch, max_workers=max_workers)
+        stats["radist_messages_ms"] += int((time.monotonic() - started) * 1000)
+        stored_messages = {}
+        chat_slice = []
+        for candidate, (messages, error, info) in zip(batch, results):
+            chat = candidate["chat"]
+            chat_id = _to_int(chat.get("chat_id"))
+            chat_slice.append((candidate["phone"], chat_id, None))
+            if info.get("skipped"):
+                # Not fetched this run: the chat keeps its previous watermark.
+                stats["radist_chats_skipped_deadline"] += 1
+                stats["radist_deadline_hit"] = True
+                continue
+            stats["radist_watermarks"][str(chat_id)] = info["watermark"]
+            if error:
+                stats["radist_chat_errors"] += 1
+                first_error = first_error or error
+                continue
+            stats["radist_chats_incremental"] += int(bool(info.get("incremental")))
+            stats["radist_chats_served_from_store"] += int(not info.get("requests_made", True))
+            stats["radist_messages_reused"] += info.get("reused", 0)
+            if not messages:
+                continue
+            stats["radist_dialogs"] += 1
+            first_dt = messages[0].created_at
+            last_dt = messages[-1].created_at
+            chat_slice[-1] = (
+                candidate["phone"],
+                chat_id,
+                {
+                    "contact_id": candidate["contact_id"],
+                    "contact_name": candidate["contact_name"] or candidate["phone"],
+                    "phone": candidate["phone"],
+                    "connection_id": chat.get("connection_id"),
+                    "chat_id": chat_id,
+                    "source_chat_id": chat.get("source_chat_id"),
+                    "messages": messages,
+                    "first_message_at": _dt_to_iso(first_dt) if first_dt else None,
+                    "last_message_at": _dt_to_iso(last_dt) if last_dt else None,
+                },
+            )
+        results = None
+        yield chat_slice
+        chat_slice = None
+
+    if candidates:
+        stats["radist_coverage"] = round(1 - stats["radist_chats_skipped_deadline"] / len(candidates), 3)
+    if first_error:
+        stats["radist_chat_error_sample"] = first_error[:300]
+    attempted = len(candidates) - stats["radist_chats_skipped_deadline"]
+    if attempted and stats["radist_chat_errors"] == attempted:
+        raise ConnectorError(f"Radist messages fetch failed for all chats: {first_error}")
+
+
+def _contact_last_activity(contact: dict) -> datetime | None:
+    return _parse_datetime(contact.get("last_chat_updated_at"))
 
 
 def _radist_fetch_messages_in_window(
@@ -385,11 +1141,18 @@ def _radist_fetch_messages_in_window(
     window_start: datetime,
     window_end: datetime,
     max_pages: int,
-) -> list[dict]:
+    limiter: TokenBucket | None = None,
+    stop_message_id: str = "",
+    deadline: float | None = None,
+) -> tuple[list[RadistMessage], bool]:
+    # Returns the window's messages and whether paging reached the window start (or the watermark).
     all_messages = []
     seen = set()
     until = None
-    for _ in range(max_pages):
+    complete = False
+    for page_no in range(max_pages):
+        if page_no and _past_deadline(deadline):
+            break
         params = {"chat_id": str(chat_id), "limit": "100"}
         if until:
             params["until"] = until
@@ -400,13 +1163,18 @@ def _radist_fetch_messages_in_window(
             headers=headers,
             timeout=15,
             max_attempts=3,
+            limiter=limiter,
         )
         if not isinstance(batch, list) or not batch:
+            complete = True
             break
 
         oldest = None
+        reached_watermark = False
         for message in batch:
             message_id = message.get("message_id")
+            if stop_message_id and message_id == stop_message_id:
+                reached_watermark = True
             if message_id and message_id in seen:
                 continue
             if message_id:
@@ -415,95 +1183,288 @@ def _radist_fetch_messages_in_window(
             if not created_at:
                 continue
             if window_start <= created_at < window_end:
-                all_messages.append(message)
+                all_messages.append(_message_record(message, created_at))
             if oldest is None or created_at < oldest:
                 oldest = created_at
 
-        if len(batch) < 100:
+        if len(batch) < 100 or reached_watermark or (oldest is not None and oldest < window_start):
+            complete = True
             break
-        if oldest is None or oldest < window_start:
+        if oldest is None:
             break
         until = _dt_to_iso(oldest - timedelta(milliseconds=1))
-    all_messages.sort(key=lambda item: _parse_datetime(item.get("created_at")) or datetime.min.replace(tzinfo=dt_timezone.utc))
-    return all_messages
+    all_messages.sort(key=_message_sort_key)
+    return all_messages, complete
+
+
+def _usable_radist_watermark(watermark: dict | None, window_start_ts: int) -> dict | None:
+    if not isinstance(watermark, dict):
+        return None
+    covered_from = _to_int(watermark.get("from"))
+    covered_until = _to_int(watermark.get("until"))
+    message_id = str(watermark.get("message_id") or "")
+    # The stored dialog must reach back to the window start and leave no gap before the new tail.
+    if covered_from <= 0 or not message_id or not covered_from <= window_start_ts <= covered_until:
+        return None
+    return {"from": covered_from, "until": covered_until, "message_id": message_id}
+
+
+def _newest_message_id(messages: list[RadistMessage]) -> str:
+    newest = max(messages, key=_message_sort_key, default=None)
+    return newest.message_id if newest else ""
+
+
+def _union_messages(stored: list[RadistMessage], fetched: list[RadistMessage]) -> list[RadistMessage]:
+    messages = []
+    seen = set()
+    for message in [*stored, *fetched]:
+        if message.message_id and message.message_id in seen:
+            continue
+        if message.message_id:
+            seen.add(message.message_id)
+        messages.append(message)
+    messages.sort(key=_message_sort_key)
+    return messages
+
+
+def _supabase_fetch_stored_dialogs(
+    supabase_url: str,
+    service_key: str,
+    *,
+    tenant_slug: str,
+    chat_ids: list[int],
+    limiter: TokenBucket | None = None,
+) -> dict[int, list[RadistMessage]]:
+    headers = {
+        "apikey": service_key,
+        "Authorization": f"Bearer {service_key}",
+        "User-Agent": "synkro-etl/1.0",
+    }
+    unique_ids = sorted(set(chat_ids))
+    stored: dict[int, list[RadistMessage]] = {}
+    for index in range(0, len(unique_ids), SUPABASE_FINGERPRINT_BATCH):
+        batch = unique_ids[index : index + SUPABASE_FINGERPRINT_BATCH]
+        params = [
+            ("select", "chat_id,dialog_raw"),
+            ("tenant_id", f"eq.{tenant_slug}"),
+            ("chat_id", f"in.({','.join(str(chat_id) for chat_id in batch)})"),
+            ("order", "last_message_at.desc.nullslast"),
+        ]
+        payload = _request_json(
+            "GET",
+            f"{supabase_url}/rest/v1/deals?{urlencode(params)}",
+            headers=headers,
+            timeout=30,
+            max_attempts=3,
+            limiter=limiter,
+        )
+        for item in payload if isinstance(payload, list) else []:
+            chat_id = _to_int(item.get("chat_id"))
+            if chat_id and chat_id not in stored and isinstance(item.get("dialog_raw"), list):
+                stored[chat_id] = [
+                    record
+                    for record in (_message_record(message) for message in item["dialog_raw"])
+                    if record is not None
+                ]
+    return stored
 
 
 def _merge_rows(
-    *, tenant_slug: str, mode: str, amo_rows: list[dict], radist_dialogs: list[dict]
-) -> list[dict]:
+    *,
+    tenant_slug: str,
+    mode: str,
+    amo_rows: list[dict],
+    radist_dialogs: Iterable[dict] = (),
+    chat_plan: list[tuple[str, int]] | None = None,
+    chat_slices: Iterable[list[tuple[str, int, dict | None]]] | None = None,
+) -> Iterator[dict]:
+    # chat_plan / chat_slices: the planned Radist chats and _fetch_radist_chats output; without
+    # them radist_dialogs is read in full.
+    if chat_slices is not None and mode == "radist_only":
+        radist_dialogs = (dialog for chat_slice in chat_slices for _, _, dialog in chat_slice if dialog)
     if mode == "amocrm_only":
-        return [_finalize_supabase_row(tenant_slug, row) for row in amo_rows]
+        for row in amo_rows:
+            yield _finalize_supabase_row(tenant_slug, row)
+        return
     if mode == "radist_only":
-        rows = []
         for dialog in radist_dialogs:
             synthetic_id = -abs(_stable_numeric_id(f"radist:{dialog.get('chat_id') or dialog.get('source_chat_id') or dialog.get('phone')}"))
-            rows.append(
-                _finalize_supabase_row(
-                    tenant_slug,
-                    {
-                        "deal_id": synthetic_id,
-                        "deal_name": (dialog.get("contact_name") or dialog.get("phone") or f"Chat {dialog.get('chat_id')}"),
-                        "status_id": None,
-                        "status": "radist_chat",
-                        "responsible": "",
-                        "phone": dialog.get("phone") or "",
-                        "chat_id": dialog.get("chat_id"),
-                        "first_message_at": dialog.get("first_message_at"),
-                        "last_message_at": dialog.get("last_message_at"),
-                        "messages_count": len(dialog.get("messages") or []),
-                        "deal_attrs_json": {
-                            "source": "radist",
-                            "connection_id": dialog.get("connection_id"),
-                            "mode": mode,
-                        },
-                        "contact_attrs_json": {
-                            "contact_id": dialog.get("contact_id"),
-                            "contact_name": dialog.get("contact_name"),
-                            "source_chat_id": dialog.get("source_chat_id"),
-                        },
-                        "dialog_raw": dialog.get("messages") or [],
-                        "dialog_norm": _format_dialog_norm(dialog.get("messages") or []),
-                        "comment": "",
+            yield _finalize_supabase_row(
+                tenant_slug,
+                {
+                    "deal_id": synthetic_id,
+                    "deal_name": (dialog.get("contact_name") or dialog.get("phone") or f"Chat {dialog.get('chat_id')}"),
+                    "status_id": None,
+                    "status": "radist_chat",
+                    "responsible": "",
+                    "phone": dialog.get("phone") or "",
+                    "chat_id": dialog.get("chat_id"),
+                    "first_message_at": dialog.get("first_message_at"),
+                    "last_message_at": dialog.get("last_message_at"),
+                    "messages_count": len(dialog.get("messages") or []),
+                    "deal_attrs_json": {
+                        "source": "radist",
+                        "connection_id": dialog.get("connection_id"),
+                        "mode": mode,
                     },
-                )
+                    "contact_attrs_json": {
+                        "contact_id": dialog.get("contact_id"),
+                        "contact_name": dialog.get("contact_name"),
+                        "source_chat_id": dialog.get("source_chat_id"),
+                    },
+                    "dialog_raw": [message.raw for message in dialog.get("messages") or []],
+                    "dialog_norm": _format_dialog_norm(dialog.get("messages") or []),
+                    "comment": "",
+                },
             )
-        return rows
+        return
+
+    if chat_slices is None:
+        # All dialogs at once (benchmarks, callers without a chat plan): a single slice.
+        dialogs = [dialog for dialog in radist_dialogs if dialog.get("phone")]
+        chat_plan = [(dialog["phone"], dialog.get("chat_id")) for dialog in dialogs]
+        chat_slices = [[(dialog["phone"], dialog.get("chat_id"), dialog) for dialog in dialogs]]
+    yield from _join_amo_rows(tenant_slug, amo_rows, chat_plan or [], chat_slices)
+
+
+def _join_amo_rows(
+    tenant_slug: str,
+    amo_rows: list[dict],
+    chat_plan: list[tuple[str, int]],
+    chat_slices: Iterable[list[tuple[str, int, dict | None]]],
+) -> Iterator[dict]:
+    # amocrm_radist: hash join on the normalized (interned) phone, streamed over chat slices. A row
+    # is emitted once every planned chat on its phones is done, and a phone's dialog is dropped
+    # once its last row is out, so only the dialogs of rows still waiting stay in memory.
+    chats_by_phone: dict[str, list[int]] = {}
+    for phone, chat_id in chat_plan:
+        chats_by_phone.setdefault(phone, []).append(chat_id)
+    pending = [0] * len(amo_rows)
+    waiting: dict[tuple[str, int], list[int]] = {}
+    rows_left: dict[str, int] = {}
+    for index, row in enumerate(amo_rows):
+        for phone in dict.fromkeys(row.get("_phones") or ()):
+            chat_ids = chats_by_phone.get(phone)
+            if not chat_ids:
+                continue
+            rows_left[phone] = rows_left.get(phone, 0) + 1
+            for chat_id in chat_ids:
+                waiting.setdefault((phone, chat_id), []).append(index)
+                pending[index] += 1
+    chats_by_phone = None
+
+    # Each phone keeps its best dialog; ranks are only computed when two chats share a phone.
+    best_by_phone: dict[str, dict] = {}
+    extra_chats: dict[str, set] = {}
+    rendered: dict[int, tuple[list, str]] = {}
+
+    def emit(index: int) -> dict:
+        row = amo_rows[index]
+        merged = _join_amo_row(tenant_slug, row, best_by_phone, extra_chats, rendered)
+        for phone in dict.fromkeys(row.get("_phones") or ()):
+            if phone not in rows_left:
+                continue
+            rows_left[phone] -= 1
+            if not rows_left[phone]:
+                del rows_left[phone]
+                dialog = best_by_phone.pop(phone, None)
+                extra_chats.pop(phone, None)
+                if dialog is not None:
+                    rendered.pop(id(dialog), None)
+        return merged
+
+    for index, count in enumerate(pending):
+        if not count:
+            yield emit(index)
+    for chat_slice in chat_slices:
+        ready = []
+        for phone, chat_id, dialog in chat_slice:
+            if dialog is not None and phone in rows_left:
+                prev = best_by_phone.get(phone)
+                if prev is None:
+                    best_by_phone[phone] = dialog
+                else:
+                    extra_chats.setdefault(phone, {prev.get("chat_id")}).add(dialog.get("chat_id"))
+                    if _dialog_rank(dialog) > _dialog_rank(prev):
+                        best_by_phone[phone] = dialog
+            for index in waiting.pop((phone, chat_id), ()):
+                pending[index] -= 1
+                if not pending[index]:
+                    ready.append(index)
+        for index in sorted(ready):
+            yield emit(index)
+    # Chats never fetched (deadline): their rows go out with whatever dialogs did arrive.
+    for index, count in enumerate(pending):
+        if count:
+            pending[index] = 0
+            yield emit(index)
 
-    # amocrm_radist
-    dialog_by_phone = {}
-    for dialog in radist_dialogs:
-        phone = dialog.get("phone") or ""
-        if not phone:
+
+def _join_amo_row(
+    tenant_slug: str,
+    row: dict,
+    best_by_phone: dict[str, dict],
+    extra_chats: dict[str, set],
+    rendered: dict[int, tuple[list, str]],
+) -> dict:
+    dialog = None
+    chat_ids = None
+    for phone in row.get("_phones") or ():
+        candidate = best_by_phone.get(phone)
+        if candidate is None:
             continue
-        prev = dialog_by_phone.get(phone)
-        if not prev:
-            dialog_by_phone[phone] = dialog
+        if dialog is None:
+            dialog = candidate
+            if phone in extra_chats:
+                chat_ids = set(extra_chats[phone])
             continue
-        if (prev.get("last_message_at") or "") < (dialog.get("last_message_at") or ""):
-            dialog_by_phone[phone] = dialog
-
-    merged = []
-    for row in amo_rows:
-        phones = row.get("_phones", [])
-        dialog = next((dialog_by_phone.get(phone) for phone in phones if dialog_by_phone.get(phone)), None)
-        merged_row = dict(row)
-        if dialog:
-            merged_row["phone"] = dialog.get("phone") or merged_row.get("phone") or ""
-            merged_row["chat_id"] = dialog.get("chat_id")
-            merged_row["first_message_at"] = dialog.get("first_message_at")
-            merged_row["last_message_at"] = dialog.get("last_message_at")
-            merged_row["messages_count"] = len(dialog.get("messages") or [])
-            merged_row["dialog_raw"] = dialog.get("messages") or []
-            merged_row["dialog_norm"] = _format_dialog_norm(dialog.get("messages") or [])
-        merged.append(_finalize_supabase_row(tenant_slug, merged_row))
-    return merged
+        # Several dialogs for one deal: keep all chat ids on record, attach the best dialog.
+        if chat_ids is None:
+            chat_ids = {dialog.get("chat_id")}
+        chat_ids |= extra_chats.get(phone) or {candidate.get("chat_id")}
+        if _dialog_rank(candidate) > _dialog_rank(dialog):
+            dialog = candidate
+    if dialog is None:
+        return _finalize_supabase_row(tenant_slug, row)
+    # One dialog may serve several deals: render its transcript once.
+    key = id(dialog)
+    if key not in rendered:
+        messages = dialog.get("messages") or []
+        rendered[key] = ([message.raw for message in messages], _format_dialog_norm(messages))
+    dialog_raw, dialog_norm = rendered[key]
+    contact_attrs = row.get("contact_attrs_json") or {}
+    if chat_ids:
+        chat_ids.discard(dialog.get("chat_id"))
+        if chat_ids:
+            contact_attrs = {**contact_attrs, "other_chat_ids": sorted(chat_ids)}
+    return _finalize_supabase_row(
+        tenant_slug,
+        {
+            **row,
+            "phone": dialog.get("phone") or row.get("phone") or "",
+            "chat_id": dialog.get("chat_id"),
+            "first_message_at": dialog.get("first_message_at"),
+            "last_message_at": dialog.get("last_message_at"),
+            "messages_count": len(dialog.get("messages") or []),
+            "contact_attrs_json": contact_attrs,
+            "dialog_raw": dialog_raw,
+            "dialog_norm": dialog_norm,
+        },
+    )
+
+
+def _dialog_rank(dialog: dict) -> tuple:
+    # Latest message wins, then the longer dialog, then the lower chat id: stable across runs.
+    messages = dialog.get("messages") or []
+    last = messages[-1].created_at if messages else MIN_MESSAGE_TIME
+    return last, len(messages), -_to_int(dialog.get("chat_id"))
 
 
 def _finalize_supabase_row(tenant_slug: str, row: dict) -> dict:
     deal_id = int(row.get("deal_id") or 0)
     if deal_id == 0:
         deal_id = _stable_numeric_id(f"deal:{row.get('deal_name')}")
-    return {
+    finalized = {
         "tenant_id": tenant_slug,
         "deal_id": deal_id,
         "deal_name": (row.get("deal_name") or f"Deal {deal_id}")[:500],
@@ -521,24 +1482,311 @@ def _finalize_supabase_row(tenant_slug: str, row: dict) -> dict:
         "dialog_norm": row.get("dialog_norm") or "",
         "comment": row.get("comment") or "",
     }
+    finalized["content_hash"] = _row_fingerprint(finalized)
+    return finalized
+
+
+def _row_fingerprint(row: dict) -> str:
+    # Canonical JSON so that key order, whitespace and the JSON backend never change the hash.
+    canonical = canonical_bytes({key: value for key, value in row.items() if key != "content_hash"})
+    return hashlib.sha256(canonical).hexdigest()
+
+
+def _filter_unchanged_rows(
+    supabase_url: str,
+    service_key: str,
+    *,
+    tenant_slug: str,
+    rows: list[dict],
+    limiter: TokenBucket | None = None,
+) -> tuple[list[dict], dict]:
+    stats = {"upsert_rows_skipped": 0, "upsert_rows_inserted": 0, "upsert_rows_changed": 0}
+    if not rows:
+        return rows, stats
+    try:
+        stored = _supabase_fetch_content_hashes(
+            supabase_url,
+            service_key,
+            tenant_slug=tenant_slug,
+            deal_ids=[row["deal_id"] for row in rows],
+            limiter=limiter,
+        )
+    except ConnectorError as exc:
+        if "content_hash" in str(exc):
+            # Migration 003 is not applied yet: upsert everything without the fingerprint column.
+            stats["upsert_fingerprints"] = "missing_column"
+            stats["upsert_rows_changed"] = len(rows)
+            return [{key: value for key, value in row.items() if key != "content_hash"} for row in rows], stats
+        stats["upsert_fingerprints"] = "unavailable"
+        stats["upsert_rows_changed"] = len(rows)
+        return rows, stats
+
+    changed = []
+    for row in rows:
+        stored_hash = stored.get(row["deal_id"])
+        if stored_hash is None and row["deal_id"] not in stored:
+            stats["upsert_rows_inserted"] += 1
+        elif stored_hash == row["content_hash"]:
+            stats["upsert_rows_skipped"] += 1
+            continue
+        else:
+            stats["upsert_rows_changed"] += 1
+        changed.append(row)
+    return changed, stats
+
+
+def _supabase_fetch_content_hashes(
+    supabase_url: str,
+    service_key: str,
+    *,
+    tenant_slug: str,
+    deal_ids: list[int],
+    limiter: TokenBucket | None = None,
+) -> dict[int, str | None]:
+    headers = {
+        "apikey": service_key,
+        "Authorization": f"Bearer {service_key}",
+        "User-Agent": "synkro-etl/1.0",
+    }
+    unique_ids = sorted(set(deal_ids))
+    batches = [
+        unique_ids[index : index + SUPABASE_FINGERPRINT_BATCH]
+        for index in range(0, len(unique_ids), SUPABASE_FINGERPRINT_BATCH)
+    ]
+    stored: dict[int, str | None] = {}
+    for batch in batches:
+        params = [
+            ("select", "deal_id,content_hash"),
+            ("tenant_id", f"eq.{tenant_slug}"),
+            ("deal_id", f"in.({','.join(str(deal_id) for deal_id in batch)})"),
+        ]
+        payload = _request_json(
+            "GET",
+            f"{supabase_url}/rest/v1/deals?{urlencode(params)}",
+            headers=headers,
+            timeout=15,
+            max_attempts=3,
+            limiter=limiter,
+        )
+        for item in payload if isinstance(payload, list) else []:
+            stored[_to_int(item.get("deal_id"))] = item.get("content_hash")
+    return stored
 
 
-def _supabase_upsert_deals(supabase_url: str, service_key: str, rows: list[dict]) -> None:
+def _tap_window_records(
+    rows: Iterable[dict],
+    sink: list[dict],
+    stats: dict,
+    *,
+    window_start: datetime,
+    window_end: datetime,
+    limit: int,
+    min_messages: int = 0,
+) -> Iterator[dict]:
+    # Passes rows through and keeps the projection of the newest `limit` rows whose last message
+    # falls in the window: what a deals read ordered by last_message_at, deal_id desc would return.
+    newest: list[tuple[datetime, int, int, dict]] = []
+    for index, row in enumerate(rows):
+        last_message_at = _parse_datetime(row.get("last_message_at"))
+        if (
+            last_message_at is not None
+            and window_start <= last_message_at < window_end
+            and int(row.get("messages_count") or 0) >= min_messages
+        ):
+            stats["window_rows"] += 1
+            record = {field: row.get(field) for field in WINDOW_RECORD_FIELDS}
+            item = (last_message_at, _to_int(row.get("deal_id")), index, record)
+            if len(newest) < limit:
+                heapq.heappush(newest, item)
+            elif item[:3] > newest[0][:3]:
+                heapq.heapreplace(newest, item)
+        yield row
+    sink.extend(item[3] for item in sorted(newest, key=lambda item: item[:3], reverse=True))
+
+
+def _upsert_rows_in_batches(
+    rows: Iterable[dict],
+    *,
+    supabase_url: str,
+    service_key: str,
+    tenant_slug: str,
+    limiter: TokenBucket | None,
+    batch_budget: dict,
+    memory_limit_mb: int,
+    **upsert_options,
+) -> tuple[dict, set[str]]:
+    stats = {
+        "upsert_rows": 0,
+        "upsert_rows_skipped": 0,
+        "upsert_rows_inserted": 0,
+        "upsert_rows_changed": 0,
+        "sync_batches": 0,
+        "sync_memory_limit_mb": memory_limit_mb,
+        "sync_memory_throttled": 0,
+        "sync_rss_peak_mb": current_rss_mb(),
+    }
+    stored_chat_ids: set[str] = set()
+    batch: list[dict] = []
+
+    def flush() -> None:
+        changed_rows, fingerprint_stats = _filter_unchanged_rows(
+            supabase_url,
+            service_key,
+            tenant_slug=tenant_slug,
+            rows=batch,
+            limiter=limiter,
+        )
+        _accumulate_stats(stats, fingerprint_stats)
+        if changed_rows:
+            _accumulate_stats(
+                stats,
+                _supabase_upsert_deals(supabase_url, service_key, changed_rows, limiter=limiter, **upsert_options),
+            )
+        stats["sync_batches"] += 1
+        rss = current_rss_mb()
+        stats["sync_rss_peak_mb"] = max(stats["sync_rss_peak_mb"], rss)
+        if rss > memory_limit_mb and batch_budget["rows"] > 10:
+            # Over budget: halve the batch (and the Radist chat slice that shares it).
+            batch_budget["rows"] = max(10, batch_budget["rows"] // 2)
+            stats["sync_memory_throttled"] += 1
+
+    for row in rows:
+        stats["upsert_rows"] += 1
+        if row.get("chat_id") and row.get("dialog_raw"):
+            stored_chat_ids.add(str(row["chat_id"]))
+        batch.append(row)
+        if len(batch) >= batch_budget["rows"]:
+            flush()
+            batch = []
+    if batch:
+        flush()
+        batch = []
+    stats["sync_batch_rows"] = batch_budget["rows"]
+    return stats, stored_chat_ids
+
+
+def _accumulate_stats(total: dict, part: dict) -> None:
+    for key, value in part.items():
+        current = total.get(key)
+        if isinstance(value, bool):
+            total[key] = value if current is None else bool(current) and value
+        elif isinstance(value, (int, float)) and isinstance(current, (int, float)):
+            total[key] = current + value
+        elif isinstance(value, list) and isinstance(current, list):
+            total[key] = (current + value)[:50]
+        else:
+            total[key] = value
+
+
+def _supabase_upsert_deals(
+    supabase_url: str,
+    service_key: str,
+    rows: list[dict],
+    *,
+    limiter: TokenBucket | None = None,
+    max_workers: int = 1,
+    max_rows: int = SUPABASE_UPSERT_MAX_ROWS,
+    max_bytes: int = SUPABASE_UPSERT_MAX_BYTES,
+    compress: bool = True,
+) -> dict:
     endpoint = f"{supabase_url}/rest/v1/deals?on_conflict=tenant_id,deal_id"
-    _request_json(
-        "POST",
-        endpoint,
-        headers={
-            "apikey": service_key,
-            "Authorization": f"Bearer {service_key}",
-            "Content-Type": "application/json; charset=utf-8",
-            "Prefer": "resolution=merge-duplicates,return=minimal",
-            "User-Agent": "synkro-etl/1.0",
-        },
-        payload=rows,
+    headers = {
+        "apikey": service_key,
+        "Authorization": f"Bearer {service_key}",
+        "Content-Type": "application/json; charset=utf-8",
+        "Prefer": "resolution=merge-duplicates,return=minimal",
+        "User-Agent": "synkro-etl/1.0",
+    }
+    encoded_rows = [dumps_bytes(row) for row in rows]
+    chunks = _chunk_encoded_rows(encoded_rows, max_rows=max_rows, max_bytes=max_bytes)
+    gzip_key = f"{GZIP_UNSUPPORTED_CACHE_PREFIX}:{(urlsplit(supabase_url).hostname or supabase_url).lower()}"
+    gzip_enabled = [compress and not cache.get(gzip_key)]
+
+    def send_chunk(chunk: list[bytes]) -> dict:
+        started = time.monotonic()
+        body = b"[" + b",".join(chunk) + b"]"
+        stat = {"rows": len(chunk), "bytes": len(body), "wire_bytes": len(body), "error": ""}
+        try:
+            gzip_rejected = False
+            if gzip_enabled[0]:
+                compressed = gzip.compress(body, compresslevel=5)
+                try:
+                    _request(
+                        "POST",
+                        endpoint,
+                        headers={**headers, "Content-Encoding": "gzip"},
+                        body=compressed,
+                        max_attempts=3,
+                        limiter=limiter,
+                    )
+                    stat["wire_bytes"] = len(compressed)
+                    stat["ms"] = int((time.monotonic() - started) * 1000)
+                    return stat
+                except ConnectorError as exc:
+                    # Gateways without request decompression reject the body; fall back to plain JSON.
+                    # Any other 400 (a bad row) is the chunk's own error and keeps gzip on.
+                    if not _gzip_rejected(str(exc)):
+                        raise
+                    gzip_rejected = True
+            _request("POST", endpoint, headers=headers, body=body, max_attempts=3, limiter=limiter)
+            if gzip_rejected:
+                # Remembered only once the same chunk went through as plain JSON.
+                gzip_enabled[0] = False
+                cache.set(gzip_key, 1, timeout=GZIP_UNSUPPORTED_TTL)
+        except ConnectorError as exc:
+            stat["error"] = str(exc)
+        stat["ms"] = int((time.monotonic() - started) * 1000)
+        return stat
+
+    started = time.monotonic()
+    results = _map_concurrently(send_chunk, chunks, max_workers=max_workers)
+    for index, result in enumerate(results):
+        if result["error"]:
+            retried = send_chunk(chunks[index])
+            retried["retried"] = True
+            results[index] = retried
+    failed = [result for result in results if result["error"]]
+    if failed:
+        raise ConnectorError(
+            f"Supabase upsert failed for {len(failed)} of {len(chunks)} chunks: {failed[0]['error']}"
+        )
+    return {
+        "upsert_chunks": len(chunks),
+        "upsert_bytes": sum(result["bytes"] for result in results),
+        "upsert_wire_bytes": sum(result["wire_bytes"] for result in results),
+        "upsert_gzip": gzip_enabled[0],
+        "upsert_ms": int((time.monotonic() - started) * 1000),
+        "upsert_chunk_stats": [
+            {key: value for key, value in result.items() if key != "error"} for result in results[:50]
+        ],
+    }
+
+
+def _gzip_rejected(error: str) -> bool:
+    if error.startswith("HTTP 415"):
+        return True
+    return error.startswith("HTTP 400") and any(
+        marker in error.lower() for marker in ("gzip", "content-encoding", "compress")
     )
 
 
+def _chunk_encoded_rows(encoded_rows: list[bytes], *, max_rows: int, max_bytes: int) -> list[list[bytes]]:
+    chunks: list[list[bytes]] = []
+    current: list[bytes] = []
+    current_bytes = 2
+    for encoded in encoded_rows:
+        row_bytes = len(encoded) + 1
+        if current and (len(current) >= max_rows or current_bytes + row_bytes > max_bytes):
+            chunks.append(current)
+            current = []
+            current_bytes = 2
+        current.append(encoded)
+        current_bytes += row_bytes
+    if current:
+        chunks.append(current)
+    return chunks
+
+
 def _request_json(
     method: str,
     url: str,
@@ -547,46 +1795,172 @@ def _request_json(
     payload=None,
     timeout: int = 30,
     max_attempts: int = 6,
+    limiter: TokenBucket | None = None,
 ):
+    body = None
+    if payload is not None:
+        body = dumps_bytes(payload)
+    response = _request(
+        method,
+        url,
+        headers=headers,
+        body=body,
+        timeout=timeout,
+        max_attempts=max_attempts,
+        limiter=limiter,
+        revalidate=method == "GET",
+    )
+    return _decode_json(response)
+
+
+def _request(
+    method: str,
+    url: str,
+    *,
+    headers: dict | None = None,
+    body: bytes | None = None,
+    timeout: int = 30,
+    max_attempts: int = 6,
+    limiter: TokenBucket | None = None,
+    revalidate: bool = False,
+) -> HTTPResponse:
+    client = get_http_client()
+    breaker = get_circuit_breaker(limiter.key, limiter.kind) if limiter is not None and limiter.key else None
     last_error = None
     for attempt in range(1, max_attempts + 1):
-        req = Request(url, method=method)
-        if headers:
-            for key, value in headers.items():
-                req.add_header(key, value)
-        body = None
-        if payload is not None:
-            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        if attempt > 1:
+            record_http_retry(url)
+        if breaker is not None and not breaker.allow():
+            # Upstream is known to be down: fail fast instead of burning the worker on retries.
+            snapshot = breaker.snapshot()
+            raise ConnectorError(
+                f"{CIRCUIT_ERROR_PREFIX} for {breaker.kind}: {snapshot.get('last_error') or last_error or 'upstream unavailable'}"
+            )
+        if limiter is not None:
+            limiter.acquire()
+        retry_after = None
         try:
-            with urlopen(req, data=body, timeout=timeout) as response:
-                raw = response.read().decode("utf-8") if response else ""
-                if not raw:
-                    return {}
-                return json.loads(raw)
-        except HTTPError as exc:
-            error_body = ""
-            try:
-                error_body = exc.read().decode("utf-8")
-            except Exception:
-                error_body = ""
-            retriable = exc.code in {408, 425, 429, 500, 502, 503, 504}
-            last_error = f"HTTP {exc.code}: {error_body[:500]}"
-            if not retriable or attempt >= max_attempts:
-                raise ConnectorError(last_error) from exc
-        except URLError as exc:
+            response = client.request(
+                method, url, headers=headers, body=body, timeout=timeout, revalidate=revalidate
+            )
+        except HTTPTransportError as exc:
+            _record_traffic(url, len(body or b""), None)
             last_error = f"Network error: {exc.reason}"
+            if breaker is not None:
+                breaker.record_failure(last_error)
             if attempt >= max_attempts:
                 raise ConnectorError(last_error) from exc
-        except (UnicodeDecodeError, json.JSONDecodeError) as exc:
-            last_error = "Failed to parse API response."
-            raise ConnectorError(last_error) from exc
-        time.sleep(min(2 * attempt, 15))
+        else:
+            _record_traffic(url, len(body or b""), response)
+            # Only outages count against the breaker; 4xx and throttling mean the host is up.
+            if breaker is not None:
+                if response.status in BREAKER_FAILURE_STATUSES:
+                    breaker.record_failure(f"HTTP {response.status}")
+                else:
+                    breaker.record_success()
+            if response.status < 400:
+                return response
+            error_body = response.body.decode("utf-8", errors="replace")
+            retriable = response.status in {408, 425, 429, 500, 502, 503, 504}
+            last_error = f"HTTP {response.status}: {error_body[:500]}"
+            if not retriable or attempt >= max_attempts:
+                raise ConnectorError(last_error)
+            retry_after = parse_retry_after(response.headers.get("retry-after"))
+            if retry_after is None and response.status == 429:
+                retry_after = backoff_delay(attempt, base=2.0)
+        if retry_after is not None and limiter is not None:
+            # Throttling applies to the whole credential, so park every thread sharing the bucket.
+            limiter.pause(retry_after)
+        else:
+            time.sleep(retry_after if retry_after is not None else backoff_delay(attempt))
     raise ConnectorError(last_error or "Request failed")
 
 
+def _record_traffic(url: str, bytes_out: int, response: HTTPResponse | None) -> None:
+    kind = integration_kind(url)
+    with _traffic_lock:
+        counters = _traffic.setdefault(
+            kind,
+            {"requests": 0, "bytes_out": 0, "bytes_in": 0, "wire_bytes_in": 0, "not_modified": 0},
+        )
+        counters["requests"] += 1
+        counters["bytes_out"] += bytes_out
+        if response is not None:
+            counters["bytes_in"] += len(response.body)
+            counters["wire_bytes_in"] += response.wire_bytes
+            counters["not_modified"] += int(response.from_cache or response.status == 304)
+
+
+def _traffic_delta(before: dict, after: dict) -> dict:
+    delta = {}
+    for kind, counters in after.items():
+        previous = before.get(kind) or {}
+        changes = {key: value - previous.get(key, 0) for key, value in counters.items()}
+        if changes.get("requests"):
+            delta[kind] = changes
+    return delta
+
+
+def _decode_json(response: HTTPResponse):
+    try:
+        if not response.body:
+            return {}
+        return loads(response.body)
+    except (UnicodeDecodeError, JSONDecodeError) as exc:
+        raise ConnectorError("Failed to parse API response.") from exc
+
+
+def _request_reference_json(
+    url: str,
+    *,
+    cache_key: str,
+    ttl: int,
+    cache_stats: dict,
+    headers: dict,
+    limiter: TokenBucket | None = None,
+):
+    entry = get_reference(cache_key)
+    if entry and entry.get("expires_at", 0) > time.time():
+        cache_stats["reference_cache_hits"] = cache_stats.get("reference_cache_hits", 0) + 1
+        return entry.get("payload")
+
+    request_headers = dict(headers)
+    if entry and entry.get("etag"):
+        request_headers["If-None-Match"] = entry["etag"]
+    if entry and entry.get("last_modified"):
+        request_headers["If-Modified-Since"] = entry["last_modified"]
+    response = _request(
+        "GET", url, headers=request_headers, timeout=15, max_attempts=3, limiter=limiter
+    )
+    if response.status == 304 and entry:
+        cache_stats["reference_cache_revalidated"] = cache_stats.get("reference_cache_revalidated", 0) + 1
+        payload = entry.get("payload")
+    else:
+        cache_stats["reference_cache_misses"] = cache_stats.get("reference_cache_misses", 0) + 1
+        payload = _decode_json(response)
+    set_reference(
+        cache_key,
+        payload,
+        ttl=ttl,
+        etag=response.headers.get("etag") or (entry or {}).get("etag", ""),
+        last_modified=response.headers.get("last-modified") or (entry or {}).get("last_modified", ""),
+    )
+    return payload
+
+
+def _map_concurrently(func, items: list, *, max_workers: int) -> list:
+    if max_workers <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(
+        max_workers=min(max_workers, len(items)), thread_name_prefix="synkro-sync"
+    ) as executor:
+        return list(executor.map(func, items))
+
+
 def _normalize_phone(value: str) -> str:
     raw = str(value or "")
-    digits = "".join(ch for ch in raw if ch.isdigit())
+    # Already digits-only (e.g. normalized earlier): skip the per-character scan.
+    digits = raw if raw.isdigit() else "".join(ch for ch in raw if ch.isdigit())
     if not digits:
         return ""
     if len(digits) == 10:
@@ -595,7 +1969,8 @@ def _normalize_phone(value: str) -> str:
         digits = "7" + digits[1:]
     elif len(digits) > 11:
         digits = digits[-11:]
-    return digits
+    # Interned: phones are dict keys on both sides of the amoCRM/Radist join.
+    return sys.intern(digits)
 
 
 def _parse_datetime(value) -> datetime | None:
@@ -629,6 +2004,10 @@ def _stable_numeric_id(seed: str) -> int:
     return int(digest, 16)
 
 
+def _past_deadline(deadline: float | None) -> bool:
+    return deadline is not None and time.monotonic() >= deadline
+
+
 def _bounded_int(value, default: int, minimum: int, maximum: int) -> int:
     try:
         parsed = int(value)
@@ -644,28 +2023,41 @@ def _to_int(value) -> int:
         return 0
 
 
-def _format_dialog_norm(messages: list[dict]) -> str:
+def _format_dialog_norm(messages: list[RadistMessage]) -> str:
     lines = []
-    sorted_messages = sorted(
-        messages,
-        key=lambda item: _parse_datetime(item.get("created_at")) or datetime.min.replace(tzinfo=dt_timezone.utc),
-    )
-    for message in sorted_messages:
-        created = _parse_datetime(message.get("created_at"))
-        ts = created.astimezone(dt_timezone.utc).strftime("%Y-%m-%d %H:%M:%S") if created else "unknown-time"
-        direction = str(message.get("direction") or "").lower()
-        actor = "client" if direction == "inbound" else "agent"
-        text = _extract_message_text(message)
-        files = _extract_attachments(message)
-        line = f"{ts}  {actor}:"
-        if text:
-            line += f" {text}"
-        if files:
-            line += " [files: " + ", ".join(sorted(set(files))) + "]"
+    for message in sorted(messages, key=_message_sort_key):
+        ts = "unknown-time"
+        if message.created_at != MIN_MESSAGE_TIME:
+            ts = message.created_at.strftime("%Y-%m-%d %H:%M:%S")
+        line = f"{ts}  {message.actor}:"
+        if message.text:
+            line += f" {message.text}"
+        if message.files:
+            line += " [files: " + ", ".join(sorted(set(message.files))) + "]"
         lines.append(line)
     return "\n".join(lines)
 
 
+def _message_record(message: dict, created_at: datetime | None = None) -> RadistMessage | None:
+    if not isinstance(message, dict):
+        return None
+    if created_at is None:
+        created_at = _parse_datetime(message.get("created_at"))
+    direction = str(message.get("direction") or "").lower()
+    return RadistMessage(
+        created_at=created_at or MIN_MESSAGE_TIME,
+        message_id=str(message.get("message_id") or ""),
+        actor="client" if direction == "inbound" else "agent",
+        text=_extract_message_text(message),
+        files=tuple(_extract_attachments(message)),
+        raw=message,
+    )
+
+
+def _message_sort_key(message: RadistMessage) -> datetime:
+    return message.created_at
+
+
 def _extract_message_text(message: dict) -> str:
     text_value = ((message.get("text") or {}).get("text") or "").strip()
     if text_value:
@@ -1,11 +1,12 @@
 import base64
 import hashlib
-import json
 from typing import Any, Dict
 
 from cryptography.fernet import Fernet
 from django.conf import settings
 
+from .jsoncodec import dumps_bytes, loads
+
 
 def _derive_key(raw_key: str) -> bytes:
     digest = hashlib.sha256(raw_key.encode("utf-8")).digest()
@@ -18,7 +19,7 @@ def _get_fernet() -> Fernet:
 
 
 def encrypt_payload(payload: Dict[str, Any]) -> str:
-    data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    data = dumps_bytes(payload)
     return _get_fernet().encrypt(data).decode("utf-8")
 
 
@@ -27,6 +28,6 @@ def decrypt_payload(token: str) -> Dict[str, Any]:
         return {}
     try:
         data = _get_fernet().decrypt(token.encode("utf-8"))
-        return json.loads(data.decode("utf-8"))
+        return loads(data)
     except Exception:
         return {}
@@ -2,13 +2,12 @@ import json
 import logging
 import re
 from datetime import timedelta
-from urllib.error import HTTPError, URLError
 from urllib.parse import urlencode
-from urllib.request import Request, urlopen
 
 from django.utils import timezone
 
 from .crypto import decrypt_payload
+from .http_client import HTTPStatusError, HTTPTransportError, get_http_client
 from .models import IntegrationConfig, Report, ReportMessage, Tenant
 from .pipeline import PipelineError, _call_ai, get_or_create_runtime_config
 
@@ -223,10 +222,11 @@ def _telegram_get_updates(bot_token: str, offset: int | None) -> list[dict]:
     if offset is not None:
         params["offset"] = str(offset)
     endpoint = f"https://api.telegram.org/bot{bot_token}/getUpdates?{urlencode(params)}"
-    req = Request(endpoint, headers={"User-Agent": "synkro/1.0"}, method="GET")
     try:
-        with urlopen(req, timeout=12) as response:
-            payload = json.loads(response.read().decode("utf-8") or "{}")
+        response = get_http_client().request(
+            "GET", endpoint, headers={"User-Agent": "synkro/1.0"}, timeout=12
+        )
+        payload = json.loads(response.raise_for_status().text() or "{}")
     except Exception:
         logger.exception("Failed to fetch Telegram updates")
         return []
@@ -243,16 +243,15 @@ def _send_telegram_message(bot_token: str, chat_id: str, text: str) -> None:
     message = (text or "").strip() or "Empty response."
     if len(message) > 3900:
         message = message[:3900] + "..."
-    req = Request(
-        f"https://api.telegram.org/bot{bot_token}/sendMessage",
-        headers={"Content-Type": "application/json"},
-        data=json.dumps({"chat_id": chat_id, "text": message}).encode("utf-8"),
-        method="POST",
-    )
     try:
-        with urlopen(req, timeout=12):
-            return
-    except (HTTPError, URLError):
+        get_http_client().request(
+            "POST",
+            f"https://api.telegram.org/bot{bot_token}/sendMessage",
+            headers={"Content-Type": "application/json"},
+            body=json.dumps({"chat_id": chat_id, "text": message}).encode("utf-8"),
+            timeout=12,
+        ).raise_for_status()
+    except (HTTPStatusError, HTTPTransportError):
         logger.exception("Failed to send Telegram follow-up message")
 
 
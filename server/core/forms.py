@@ -158,6 +158,7 @@ class ForcedReportForm(forms.Form):
             attrs={"type": "datetime-local"},
         ),
     )
+    full_resync = forms.BooleanField(label="Полная пересинхронизация amoCRM", required=False)
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
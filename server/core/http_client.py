@@ -0,0 +1,363 @@
+import base64
+import gzip
+import hashlib
+import http.client
+import ssl
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from urllib.parse import unquote, urlsplit
+from urllib.request import getproxies, proxy_bypass
+
+from .telemetry import record_http_request
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+ACCEPT_ENCODING = "gzip, deflate"
+# Headers that identify the caller; cached responses are never shared across credentials.
+CREDENTIAL_HEADERS = ("authorization", "apikey", "x-api-key")
+# Methods a dropped keep-alive connection may replay after the request went out.
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+class HTTPTransportError(Exception):
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class HTTPStatusError(Exception):
+    def __init__(self, code: int, body: bytes, headers: dict):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+        self.body = body
+        self.headers = headers
+
+
+class HTTPResponse:
+    def __init__(
+        self,
+        status: int,
+        headers: dict,
+        body: bytes,
+        *,
+        wire_bytes: int | None = None,
+        from_cache: bool = False,
+    ):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        # Size as received (before gzip/deflate decoding); 304 revalidations count only their own bytes.
+        self.wire_bytes = len(body) if wire_bytes is None else wire_bytes
+        self.from_cache = from_cache
+
+    def text(self) -> str:
+        return self.body.decode("utf-8")
+
+    def raise_for_status(self) -> "HTTPResponse":
+        if self.status >= 400:
+            raise HTTPStatusError(self.status, self.body, self.headers)
+        return self
+
+
+# Small LRU of GET responses that carried ETag/Last-Modified, used for conditional revalidation.
+class ResponseCache:
+    def __init__(
+        self,
+        *,
+        max_entries: int = 256,
+        max_bytes: int = 16 * 1024 * 1024,
+        max_entry_bytes: int = 1024 * 1024,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(url: str, headers: dict) -> str:
+        credentials = "|".join(
+            f"{name.lower()}={value}"
+            for name, value in sorted(headers.items())
+            if name.lower() in CREDENTIAL_HEADERS
+        )
+        return hashlib.sha256(f"{url}\n{credentials}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, *, headers: dict, body: bytes) -> None:
+        if len(body) > self.max_entry_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous["body"])
+            self._entries[key] = {"headers": headers, "body": body}
+            self._bytes += len(body)
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted["body"])
+
+
+# Keep-alive HTTP/1.1 client with an idle-connection pool per (scheme, host, port).
+# One instance is shared by all threads of a worker process, so connections opened
+# by one pipeline job are reused by the next one.
+class PooledHTTPClient:
+    def __init__(self, *, max_idle_per_host: int = 8, idle_timeout: float = 60.0):
+        self.max_idle_per_host = max_idle_per_host
+        self.idle_timeout = idle_timeout
+        self._ssl_context = ssl.create_default_context()
+        self._lock = threading.Lock()
+        self._idle: dict[tuple[str, str, int], list[tuple[http.client.HTTPConnection, float]]] = {}
+        self._cache = ResponseCache()
+        # HTTP(S)_PROXY / NO_PROXY as urllib reads them, resolved once per (scheme, host, port).
+        self._proxies = getproxies()
+        self._routes: dict[tuple[str, str, int], tuple[str, int, dict] | None] = {}
+        self._stats = {
+            "requests": 0,
+            "connections_opened": 0,
+            "connections_reused": 0,
+            "connections_dropped": 0,
+            "bytes_out": 0,
+            "bytes_in": 0,
+            "wire_bytes_in": 0,
+            "not_modified": 0,
+        }
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: dict | None = None,
+        body: bytes | None = None,
+        timeout: float = 30,
+        revalidate: bool = False,
+    ) -> HTTPResponse:
+        started = time.perf_counter()
+        try:
+            response = self._send(method, url, headers=headers, body=body, timeout=timeout, revalidate=revalidate)
+        except HTTPTransportError:
+            record_http_request(
+                url, status=None, elapsed_ms=(time.perf_counter() - started) * 1000, bytes_out=len(body or b"")
+            )
+            raise
+        record_http_request(
+            url,
+            status=response.status,
+            elapsed_ms=(time.perf_counter() - started) * 1000,
+            bytes_out=len(body or b""),
+            bytes_in=len(response.body),
+            wire_bytes_in=response.wire_bytes,
+        )
+        return response
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: dict | None,
+        body: bytes | None,
+        timeout: float,
+        revalidate: bool,
+    ) -> HTTPResponse:
+        # revalidate: for GETs, replay a cached ETag/Last-Modified and serve the cached body on 304.
+        parts = urlsplit(url)
+        scheme = (parts.scheme or "http").lower()
+        if scheme not in DEFAULT_PORTS or not parts.hostname:
+            raise HTTPTransportError(f"Unsupported URL: {url[:200]}")
+        key = (scheme, parts.hostname, parts.port or DEFAULT_PORTS[scheme])
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+        request_headers = dict(headers or {})
+        proxy = self._route(key)
+        if proxy is not None and scheme == "http":
+            # Plain HTTP goes through the proxy in absolute form; HTTPS is tunneled (CONNECT).
+            path = f"http://{parts.netloc.rpartition('@')[2]}{path}"
+            request_headers.update(proxy[2])
+        if not any(name.lower() == "accept-encoding" for name in request_headers):
+            request_headers["Accept-Encoding"] = ACCEPT_ENCODING
+        cache_key = None
+        cached = None
+        if revalidate and method.upper() == "GET":
+            cache_key = ResponseCache.key(url, request_headers)
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                if cached["headers"].get("etag"):
+                    request_headers["If-None-Match"] = cached["headers"]["etag"]
+                if cached["headers"].get("last-modified"):
+                    request_headers["If-Modified-Since"] = cached["headers"]["last-modified"]
+
+        # A pooled connection may have been closed by the server while idle; such a failure
+        # surfaces before any response bytes. The request is sent again on a fresh socket only
+        # when replaying it is safe: an idempotent method, or a body that never fully went out.
+        for attempt in range(2):
+            conn, reused = self._acquire(key, timeout)
+            sent = False
+            try:
+                conn.request(method, path, body=body, headers=request_headers)
+                sent = True
+                response = conn.getresponse()
+                data = response.read()
+            except (ConnectionResetError, BrokenPipeError, http.client.BadStatusLine) as exc:
+                conn.close()
+                self._count("connections_dropped")
+                if reused and attempt == 0 and (not sent or method.upper() in IDEMPOTENT_METHODS):
+                    continue
+                raise HTTPTransportError(str(exc) or exc.__class__.__name__) from exc
+            except (OSError, http.client.HTTPException) as exc:
+                conn.close()
+                self._count("connections_dropped")
+                raise HTTPTransportError(str(exc) or exc.__class__.__name__) from exc
+
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(key, conn)
+            response_headers = {name.lower(): value for name, value in response.getheaders()}
+            wire_bytes = len(data)
+            data = _decode_content(data, response_headers)
+            self._count_transfer(len(body or b""), len(data), wire_bytes, response.status == 304)
+            if response.status == 304 and cached is not None:
+                return HTTPResponse(200, cached["headers"], cached["body"], wire_bytes=wire_bytes, from_cache=True)
+            if cache_key and response.status == 200 and (
+                response_headers.get("etag") or response_headers.get("last-modified")
+            ):
+                self._cache.put(cache_key, headers=response_headers, body=data)
+            return HTTPResponse(response.status, response_headers, data, wire_bytes=wire_bytes)
+        raise HTTPTransportError("Connection closed by remote host.")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for conn, _ in connections:
+                conn.close()
+
+    def _acquire(self, key: tuple[str, str, int], timeout: float) -> tuple[http.client.HTTPConnection, bool]:
+        now = time.monotonic()
+        stale = []
+        conn = None
+        with self._lock:
+            connections = self._idle.get(key) or []
+            while connections:
+                candidate, released_at = connections.pop()
+                if now - released_at > self.idle_timeout:
+                    stale.append(candidate)
+                    continue
+                conn = candidate
+                break
+            self._stats["connections_reused" if conn else "connections_opened"] += 1
+        for candidate in stale:
+            candidate.close()
+        if conn is not None:
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            return conn, True
+
+        scheme, host, port = key
+        proxy = self._route(key)
+        connect_host, connect_port = (host, port) if proxy is None else proxy[:2]
+        if scheme == "https":
+            conn = http.client.HTTPSConnection(
+                connect_host, connect_port, timeout=timeout, context=self._ssl_context
+            )
+            if proxy is not None:
+                conn.set_tunnel(host, port, headers=proxy[2])
+            return conn, False
+        return http.client.HTTPConnection(connect_host, connect_port, timeout=timeout), False
+
+    def _route(self, key: tuple[str, str, int]) -> tuple[str, int, dict] | None:
+        # (proxy host, proxy port, Proxy-Authorization header) for the target, or None to connect directly.
+        if key in self._routes:
+            return self._routes[key]
+        scheme, host, port = key
+        proxy_url = self._proxies.get(scheme)
+        route = None
+        if proxy_url and not proxy_bypass(f"{host}:{port}"):
+            if "://" not in proxy_url:
+                proxy_url = f"http://{proxy_url}"
+            proxy = urlsplit(proxy_url)
+            if proxy.hostname:
+                proxy_headers = {}
+                if proxy.username is not None:
+                    credentials = f"{unquote(proxy.username)}:{unquote(proxy.password or '')}"
+                    token = base64.b64encode(credentials.encode("utf-8")).decode("ascii")
+                    proxy_headers["Proxy-Authorization"] = f"Basic {token}"
+                route = (proxy.hostname, proxy.port or DEFAULT_PORTS.get(proxy.scheme, 80), proxy_headers)
+        with self._lock:
+            self._routes[key] = route
+        return route
+
+    def _release(self, key: tuple[str, str, int], conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            connections = self._idle.setdefault(key, [])
+            if len(connections) < self.max_idle_per_host:
+                connections.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def _count_transfer(self, bytes_out: int, bytes_in: int, wire_bytes_in: int, not_modified: bool) -> None:
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["bytes_out"] += bytes_out
+            self._stats["bytes_in"] += bytes_in
+            self._stats["wire_bytes_in"] += wire_bytes_in
+            self._stats["not_modified"] += int(not_modified)
+
+
+def _decode_content(data: bytes, headers: dict) -> bytes:
+    encoding = (headers.get("content-encoding") or "").strip().lower()
+    if not data or encoding in ("", "identity"):
+        return data
+    try:
+        if encoding in ("gzip", "x-gzip"):
+            decoded = gzip.decompress(data)
+        elif encoding == "deflate":
+            # Servers disagree on zlib-wrapped vs raw deflate; accept both.
+            try:
+                decoded = zlib.decompress(data)
+            except zlib.error:
+                decoded = zlib.decompress(data, -zlib.MAX_WBITS)
+        else:
+            return data
+    except (OSError, EOFError, zlib.error) as exc:
+        raise HTTPTransportError(f"Failed to decode {encoding} response: {exc}") from exc
+    headers.pop("content-encoding", None)
+    headers["content-length"] = str(len(decoded))
+    return decoded
+
+
+_client: PooledHTTPClient | None = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> PooledHTTPClient:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = PooledHTTPClient()
+    return _client
+
+
+def pool_stats() -> dict:
+    return get_http_client().stats()
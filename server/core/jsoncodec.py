@@ -0,0 +1,86 @@
+import json
+import os
+
+try:
+    import orjson
+except ImportError:  # optional speedup, stdlib json is the fallback
+    orjson = None
+
+# JSON_BACKEND=stdlib forces the stdlib path even when orjson is installed.
+if (os.getenv("JSON_BACKEND") or "auto").strip().lower() == "stdlib":
+    orjson = None
+
+JSONDecodeError = json.JSONDecodeError
+
+# Both backends emit compact UTF-8 JSON, but not the same bytes: floats are spelled differently
+# (1e16 vs 1e+16) and orjson writes NaN/Infinity as null. Anything hashed or compared as bytes
+# goes through canonical_bytes(), which is stdlib whatever the backend.
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+# orjson reads integers outside 64 bits as floats; documents with 19+ digit runs go to stdlib.
+# Digits are folded to "0" first: translate + find is several times faster than a regex scan.
+_DIGITS_TO_ZERO = bytes.maketrans(b"123456789", b"000000000")
+_WIDE_INT_RUN = b"0" * 19
+
+
+def backend_name() -> str:
+    return "orjson" if orjson is not None else "stdlib"
+
+
+def dumps_bytes(value, *, sort_keys: bool = False, default=None) -> bytes:
+    if orjson is not None:
+        option = _ORJSON_OPTIONS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        try:
+            return orjson.dumps(value, default=default, option=option)
+        except TypeError:
+            # Integers beyond 64 bits, non-string keys etc.: let stdlib decide.
+            pass
+    return _stdlib_dumps(value, sort_keys=sort_keys, default=default).encode("utf-8")
+
+
+def dumps(value, *, sort_keys: bool = False, default=None) -> str:
+    if orjson is not None:
+        return dumps_bytes(value, sort_keys=sort_keys, default=default).decode("utf-8")
+    return _stdlib_dumps(value, sort_keys=sort_keys, default=default)
+
+
+def canonical_bytes(value) -> bytes:
+    # Sorted-key stdlib JSON, the fixed encoding of content fingerprints.
+    return _stdlib_dumps(value, sort_keys=True, default=str).encode("utf-8")
+
+
+def loads(data):
+    if orjson is not None:
+        raw = data.encode("utf-8") if isinstance(data, str) else bytes(data)
+        if raw.translate(_DIGITS_TO_ZERO).find(_WIDE_INT_RUN) < 0:
+            try:
+                return orjson.loads(raw)
+            except orjson.JSONDecodeError:
+                # NaN, Infinity, 1e400: stdlib accepts them; real syntax errors raise below.
+                pass
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        data = bytes(data).decode("utf-8")
+    return json.loads(data)
+
+
+def _stdlib_dumps(value, *, sort_keys: bool, default) -> str:
+    return json.dumps(
+        value,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        sort_keys=sort_keys,
+        default=default,
+    )
+
+
+# For Django JSONField(encoder=..., decoder=...): Django calls json.dumps(value, cls=encoder)
+# and json.loads(value, cls=decoder), which end up in encode()/decode() below.
+class CodecJSONEncoder(json.JSONEncoder):
+    def encode(self, o) -> str:
+        return dumps(o)
+
+
+class CodecJSONDecoder(json.JSONDecoder):
+    def decode(self, s, *args, **kwargs):
+        return loads(s)
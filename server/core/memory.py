@@ -0,0 +1,30 @@
+import sys
+
+try:
+    import resource
+except ImportError:  # Windows dev machines
+    resource = None
+
+_PAGE_SIZE = 4096
+if resource is not None:
+    _PAGE_SIZE = resource.getpagesize()
+
+
+def current_rss_mb() -> float:
+    # Resident set size right now (Linux /proc); falls back to the process peak elsewhere.
+    try:
+        with open("/proc/self/statm", "rb") as handle:
+            resident_pages = int(handle.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+    return round(resident_pages * _PAGE_SIZE / (1024 * 1024), 1)
+
+
+def peak_rss_mb() -> float:
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    if sys.platform == "darwin":
+        return round(peak / (1024 * 1024), 1)
+    return round(peak / 1024, 1)
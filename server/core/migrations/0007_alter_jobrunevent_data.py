@@ -0,0 +1,19 @@
+# Generated by Django 5.0.2 on 2026-10-17 00:58
+
+import core.jsoncodec
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_jobrunevent'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='jobrunevent',
+            name='data',
+            field=models.JSONField(blank=True, decoder=core.jsoncodec.CodecJSONDecoder, default=dict, encoder=core.jsoncodec.CodecJSONEncoder),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.0.2 on 2026-10-17 01:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_alter_jobrunevent_data'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HourlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket_start', models.DateTimeField()),
+                ('bucket_end', models.DateTimeField()),
+                ('total_deals', models.PositiveIntegerField(default=0)),
+                ('with_dialogs', models.PositiveIntegerField(default=0)),
+                ('total_messages', models.PositiveIntegerField(default=0)),
+                ('status_counts', models.JSONField(blank=True, default=dict)),
+                ('responsible_counts', models.JSONField(blank=True, default=dict)),
+                ('coverage', models.FloatField(default=1.0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('job_run', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='hourly_rollups', to='core.jobrun')),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hourly_rollups', to='core.tenant')),
+            ],
+            options={
+                'ordering': ['tenant_id', 'bucket_start'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='hourlyrollup',
+            constraint=models.UniqueConstraint(fields=('tenant', 'bucket_start'), name='uniq_tenant_rollup_bucket'),
+        ),
+    ]
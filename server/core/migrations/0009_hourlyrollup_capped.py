@@ -0,0 +1,18 @@
+# Generated by Django 5.0.2 on 2026-10-17 01:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_hourlyrollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hourlyrollup',
+            name='capped',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.0.2 on 2026-10-17 01:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def move_public_config_watermarks(apps, schema_editor):
+    IntegrationConfig = apps.get_model("core", "IntegrationConfig")
+    RadistWatermark = apps.get_model("core", "RadistWatermark")
+    for integration in IntegrationConfig.objects.filter(kind="radist"):
+        public_config = dict(integration.public_config or {})
+        watermarks = public_config.pop("message_watermarks", None)
+        if watermarks is None:
+            continue
+        rows = [
+            RadistWatermark(
+                tenant_id=integration.tenant_id,
+                chat_id=int(chat_id),
+                covered_from=int(watermark["from"]),
+                covered_until=int(watermark["until"]),
+                message_id=str(watermark["message_id"]),
+            )
+            for chat_id, watermark in (watermarks or {}).items()
+            if isinstance(watermark, dict) and {"from", "until", "message_id"} <= watermark.keys()
+        ]
+        RadistWatermark.objects.bulk_create(rows, ignore_conflicts=True)
+        integration.public_config = public_config
+        integration.save(update_fields=["public_config"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_hourlyrollup_capped'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RadistWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chat_id', models.BigIntegerField()),
+                ('covered_from', models.BigIntegerField()),
+                ('covered_until', models.BigIntegerField()),
+                ('message_id', models.CharField(max_length=128)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='radist_watermarks', to='core.tenant')),
+            ],
+            options={
+                'ordering': ['tenant_id', '-covered_until'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='radistwatermark',
+            constraint=models.UniqueConstraint(fields=('tenant', 'chat_id'), name='uniq_tenant_radist_watermark'),
+        ),
+        migrations.RunPython(move_public_config_watermarks, migrations.RunPython.noop),
+    ]
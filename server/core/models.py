@@ -3,6 +3,8 @@ from datetime import time
 from django.conf import settings
 from django.db import models
 
+from .jsoncodec import CodecJSONDecoder, CodecJSONEncoder
+
 
 class Tenant(models.Model):
     class Status(models.TextChoices):
@@ -190,7 +192,9 @@ class JobRunEvent(models.Model):
     job_run = models.ForeignKey(JobRun, on_delete=models.CASCADE, related_name="events")
     level = models.CharField(max_length=10, choices=Level.choices, default=Level.INFO)
     message = models.TextField()
-    data = models.JSONField(default=dict, blank=True)
+    data = models.JSONField(
+        default=dict, blank=True, encoder=CodecJSONEncoder, decoder=CodecJSONDecoder
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -231,6 +235,56 @@ class Report(models.Model):
         return f"{self.tenant.slug}: {self.report_type} {self.period_start} - {self.period_end}"
 
 
+class HourlyRollup(models.Model):
+    # Report counts for one tenant and hour of a scheduled window (the window's first and last
+    # buckets are cut at its edges); adjacent buckets add up to any longer period.
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name="hourly_rollups")
+    job_run = models.ForeignKey(
+        JobRun, on_delete=models.SET_NULL, null=True, blank=True, related_name="hourly_rollups"
+    )
+    bucket_start = models.DateTimeField()
+    bucket_end = models.DateTimeField()
+    total_deals = models.PositiveIntegerField(default=0)
+    with_dialogs = models.PositiveIntegerField(default=0)
+    total_messages = models.PositiveIntegerField(default=0)
+    status_counts = models.JSONField(default=dict, blank=True)
+    responsible_counts = models.JSONField(default=dict, blank=True)
+    coverage = models.FloatField(default=1.0)
+    # Built from window rows cut at max_report_rows: the counts are a lower bound.
+    capped = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["tenant", "bucket_start"], name="uniq_tenant_rollup_bucket"),
+        ]
+        ordering = ["tenant_id", "bucket_start"]
+
+    def __str__(self) -> str:
+        return f"{self.tenant.slug}: {self.bucket_start:%Y-%m-%d %H:%M} ({self.total_deals})"
+
+
+class RadistWatermark(models.Model):
+    # Message range of one Radist chat already stored in public.deals (unix seconds) and its
+    # newest message id; the next sync fetches only messages newer than covered_until.
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name="radist_watermarks")
+    chat_id = models.BigIntegerField()
+    covered_from = models.BigIntegerField()
+    covered_until = models.BigIntegerField()
+    message_id = models.CharField(max_length=128)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["tenant", "chat_id"], name="uniq_tenant_radist_watermark"),
+        ]
+        ordering = ["tenant_id", "-covered_until"]
+
+    def __str__(self) -> str:
+        return f"{self.tenant.slug}: chat {self.chat_id} until {self.covered_until}"
+
+
 class ReportMessage(models.Model):
     report = models.ForeignKey(Report, on_delete=models.CASCADE, related_name="messages")
     actor = models.ForeignKey(
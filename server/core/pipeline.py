@@ -1,21 +1,74 @@
-import json
 import logging
+import time
+import uuid
 from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Iterator
 from zoneinfo import ZoneInfo
-from urllib.error import HTTPError, URLError
 from urllib.parse import urlencode
-from urllib.request import Request, urlopen
 
 from django.conf import settings
+from django.core.cache import cache
 from django.db import transaction
 from django.utils import timezone
 
+from .autotune import plan_fetch_limits, truncation_counts
+from .breaker import CIRCUIT_ERROR_PREFIX, circuit_snapshots
 from .connectors import ConnectorError, sync_sources_to_supabase
 from .crypto import decrypt_payload
+from .http_client import HTTPStatusError, HTTPTransportError, get_http_client, pool_stats
+from .jsoncodec import JSONDecodeError, dumps_bytes, loads
+from .memory import current_rss_mb, peak_rss_mb
 from .models import AuditLog, IntegrationConfig, JobRun, JobRunEvent, Report, Tenant, TenantRuntimeConfig
+from .rollups import (
+    MIN_REPORT_COVERAGE,
+    ROLLUP_REPORT_TYPES,
+    bucket_records,
+    comparison_windows,
+    due_rollup_reports,
+    load_rollups,
+    merge_summaries,
+    oldest_record_time,
+    parse_bucket_summaries,
+    rollup_coverage,
+    rollup_window,
+    store_rollups,
+    summary_deltas,
+)
+from .telemetry import begin_http_telemetry, end_http_telemetry
+from .watermarks import load_watermarks, save_watermarks
 
 logger = logging.getLogger(__name__)
 
+# Report job stages in order. Each one checkpoints its output (sync_stats, the loaded records,
+# the summary, the saved report), so a retried or recovered job resumes at its first unfinished
+# stage; PIPELINE_STAGE_QUEUES routes stages to separate Celery queues.
+PIPELINE_STAGES = ("sync", "load", "summarize", "report", "push", "notify")
+CHECKPOINT_CACHE_PREFIX = "synkro:job"
+CHECKPOINT_TTL_SECONDS = 24 * 3600
+MAX_STAGE_CRASHES = 2
+MAX_JOB_RESUMES = 2
+STALE_JOB_GRACE_SECONDS = 600
+# Deals are read in keyset pages with the columns the summary and prompt need; transcripts
+# (dialog_norm) only for the AI_SAMPLE_ROWS rows that go into the prompt.
+DEALS_PAGE_SIZE = 500
+DEAL_RECORD_COLUMNS = (
+    "deal_id",
+    "deal_name",
+    "status",
+    "responsible",
+    "messages_count",
+    "first_message_at",
+    "last_message_at",
+)
+AI_SAMPLE_ROWS = 15
+DELTA_NAMES = (("total_deals", "deals"), ("with_dialogs", "dialogs"), ("total_messages", "messages"))
+REPORT_TITLES = {"weekly": "Недельный отчет", "monthly": "Месячный отчет"}
+DELTA_LABELS = {
+    "day_over_day": "Day over day",
+    "week_over_week": "Week over week",
+    "month_over_month": "Month over month",
+}
+
 
 class PipelineError(Exception):
     pass
@@ -104,6 +157,10 @@ def queue_report_job(
 
     existing = JobRun.objects.filter(idempotency_key=idempotency_key).first()
     if existing:
+        # Re-queueing a failed job resumes it instead of returning the failure.
+        if can_retry_report_job(existing):
+            retry_report_job(existing, requested_by=requested_by)
+            return existing, True
         return existing, False
 
     with transaction.atomic():
@@ -143,15 +200,8 @@ def queue_report_job(
         },
     )
 
-    from .tasks import run_pipeline_job
-
     try:
-        async_result = run_pipeline_job.delay(job.id)
-        if async_result and getattr(async_result, "id", None):
-            metadata_payload = job.metadata or {}
-            metadata_payload["celery_task_id"] = async_result.id
-            job.metadata = metadata_payload
-            job.save(update_fields=["metadata", "updated_at"])
+        enqueue_pipeline_stage(job, PIPELINE_STAGES[0])
     except Exception as exc:
         job.status = JobRun.Status.FAILED
         job.error = f"Failed to enqueue Celery task: {exc}"
@@ -162,60 +212,497 @@ def queue_report_job(
     return job, True
 
 
-def execute_pipeline_job(job_id: int) -> None:
+def enqueue_pipeline_stage(job: JobRun, stage: str) -> str:
+    from .tasks import run_pipeline_stage
+
+    # The task id is stored before sending, so a fast worker never races this metadata write.
+    task_id = str(uuid.uuid4())
+    _attach_job_metadata(job, {"celery_task_id": task_id, "queued_stage": stage})
+    queue = (settings.PIPELINE_STAGE_QUEUES.get(stage) or "").strip()
+    options = {"queue": queue} if queue else {}
+    run_pipeline_stage.apply_async(args=[job.id, stage], task_id=task_id, **options)
+    return task_id
+
+
+def resume_stage(job: JobRun) -> str | None:
+    stages = (job.metadata or {}).get("stages") or {}
+    for stage in PIPELINE_STAGES:
+        if (stages.get(stage) or {}).get("status") != "done":
+            return stage
+    return None
+
+
+def retry_report_job(job: JobRun, *, requested_by=None) -> str:
+    # A failed job restarts at its first unfinished stage: checkpoints of the finished ones
+    # (synced rows, summary, saved report) are reused, nothing is synced twice.
+    with transaction.atomic():
+        # Locked re-read: two retry clicks (or a retry racing a re-queue) enqueue one stage task.
+        JobRun.objects.select_for_update().filter(id=job.id).first()
+        job.refresh_from_db()
+        if not can_retry_report_job(job):
+            if job.status != JobRun.Status.FAILED:
+                raise PipelineError(f"Job #{job.id} is not failed (status '{job.status}').")
+            if _is_stopped_by_user(job):
+                raise PipelineError(f"Job #{job.id} was stopped by user.")
+            raise PipelineError(f"Job #{job.id} was already retried {MAX_JOB_RESUMES} times.")
+        stage = resume_stage(job)
+        stages = dict((job.metadata or {}).get("stages") or {})
+        entry = dict(stages.get(stage) or {})
+        # The crash counter belongs to the failed run; the retry gets a fresh budget.
+        entry.pop("crashes", None)
+        stages[stage] = entry
+        job.metadata = {**(job.metadata or {}), "stages": stages}
+        job.attempt += 1
+        job.status = JobRun.Status.PENDING
+        job.current_step = "Queued for retry"
+        job.error = ""
+        job.finished_at = None
+        job.save(
+            update_fields=[
+                "attempt", "status", "current_step", "error", "finished_at", "metadata", "updated_at"
+            ]
+        )
+    _write_job_event(job, JobRunEvent.Level.WARN, "Retry queued", {"stage": stage, "attempt": job.attempt})
+    _write_audit(
+        tenant=job.tenant,
+        actor=requested_by if getattr(requested_by, "is_authenticated", False) else None,
+        action="report_job_retried",
+        message=f"Report job retried from stage {stage}",
+        metadata={"job_id": job.id, "stage": stage, "attempt": job.attempt},
+    )
+    try:
+        enqueue_pipeline_stage(job, stage)
+    except Exception as exc:
+        _mark_failed(job, f"Failed to enqueue Celery task: {exc}")
+        raise PipelineError(job.error) from exc
+    return stage
+
+
+def can_retry_report_job(job: JobRun) -> bool:
+    if job.status != JobRun.Status.FAILED or _is_stopped_by_user(job):
+        return False
+    return job.attempt <= MAX_JOB_RESUMES and resume_stage(job) is not None
+
+
+def recover_stale_jobs(now_utc: datetime | None = None) -> int:
+    # A job idle longer than the task time limit lost its stage task (worker restart, broker
+    # hiccup): enqueue its first unfinished stage again, a bounded number of times.
+    now_utc = now_utc or timezone.now()
+    cutoff = now_utc - timedelta(seconds=settings.CELERY_TASK_TIME_LIMIT + STALE_JOB_GRACE_SECONDS)
+    stale_jobs = (
+        JobRun.objects.select_related("tenant")
+        .filter(
+            job_type=JobRun.JobType.REPORT_BUILD,
+            status__in=[JobRun.Status.PENDING, JobRun.Status.RUNNING],
+            updated_at__lt=cutoff,
+        )
+        .order_by("id")[:20]
+    )
+    resumed = 0
+    for job in stale_jobs:
+        stage = resume_stage(job)
+        if stage is None:
+            continue
+        if job.attempt > MAX_JOB_RESUMES:
+            _mark_failed(job, f"Job stalled at stage {stage}, resumed {MAX_JOB_RESUMES} times.")
+            continue
+        job.attempt += 1
+        job.save(update_fields=["attempt", "updated_at"])
+        _write_job_event(
+            job,
+            JobRunEvent.Level.WARN,
+            "Stale job resumed",
+            {"stage": stage, "attempt": job.attempt},
+        )
+        try:
+            enqueue_pipeline_stage(job, stage)
+            resumed += 1
+        except Exception:
+            logger.exception("Failed to resume stale job %s", job.id)
+    return resumed
+
+
+def execute_pipeline_job(job_id: int, *, task_id: str = "") -> None:
+    # The whole job in one task: every stage that has not completed yet, in order.
+    job = JobRun.objects.filter(id=job_id).first()
+    if not job:
+        raise PipelineError(f"JobRun {job_id} not found")
+    task_deadline = time.monotonic() + settings.CELERY_TASK_TIME_LIMIT
+    stage = resume_stage(job)
+    while stage:
+        stage = execute_pipeline_stage(job_id, stage, task_deadline=task_deadline, task_id=task_id)
+
+
+def execute_pipeline_stage(
+    job_id: int, stage: str, *, task_deadline: float | None = None, task_id: str = ""
+) -> str | None:
+    # Runs one stage and checkpoints its output; returns the next stage to run, or None when the
+    # job is finished, failed, or this stage is not due (already done, running elsewhere).
+    # task_id: the Celery task running it, so a redelivery of that task can take over its lock.
+    if stage not in PIPELINE_STAGES:
+        raise PipelineError(f"Unknown pipeline stage: {stage}")
     job = JobRun.objects.select_related("tenant").filter(id=job_id).first()
     if not job:
         raise PipelineError(f"JobRun {job_id} not found")
     if job.status == JobRun.Status.SUCCESS:
-        return
+        return None
     if job.status == JobRun.Status.FAILED and _is_stopped_by_user(job):
-        return
-
-    config = get_or_create_runtime_config(job.tenant)
-    if not job.window_start or not job.window_end:
-        window_start, window_end = compute_last_closed_window(config)
-        job.window_start = window_start
-        job.window_end = window_end
-        job.save(update_fields=["window_start", "window_end", "updated_at"])
-    integrations = _load_integrations(job.tenant)
+        return None
+    if resume_stage(job) != stage:
+        return None
+    lock_key = f"{CHECKPOINT_CACHE_PREFIX}:{job.id}:lock"
+    lock_owner = f"{stage}:{task_id or uuid.uuid4()}"
+    if not _acquire_stage_lock(lock_key, lock_owner):
+        logger.info("Stage %s of job %s is already running", stage, job.id)
+        return None
+
+    stages = dict((job.metadata or {}).get("stages") or {})
+    entry = dict(stages.get(stage) or {})
+    if entry.get("status") == "running":
+        # The previous attempt never finished: its worker died mid-stage.
+        entry["crashes"] = int(entry.get("crashes") or 0) + 1
+    entry.update(
+        {
+            "status": "running",
+            "attempts": int(entry.get("attempts") or 0) + 1,
+            "queue": (settings.PIPELINE_STAGE_QUEUES.get(stage) or "").strip() or "default",
+            "started_at": timezone.now().isoformat(),
+        }
+    )
+    entry.pop("error", None)
+    stages[stage] = entry
+    _attach_job_metadata(job, {"stages": stages})
+
+    if task_deadline is None:
+        task_deadline = time.monotonic() + settings.CELERY_TASK_TIME_LIMIT
+    stage_started = time.monotonic()
+    previous = job.metadata or {}
+    http_pool_before = pool_stats()
+    http_telemetry = begin_http_telemetry(previous.get("http"))
+    rss_start_mb = current_rss_mb()
+    details: dict = {}
+    error = ""
+    # Stays "running" if the worker is torn down mid-stage (SystemExit), like a crash.
+    outcome = "running"
     try:
-        _ensure_not_stopped(job)
-        _mark_running(job, "Checking tenant configuration", 5)
-        _validate_integrations(config, integrations)
+        if entry.get("crashes", 0) > MAX_STAGE_CRASHES:
+            raise PipelineError(f"Stage {stage} crashed {entry['crashes']} times.")
+        config = get_or_create_runtime_config(job.tenant)
+        if not job.window_start or not job.window_end:
+            window_start, window_end = compute_last_closed_window(config)
+            job.window_start = window_start
+            job.window_end = window_end
+            job.save(update_fields=["window_start", "window_end", "updated_at"])
+        integrations = _load_integrations(job.tenant)
 
         _ensure_not_stopped(job)
-        _mark_running(job, "Syncing source systems", 25)
-        try:
-            sync_stats = _sync_sources(job, config, integrations)
-            sync_stats["sync_error"] = ""
-        except ConnectorError as exc:
-            # Continue with existing data in Supabase when connectors are temporarily unavailable.
-            sync_stats = {
-                "mode": config.mode,
-                "amo_rows": 0,
-                "radist_dialogs": 0,
-                "upsert_rows": 0,
-                "sync_error": str(exc),
+        if stage == PIPELINE_STAGES[0]:
+            _mark_running(job, "Checking tenant configuration", 5)
+        _validate_integrations(config, integrations)
+        if stage == "sync":
+            details = _run_sync_stage(job, config, integrations, task_deadline)
+        else:
+            details = _STAGE_RUNNERS[stage](job, config, integrations)
+        outcome = "done"
+    except PipelineError as exc:
+        error = str(exc)
+        _write_job_event(job, JobRunEvent.Level.ERROR, "PipelineError", {"error": error, "stage": stage})
+        _mark_failed(job, error)
+    except ConnectorError as exc:
+        error = str(exc)
+        _write_job_event(job, JobRunEvent.Level.ERROR, "ConnectorError", {"error": error, "stage": stage})
+        _mark_failed(job, error)
+    except Exception as exc:
+        logger.exception("Unexpected pipeline error for job %s at stage %s", job.id, stage)
+        error = f"Unexpected error: {exc}"
+        _write_job_event(
+            job, JobRunEvent.Level.ERROR, "Unexpected error", {"error": str(exc), "stage": stage}
+        )
+        _mark_failed(job, error)
+    finally:
+        http_pool_after = pool_stats()
+        pool_totals = previous.get("http_pool") or {}
+        memory = previous.get("memory") or {}
+        entry.update(
+            {
+                "status": "failed" if error else outcome,
+                "finished_at": timezone.now().isoformat(),
+                "ms": int((time.monotonic() - stage_started) * 1000),
+                **details,
             }
+        )
+        if error:
+            entry["error"] = error[:300]
+        stages[stage] = entry
+        _attach_job_metadata(
+            job,
+            {
+                "stages": stages,
+                "http": end_http_telemetry(http_telemetry),
+                "http_pool": {
+                    key: pool_totals.get(key, 0) + value - http_pool_before.get(key, 0)
+                    for key, value in http_pool_after.items()
+                },
+                "memory": {
+                    "rss_start_mb": memory.get("rss_start_mb", rss_start_mb),
+                    "rss_end_mb": current_rss_mb(),
+                    "process_peak_rss_mb": max(memory.get("process_peak_rss_mb", 0), peak_rss_mb()),
+                },
+            },
+        )
+        _release_stage_lock(lock_key, lock_owner)
+    if outcome != "done":
+        return None
+    index = PIPELINE_STAGES.index(stage)
+    return PIPELINE_STAGES[index + 1] if index + 1 < len(PIPELINE_STAGES) else None
+
+
+def _run_sync_stage(
+    job: JobRun,
+    config: TenantRuntimeConfig,
+    integrations: dict[str, IntegrationConfig],
+    task_deadline: float,
+) -> dict:
+    if _report_type(job) in ROLLUP_REPORT_TYPES:
+        # Weekly/monthly reports merge the hourly rollups the daily jobs stored: nothing to sync.
+        _write_job_event(job, JobRunEvent.Level.INFO, "Sync skipped, report merges hourly rollups")
+        return {"skipped": True}
+    _ensure_not_stopped(job)
+    _mark_running(job, "Syncing source systems", 25)
+    # The sync gets a budget below the hard task limit that leaves room for the later stages
+    # when they run in the same task.
+    sync_started = time.monotonic()
+    sync_deadline = min(
+        sync_started + _stage_budget(config, "sync_budget_seconds", 900, 60, 1800),
+        task_deadline - _stage_budget(config, "report_reserve_seconds", 300, 60, 1200),
+    )
+    fetch_limits = plan_fetch_limits(job.tenant, config, exclude_job_id=job.id)
+    # Read-your-writes: when the window is filtered by last message, the sync hands back the
+    # report's rows from what it merged, and the load stage skips the Supabase read.
+    records_limit = 0
+    if _deals_filter_field(config) == "last_message_at":
+        records_limit = _max_report_rows(config)
+    try:
+        sync_stats = _sync_sources(
+            job,
+            config,
+            integrations,
+            deadline=sync_deadline,
+            fetch_limits=fetch_limits,
+            records_limit=records_limit,
+            records_min_messages=config.min_dialogs_for_report,
+        )
+        sync_stats["sync_error"] = ""
+        sync_stats["fetch_autotuned"] = bool(fetch_limits)
+        window_records = sync_stats.pop("window_records", None)
+        if window_records is not None:
+            sync_stats["records_from_sync"] = bool(_save_records_checkpoint(job, window_records))
+            if sync_stats.get("window_rows", 0) > len(window_records):
+                _write_job_event(
+                    job,
+                    JobRunEvent.Level.WARN,
+                    "Report rows truncated",
+                    {"max_report_rows": records_limit},
+                )
+    except ConnectorError as exc:
+        # Continue with existing data in Supabase when connectors are temporarily unavailable.
+        sync_stats = {
+            "mode": config.mode,
+            "amo_rows": 0,
+            "radist_dialogs": 0,
+            "upsert_rows": 0,
+            "sync_error": str(exc),
+        }
+        _write_job_event(
+            job,
+            JobRunEvent.Level.WARN,
+            "Sync step failed, continuing with existing Supabase data",
+            {"error": str(exc)},
+        )
+    circuits = circuit_snapshots(sync_started)
+    if circuits:
+        sync_stats["circuits"] = circuits
+        _apply_circuit_states(integrations, circuits)
+    _attach_job_metadata(job, {"sync_stats": sync_stats})
+    _write_job_event(job, JobRunEvent.Level.INFO, "Sources synced", sync_stats)
+    if sync_stats.get("sync_deadline_hit"):
+        _write_job_event(
+            job,
+            JobRunEvent.Level.WARN,
+            "Sync budget exhausted, report covers the most recent data only",
+            {"coverage": sync_stats.get("sync_coverage")},
+        )
+    truncated = truncation_counts(sync_stats)
+    if truncated:
+        _write_job_event(
+            job,
+            JobRunEvent.Level.WARN,
+            "Fetch limits truncated source data",
+            {
+                "dropped": truncated,
+                "dropped_is_lower_bound": ["amo_leads"] if "amo_leads" in truncated else [],
+                "fetch_limits": sync_stats.get("fetch_limits", {}),
+            },
+        )
+    if sync_stats.get("radist_chat_errors"):
+        _write_job_event(
+            job,
+            JobRunEvent.Level.WARN,
+            "Some Radist chats failed to sync",
+            {
+                "failed": sync_stats["radist_chat_errors"],
+                "total": sync_stats.get("radist_chats_fetched", 0),
+                "error": sync_stats.get("radist_chat_error_sample", ""),
+            },
+        )
+    return {"output": "sync_stats"}
+
+
+def _run_load_stage(
+    job: JobRun, config: TenantRuntimeConfig, integrations: dict[str, IntegrationConfig]
+) -> dict:
+    _ensure_not_stopped(job)
+    if _report_type(job) in ROLLUP_REPORT_TYPES:
+        return _run_rollup_load_stage(job, config, integrations)
+    sync_stats = (job.metadata or {}).get("sync_stats") or {}
+    writes_rollups = _writes_rollups(job)
+    records = None
+    hourly = None
+    if sync_stats.get("records_from_sync"):
+        records = _read_records_checkpoint(job)
+    if records is not None:
+        source = "sync"
+        _mark_running(job, "Loading data from sync", 45)
+        output = _records_checkpoint_key(job)
+    else:
+        _mark_running(job, "Loading data from Supabase", 45)
+        # Counted by Supabase when migration 004 is deployed: then only the prompt sample is read.
+        # Jobs that store rollups ask for the per-hour counts (migration 005) and merge them.
+        if writes_rollups:
+            hourly = _fetch_hourly_aggregates(job, config, integrations)
+        if hourly is not None:
+            aggregates = _summary_counts(merge_summaries(hourly.values()))
+        else:
+            aggregates = _fetch_window_aggregates(job, config, integrations)
+        if aggregates is not None:
+            source = "supabase_rpc"
+            _attach_job_metadata(job, {"window_aggregates": aggregates})
+            records = _fetch_deals_for_window(job, config, integrations, limit=AI_SAMPLE_ROWS)
+        else:
+            source = "supabase"
+            records = _fetch_deals_for_window(job, config, integrations)
+        output = _save_records_checkpoint(job, records)
+    _write_job_event(job, JobRunEvent.Level.INFO, "Deals loaded", {"count": len(records), "source": source})
+    details = {"records": len(records), "source": source, "output": output}
+    if writes_rollups:
+        capped_until = None
+        if hourly is None and source != "supabase_rpc":
+            field = _deals_filter_field(config)
+            buckets = bucket_records(records, field, job.window_start, job.window_end)
+            hourly = {bucket_start: _build_summary(rows) for bucket_start, rows in buckets.items()}
+            # Rows cut at max_report_rows (newest first): the oldest hours are undercounted.
+            if source == "sync":
+                truncated = sync_stats.get("window_rows", 0) > len(records)
+            else:
+                truncated = len(records) >= _max_report_rows(config)
+            if truncated:
+                capped_until = oldest_record_time(records, field) or job.window_end
+        if hourly is not None:
+            details["rollups"] = store_rollups(
+                job, hourly, coverage=sync_stats.get("sync_coverage", 1.0), capped_until=capped_until
+            )
+        else:
             _write_job_event(
                 job,
                 JobRunEvent.Level.WARN,
-                "Sync step failed, continuing with existing Supabase data",
-                {"error": str(exc)},
+                "Hourly rollups skipped",
+                {"reason": "deals_hourly_summary is not deployed (supabase migration 005)"},
             )
-        _attach_job_metadata(job, {"sync_stats": sync_stats})
-        _write_job_event(job, JobRunEvent.Level.INFO, "Sources synced", sync_stats)
+    return details
 
-        _ensure_not_stopped(job)
-        _mark_running(job, "Loading data from Supabase", 45)
-        records = _fetch_deals_for_window(job.tenant, config, integrations, job.window_start, job.window_end)
-        _write_job_event(job, JobRunEvent.Level.INFO, "Deals loaded", {"count": len(records)})
 
+def _run_rollup_load_stage(
+    job: JobRun, config: TenantRuntimeConfig, integrations: dict[str, IntegrationConfig]
+) -> dict:
+    _mark_running(job, "Merging hourly rollups", 45)
+    summary, coverage, capped = load_rollups(job.tenant, job.window_start, job.window_end)
+    if not coverage:
+        raise PipelineError("No hourly rollups stored for the report period.")
+    _attach_job_metadata(
+        job,
+        {
+            "window_aggregates": _summary_counts(summary),
+            "rollup_coverage": coverage,
+            "rollup_capped_hours": capped,
+        },
+    )
+    if coverage < 1:
+        _write_job_event(
+            job, JobRunEvent.Level.WARN, "Hourly rollups cover part of the period", {"coverage": coverage}
+        )
+    if capped:
+        _write_job_event(
+            job,
+            JobRunEvent.Level.WARN,
+            "Hourly rollups built from truncated rows",
+            {"capped_hours": capped, "reason": "max_report_rows"},
+        )
+    # Only the newest rows of the period, for the prompt.
+    records = _fetch_deals_for_window(job, config, integrations, limit=AI_SAMPLE_ROWS)
+    details = {
+        "records": len(records),
+        "source": "rollups",
+        "coverage": coverage,
+        "output": _save_records_checkpoint(job, records),
+    }
+    _write_job_event(
+        job, JobRunEvent.Level.INFO, "Deals loaded", {"count": len(records), "source": details["source"]}
+    )
+    return details
+
+
+def _run_summarize_stage(
+    job: JobRun, config: TenantRuntimeConfig, integrations: dict[str, IntegrationConfig]
+) -> dict:
+    _ensure_not_stopped(job)
+    _mark_running(job, "Preparing report", 60)
+    metadata = job.metadata or {}
+    sync_stats = metadata.get("sync_stats") or {}
+    if metadata.get("window_aggregates"):
+        summary = dict(metadata["window_aggregates"])
+    else:
+        summary = _build_summary(_load_records_checkpoint(job, config, integrations))
+    if metadata.get("rollup_coverage") is not None:
+        summary["coverage"] = metadata["rollup_coverage"]
+        summary["coverage_source"] = "rollups"
+        if metadata.get("rollup_capped_hours"):
+            summary["capped_hours"] = metadata["rollup_capped_hours"]
+    else:
+        summary["coverage"] = sync_stats.get("sync_coverage", 1.0)
+    summary["sync"] = sync_stats
+    windows = comparison_windows(_report_type(job), job.window_start, job.window_end, get_timezone(config))
+    deltas = summary_deltas(job.tenant, summary, windows)
+    if deltas:
+        summary["deltas"] = deltas
+    _attach_job_metadata(job, {"summary": summary})
+    _write_job_event(job, JobRunEvent.Level.INFO, "Summary prepared", {"summary": summary})
+    return {"output": "summary"}
+
+
+def _run_report_stage(
+    job: JobRun, config: TenantRuntimeConfig, integrations: dict[str, IntegrationConfig]
+) -> dict:
+    # AI call and save are one stage: the saved Report row is the AI call's checkpoint.
+    report = job.reports.order_by("-id").first()
+    if report is not None:
+        _write_job_event(job, JobRunEvent.Level.INFO, "Report already saved", {"report_id": report.id})
+    else:
+        summary = (job.metadata or {}).get("summary")
+        if not summary:
+            raise PipelineError("Summary checkpoint is missing.")
         _ensure_not_stopped(job)
-        _mark_running(job, "Preparing report", 65)
-        summary = _build_summary(records)
-        summary["sync"] = sync_stats
-        _write_job_event(job, JobRunEvent.Level.INFO, "Summary prepared", {"summary": summary})
+        _mark_running(job, "Generating report", 70)
+        records = _load_records_checkpoint(job, config, integrations, limit=AI_SAMPLE_ROWS)
         report_text, ai_meta = _generate_report_text(
             tenant=job.tenant,
             config=config,
@@ -224,58 +711,223 @@ def execute_pipeline_job(job_id: int) -> None:
             window_end=job.window_end,
             records=records,
             summary=summary,
+            report_type=_report_type(job),
         )
+        if ai_meta.get("transcripts_error"):
+            _write_job_event(
+                job,
+                JobRunEvent.Level.WARN,
+                "Dialog previews unavailable, prompt built without them",
+                {"error": ai_meta["transcripts_error"]},
+            )
 
         _ensure_not_stopped(job)
         _mark_running(job, "Saving report", 82)
         report = _save_report(job, config, report_text, summary, ai_meta)
         _write_job_event(job, JobRunEvent.Level.INFO, "Report saved (DB)", {"report_id": report.id})
-        _push_report_to_supabase(job.tenant, integrations, report)
+    _attach_job_metadata(job, {"report_id": report.id})
+    return {"output": "report_id"}
+
+
+def _run_push_stage(
+    job: JobRun, config: TenantRuntimeConfig, integrations: dict[str, IntegrationConfig]
+) -> dict:
+    _ensure_not_stopped(job)
+    _mark_running(job, "Pushing report to Supabase", 88)
+    _push_report_to_supabase(job.tenant, integrations, _checkpoint_report(job))
+    return {}
+
+
+def _run_notify_stage(
+    job: JobRun, config: TenantRuntimeConfig, integrations: dict[str, IntegrationConfig]
+) -> dict:
+    _ensure_not_stopped(job)
+    _mark_running(job, "Sending Telegram notification", 95)
+    report = _checkpoint_report(job)
+    delivered = _send_telegram_notification(job.tenant, integrations, report)
+    _write_job_event(job, JobRunEvent.Level.INFO, "Telegram send attempted", {"delivered": delivered})
+    if delivered:
+        report.status = Report.Status.SENT
+        report.save(update_fields=["status", "updated_at"])
+
+    job.status = JobRun.Status.SUCCESS
+    job.current_step = "Done"
+    job.progress = 100
+    job.error = ""
+    if not job.started_at:
+        job.started_at = timezone.now()
+    job.finished_at = timezone.now()
+    job.save(
+        update_fields=[
+            "status",
+            "current_step",
+            "progress",
+            "error",
+            "started_at",
+            "finished_at",
+            "updated_at",
+        ]
+    )
+    _write_job_event(job, JobRunEvent.Level.INFO, "Done", {"report_id": report.id})
+    _write_audit(
+        tenant=job.tenant,
+        actor=job.requested_by,
+        action="report_job_success",
+        message="Report job finished successfully",
+        metadata={"job_id": job.id, "report_id": report.id},
+    )
+    _delete_records_checkpoint(job)
+    if _writes_rollups(job):
+        _queue_rollup_reports(job, config)
+    return {"delivered": delivered}
+
+
+def _queue_rollup_reports(job: JobRun, config: TenantRuntimeConfig) -> None:
+    # Weekly/monthly reports whose period ends with this daily window: its rollups are stored now.
+    tz = get_timezone(config)
+    metadata = config.metadata or {}
+    try:
+        min_coverage = min(max(float(metadata.get("rollup_min_coverage", MIN_REPORT_COVERAGE)), 0.0), 1.0)
+    except (TypeError, ValueError):
+        min_coverage = MIN_REPORT_COVERAGE
+    for report_type in due_rollup_reports(metadata, job.window_end, tz):
+        window_start, window_end = rollup_window(report_type, job.window_end, tz)
+        # Right after rollups are switched on, most of the period has none yet.
+        coverage = rollup_coverage(job.tenant, window_start, window_end)
+        if coverage < min_coverage:
+            _write_job_event(
+                job,
+                JobRunEvent.Level.INFO,
+                "Rollup report skipped",
+                {"report_type": report_type, "coverage": coverage, "min_coverage": min_coverage},
+            )
+            continue
+        try:
+            rollup_job, created = queue_report_job(
+                tenant=job.tenant,
+                runtime_config=config,
+                trigger_type=JobRun.TriggerType.SCHEDULED,
+                window_start=window_start,
+                window_end=window_end,
+                idempotency_key=build_job_idempotency_key(
+                    job.tenant_id, report_type, config.mode, window_start, window_end
+                ),
+                metadata={"source": "rollups", "report_type": report_type, "daily_job_id": job.id},
+            )
+        except PipelineError:
+            logger.exception("Failed to queue %s report for tenant %s", report_type, job.tenant.slug)
+            continue
+        if created:
+            _write_job_event(
+                job,
+                JobRunEvent.Level.INFO,
+                "Rollup report queued",
+                {"report_type": report_type, "job_id": rollup_job.id},
+            )
 
-        _ensure_not_stopped(job)
-        _mark_running(job, "Sending Telegram notification", 95)
-        delivered = _send_telegram_notification(job.tenant, integrations, report)
-        _write_job_event(job, JobRunEvent.Level.INFO, "Telegram send attempted", {"delivered": delivered})
-        if delivered:
-            report.status = Report.Status.SENT
-            report.save(update_fields=["status", "updated_at"])
-
-        job.status = JobRun.Status.SUCCESS
-        job.current_step = "Done"
-        job.progress = 100
-        job.error = ""
-        if not job.started_at:
-            job.started_at = timezone.now()
-        job.finished_at = timezone.now()
-        job.save(
-            update_fields=[
-                "status",
-                "current_step",
-                "progress",
-                "error",
-                "started_at",
-                "finished_at",
-                "updated_at",
-            ]
-        )
-        _write_job_event(job, JobRunEvent.Level.INFO, "Done", {"report_id": report.id})
-        _write_audit(
-            tenant=job.tenant,
-            actor=job.requested_by,
-            action="report_job_success",
-            message="Report job finished successfully",
-            metadata={"job_id": job.id, "report_id": report.id},
-        )
-    except PipelineError as exc:
-        _write_job_event(job, JobRunEvent.Level.ERROR, "PipelineError", {"error": str(exc)})
-        _mark_failed(job, str(exc))
-    except ConnectorError as exc:
-        _write_job_event(job, JobRunEvent.Level.ERROR, "ConnectorError", {"error": str(exc)})
-        _mark_failed(job, str(exc))
-    except Exception as exc:
-        logger.exception("Unexpected pipeline error for job %s", job.id)
-        _write_job_event(job, JobRunEvent.Level.ERROR, "Unexpected error", {"error": str(exc)})
-        _mark_failed(job, f"Unexpected error: {exc}")
+
+def _report_type(job: JobRun) -> str:
+    report_type = (job.metadata or {}).get("report_type")
+    if report_type:
+        return report_type
+    return "daily" if job.trigger_type == JobRun.TriggerType.SCHEDULED else "forced"
+
+
+def _writes_rollups(job: JobRun) -> bool:
+    # Only scheduled daily windows: they tile time, forced windows may overlap them.
+    return job.trigger_type == JobRun.TriggerType.SCHEDULED and _report_type(job) == "daily"
+
+
+_STAGE_RUNNERS = {
+    "load": _run_load_stage,
+    "summarize": _run_summarize_stage,
+    "report": _run_report_stage,
+    "push": _run_push_stage,
+    "notify": _run_notify_stage,
+}
+
+
+def _records_checkpoint_key(job: JobRun) -> str:
+    return f"{CHECKPOINT_CACHE_PREFIX}:{job.id}:records"
+
+
+def _save_records_checkpoint(job: JobRun, records: list[dict]) -> str:
+    # Loaded records go to the shared cache (Redis in production) rather than the job row; a lost
+    # checkpoint only costs a reload from Supabase.
+    key = _records_checkpoint_key(job)
+    try:
+        cache.set(key, records, timeout=CHECKPOINT_TTL_SECONDS)
+    except Exception:
+        logger.warning("Failed to checkpoint records for job %s", job.id, exc_info=True)
+        return ""
+    return key
+
+
+def _read_records_checkpoint(job: JobRun) -> list[dict] | None:
+    try:
+        return cache.get(_records_checkpoint_key(job))
+    except Exception:
+        logger.warning("Failed to read records checkpoint for job %s", job.id, exc_info=True)
+        return None
+
+
+def _load_records_checkpoint(
+    job: JobRun,
+    config: TenantRuntimeConfig,
+    integrations: dict[str, IntegrationConfig],
+    *,
+    limit: int | None = None,
+) -> list[dict]:
+    # limit: the caller only needs the newest rows, so a lost checkpoint reloads just those.
+    records = _read_records_checkpoint(job)
+    if records is None:
+        _write_job_event(job, JobRunEvent.Level.WARN, "Records checkpoint missing, reloading from Supabase")
+        records = _fetch_deals_for_window(job, config, integrations, limit=limit)
+        if limit is None:
+            _save_records_checkpoint(job, records)
+    return records
+
+
+def _delete_records_checkpoint(job: JobRun) -> None:
+    try:
+        cache.delete(_records_checkpoint_key(job))
+    except Exception:
+        logger.warning("Failed to delete records checkpoint for job %s", job.id, exc_info=True)
+
+
+def _checkpoint_report(job: JobRun) -> Report:
+    report_id = (job.metadata or {}).get("report_id")
+    report = Report.objects.filter(id=report_id, job_run=job).first() if report_id else None
+    if report is None:
+        raise PipelineError("Report checkpoint is missing.")
+    return report
+
+
+def _acquire_stage_lock(key: str, owner: str) -> bool:
+    # One stage of a job at a time across workers; expires with the task so a dead worker's lock
+    # never outlives stale-job recovery. The owner is "<stage>:<task id>": a task redelivered
+    # after its worker died (acks_late) carries the same id and takes the lock over at once.
+    timeout = settings.CELERY_TASK_TIME_LIMIT + 60
+    try:
+        if cache.add(key, owner, timeout=timeout):
+            return True
+        if cache.get(key) == owner:
+            logger.info("Stage lock %s taken over by redelivered task %s", key, owner)
+            cache.set(key, owner, timeout=timeout)
+            return True
+        return False
+    except Exception:
+        logger.warning("Stage lock failed for %s", key, exc_info=True)
+        return True
+
+
+def _release_stage_lock(key: str, owner: str) -> None:
+    # Only our own lock: a stage taken over by a redelivery must stay locked for it.
+    try:
+        if cache.get(key) == owner:
+            cache.delete(key)
+    except Exception:
+        logger.warning("Stage lock release failed for %s", key, exc_info=True)
 
 
 def _is_stopped_by_user(job: JobRun) -> bool:
@@ -289,27 +941,38 @@ def _ensure_not_stopped(job: JobRun) -> None:
 
 
 def _sync_sources(
-    job: JobRun, config: TenantRuntimeConfig, integrations: dict[str, IntegrationConfig]
+    job: JobRun,
+    config: TenantRuntimeConfig,
+    integrations: dict[str, IntegrationConfig],
+    *,
+    deadline: float | None = None,
+    fetch_limits: dict | None = None,
+    records_limit: int = 0,
+    records_min_messages: int = 0,
 ) -> dict:
     supabase = integrations[IntegrationConfig.Kind.SUPABASE]
     supabase_public = supabase.public_config or {}
     supabase_secret = decrypt_payload(supabase.secret_data_encrypted)
     amocrm_public = None
     amocrm_secret = None
+    amo_cursor = None
     radist_public = None
     radist_secret = None
+    radist_watermarks = None
     if IntegrationConfig.Kind.AMOCRM in integrations:
         amocrm_public = integrations[IntegrationConfig.Kind.AMOCRM].public_config or {}
         amocrm_secret = decrypt_payload(
             integrations[IntegrationConfig.Kind.AMOCRM].secret_data_encrypted
         )
+        amo_cursor = amocrm_public.get("sync_cursor")
     if IntegrationConfig.Kind.RADIST in integrations:
         radist_public = integrations[IntegrationConfig.Kind.RADIST].public_config or {}
         radist_secret = decrypt_payload(
             integrations[IntegrationConfig.Kind.RADIST].secret_data_encrypted
         )
+        radist_watermarks = load_watermarks(job.tenant)
 
-    return sync_sources_to_supabase(
+    sync_stats = sync_sources_to_supabase(
         tenant_slug=job.tenant.slug,
         mode=config.mode,
         window_start=job.window_start,
@@ -321,7 +984,62 @@ def _sync_sources(
         amocrm_secret=amocrm_secret,
         radist_public=radist_public,
         radist_secret=radist_secret,
+        amo_cursor=amo_cursor,
+        full_resync=bool((job.metadata or {}).get("full_resync")),
+        radist_watermarks=None if (job.metadata or {}).get("full_resync") else radist_watermarks,
+        deadline=deadline,
+        fetch_limits=fetch_limits,
+        records_limit=records_limit,
+        records_min_messages=records_min_messages,
     )
+    next_cursor = sync_stats.pop("amo_cursor", None)
+    if next_cursor and next_cursor != amo_cursor:
+        _save_public_state(integrations[IntegrationConfig.Kind.AMOCRM], "sync_cursor", next_cursor)
+    watermark_updates = sync_stats.pop("radist_watermarks", None)
+    if watermark_updates:
+        save_watermarks(job.tenant, watermark_updates)
+    return sync_stats
+
+
+def _stage_budget(config: TenantRuntimeConfig, key: str, default: int, minimum: int, maximum: int) -> int:
+    try:
+        seconds = int((config.metadata or {}).get(key) or default)
+    except (TypeError, ValueError):
+        seconds = default
+    return max(minimum, min(seconds, maximum))
+
+
+def _save_public_state(integration: IntegrationConfig, key: str, value) -> None:
+    integration.refresh_from_db(fields=["public_config"])
+    public_config = dict(integration.public_config or {})
+    public_config[key] = value
+    integration.public_config = public_config
+    integration.save(update_fields=["public_config", "updated_at"])
+
+
+def _apply_circuit_states(integrations: dict[str, IntegrationConfig], circuits: dict[str, dict]) -> None:
+    # Surface open breakers on the dashboard; clear only the errors the breaker itself set.
+    for kind, snapshot in circuits.items():
+        integration = integrations.get(kind)
+        if integration is None:
+            continue
+        if snapshot["state"] == "open":
+            until = datetime.fromtimestamp(snapshot["opened_until"], tz=dt_timezone.utc)
+            integration.status = IntegrationConfig.Status.ERROR
+            integration.last_error = (
+                f"{CIRCUIT_ERROR_PREFIX} until {until:%H:%M:%S} UTC: {snapshot.get('last_error') or ''}"
+            ).strip()
+        elif (
+            snapshot["state"] == "closed"
+            and integration.status == IntegrationConfig.Status.ERROR
+            and integration.last_error.startswith(CIRCUIT_ERROR_PREFIX)
+        ):
+            integration.status = IntegrationConfig.Status.OK
+            integration.last_error = ""
+        else:
+            continue
+        integration.last_checked_at = timezone.now()
+        integration.save(update_fields=["status", "last_error", "last_checked_at", "updated_at"])
 
 
 def _mark_running(job: JobRun, step: str, progress: int) -> None:
@@ -418,69 +1136,220 @@ def _validate_integrations(
 
 
 def _fetch_deals_for_window(
+    job: JobRun,
+    runtime_config: TenantRuntimeConfig,
+    integrations: dict[str, IntegrationConfig],
+    *,
+    limit: int | None = None,
+) -> list[dict]:
+    # Every deal of the window without transcripts, up to max_report_rows (truncation is logged),
+    # or just the newest `limit` rows.
+    max_rows = limit or _max_report_rows(runtime_config)
+    records = []
+    rows = _iter_deals_for_window(
+        job.tenant,
+        runtime_config,
+        integrations,
+        job.window_start,
+        job.window_end,
+        columns=DEAL_RECORD_COLUMNS,
+        page_size=min(DEALS_PAGE_SIZE, max_rows),
+    )
+    for row in rows:
+        if len(records) >= max_rows:
+            _write_job_event(
+                job,
+                JobRunEvent.Level.WARN,
+                "Report rows truncated",
+                {"max_report_rows": max_rows},
+            )
+            break
+        records.append(row)
+        if limit and len(records) >= limit:
+            break
+    return records
+
+
+def _iter_deals_for_window(
     tenant: Tenant,
     runtime_config: TenantRuntimeConfig,
     integrations: dict[str, IntegrationConfig],
     window_start: datetime | None,
     window_end: datetime | None,
-) -> list[dict]:
+    *,
+    columns: tuple[str, ...],
+    page_size: int = DEALS_PAGE_SIZE,
+) -> Iterator[dict]:
+    # Streams the window's deals newest first, page by page, selecting only the given columns.
     if window_start is None or window_end is None:
         raise PipelineError("Report window is not set.")
+    supabase_url, service_key = _supabase_credentials(integrations)
+    filter_field = _deals_filter_field(runtime_config)
+    params = [
+        ("select", ",".join(dict.fromkeys((*columns, filter_field, "deal_id")))),
+        ("tenant_id", f"eq.{tenant.slug}"),
+        (filter_field, f"gte.{window_start.astimezone(dt_timezone.utc).isoformat()}"),
+        (filter_field, f"lt.{window_end.astimezone(dt_timezone.utc).isoformat()}"),
+    ]
+    if runtime_config.mode != TenantRuntimeConfig.Mode.AMOCRM_ONLY:
+        params.append(("messages_count", f"gte.{runtime_config.min_dialogs_for_report}"))
+    params += [("order", f"{filter_field}.desc,deal_id.desc"), ("limit", str(page_size))]
+    after = None
+    while True:
+        page_params = list(params)
+        if after is not None:
+            # Keyset paging: rows strictly after the previous page's last (filter_field, deal_id).
+            value, deal_id = after
+            page_params.append(
+                ("or", f"({filter_field}.lt.{value},and({filter_field}.eq.{value},deal_id.lt.{deal_id}))")
+            )
+        page = _get_supabase_rows(supabase_url, service_key, "deals", page_params)
+        yield from page
+        if len(page) < page_size:
+            return
+        after = (page[-1][filter_field], page[-1]["deal_id"])
+
+
+def _fetch_window_aggregates(
+    job: JobRun, runtime_config: TenantRuntimeConfig, integrations: dict[str, IntegrationConfig]
+) -> dict | None:
+    # Summary counts from the deals_window_summary function (supabase migration 004) over the
+    # same rows _fetch_deals_for_window reads; None when the function is not deployed.
+    payload = _call_window_rpc("deals_window_summary", job, runtime_config, integrations)
+    if payload is None:
+        return None
+    if not isinstance(payload, dict):
+        raise PipelineError("Supabase returned invalid summary payload.")
+    return _summary_counts(payload)
+
+
+def _fetch_hourly_aggregates(
+    job: JobRun, runtime_config: TenantRuntimeConfig, integrations: dict[str, IntegrationConfig]
+) -> dict[datetime, dict] | None:
+    # The same counts per bucket of rollups.hour_buckets (supabase migration 005); None when the
+    # function is not deployed. Buckets without deals are absent.
+    payload = _call_window_rpc("deals_hourly_summary", job, runtime_config, integrations)
+    if payload is None:
+        return None
+    if not isinstance(payload, list):
+        raise PipelineError("Supabase returned invalid hourly summary payload.")
+    return {
+        bucket_start: _summary_counts(summary)
+        for bucket_start, summary in parse_bucket_summaries(payload).items()
+    }
+
+
+def _call_window_rpc(
+    function: str,
+    job: JobRun,
+    runtime_config: TenantRuntimeConfig,
+    integrations: dict[str, IntegrationConfig],
+):
+    if job.window_start is None or job.window_end is None:
+        raise PipelineError("Report window is not set.")
+    supabase_url, service_key = _supabase_credentials(integrations)
+    min_messages = 0
+    if runtime_config.mode != TenantRuntimeConfig.Mode.AMOCRM_ONLY:
+        min_messages = runtime_config.min_dialogs_for_report
+    body = {
+        "p_tenant_id": job.tenant.slug,
+        "p_window_start": job.window_start.astimezone(dt_timezone.utc).isoformat(),
+        "p_window_end": job.window_end.astimezone(dt_timezone.utc).isoformat(),
+        "p_filter_field": _deals_filter_field(runtime_config),
+        "p_min_messages": min_messages,
+    }
+    try:
+        response = get_http_client().request(
+            "POST",
+            f"{supabase_url}/rest/v1/rpc/{function}",
+            headers={
+                "apikey": service_key,
+                "Authorization": f"Bearer {service_key}",
+                "Content-Type": "application/json",
+                "User-Agent": "synkro/1.0",
+            },
+            body=dumps_bytes(body),
+            timeout=30,
+        )
+    except HTTPTransportError as exc:
+        raise PipelineError(f"Supabase network error: {exc.reason}") from exc
+    if response.status == 404:
+        return None
+    if response.status >= 400:
+        raise PipelineError(f"Supabase RPC HTTP {response.status}")
+    try:
+        payload = loads(response.body or b"null")
+    except (UnicodeDecodeError, JSONDecodeError) as exc:
+        raise PipelineError("Supabase response parse error.") from exc
+    if payload is None:
+        raise PipelineError(f"Supabase returned an empty {function} payload.")
+    return payload
+
 
+def _fetch_transcripts(
+    tenant: Tenant, integrations: dict[str, IntegrationConfig], deal_ids: list[int]
+) -> dict[int, str]:
+    if not deal_ids:
+        return {}
+    supabase_url, service_key = _supabase_credentials(integrations)
+    params = [
+        ("select", "deal_id,dialog_norm"),
+        ("tenant_id", f"eq.{tenant.slug}"),
+        ("deal_id", f"in.({','.join(str(deal_id) for deal_id in deal_ids)})"),
+    ]
+    rows = _get_supabase_rows(supabase_url, service_key, "deals", params)
+    return {row.get("deal_id"): row.get("dialog_norm") or "" for row in rows}
+
+
+def _supabase_credentials(integrations: dict[str, IntegrationConfig]) -> tuple[str, str]:
     supabase = integrations[IntegrationConfig.Kind.SUPABASE]
     supabase_url = (supabase.public_config or {}).get("url", "").rstrip("/")
     supabase_secret = decrypt_payload(supabase.secret_data_encrypted)
     service_key = supabase_secret.get("service_role_key") or supabase_secret.get("service_role_jwt")
     if not supabase_url or not service_key:
         raise PipelineError("Supabase credentials are incomplete.")
+    return supabase_url, service_key
 
-    filter_field = "updated_at"
-    if runtime_config.mode in {
-        TenantRuntimeConfig.Mode.AMOCRM_RADIST,
-        TenantRuntimeConfig.Mode.RADIST_ONLY,
-    }:
-        filter_field = "last_message_at"
 
-    params = [
-        (
-            "select",
-            "deal_id,deal_name,status,responsible,messages_count,first_message_at,last_message_at,updated_at,dialog_norm,comment",
-        ),
-        ("tenant_id", f"eq.{tenant.slug}"),
-        (filter_field, f"gte.{window_start.astimezone(dt_timezone.utc).isoformat()}"),
-        (filter_field, f"lt.{window_end.astimezone(dt_timezone.utc).isoformat()}"),
-        ("order", f"{filter_field}.desc"),
-        ("limit", str(max(50, runtime_config.radist_fetch_limit))),
-    ]
+def _get_supabase_rows(
+    supabase_url: str, service_key: str, table: str, params: list[tuple[str, str]]
+) -> list:
     query = urlencode(params, safe=",:.")
-    endpoint = f"{supabase_url}/rest/v1/deals?{query}"
-    req = Request(
-        endpoint,
-        headers={
-            "apikey": service_key,
-            "Authorization": f"Bearer {service_key}",
-            "User-Agent": "synkro/1.0",
-        },
-        method="GET",
-    )
     try:
-        with urlopen(req, timeout=15) as response:
-            if response.status >= 400:
-                raise PipelineError(f"Supabase HTTP {response.status}")
-            payload = json.loads(response.read().decode("utf-8") or "[]")
-            if not isinstance(payload, list):
-                raise PipelineError("Supabase returned invalid deals payload.")
-            if runtime_config.mode == TenantRuntimeConfig.Mode.AMOCRM_ONLY:
-                return payload
-            return [
-                row for row in payload if int(row.get("messages_count") or 0) >= runtime_config.min_dialogs_for_report
-            ]
-    except HTTPError as exc:
-        raise PipelineError(f"Supabase HTTP {exc.code}") from exc
-    except URLError as exc:
+        response = get_http_client().request(
+            "GET",
+            f"{supabase_url}/rest/v1/{table}?{query}",
+            headers={
+                "apikey": service_key,
+                "Authorization": f"Bearer {service_key}",
+                "User-Agent": "synkro/1.0",
+            },
+            timeout=15,
+        )
+    except HTTPTransportError as exc:
         raise PipelineError(f"Supabase network error: {exc.reason}") from exc
-    except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+    if response.status >= 400:
+        raise PipelineError(f"Supabase HTTP {response.status}")
+    try:
+        payload = loads(response.body or b"[]")
+    except (UnicodeDecodeError, JSONDecodeError) as exc:
         raise PipelineError("Supabase response parse error.") from exc
+    if not isinstance(payload, list):
+        raise PipelineError(f"Supabase returned invalid {table} payload.")
+    return payload
+
+
+def _deals_filter_field(runtime_config: TenantRuntimeConfig) -> str:
+    if runtime_config.mode in {
+        TenantRuntimeConfig.Mode.AMOCRM_RADIST,
+        TenantRuntimeConfig.Mode.RADIST_ONLY,
+    }:
+        return "last_message_at"
+    return "updated_at"
+
+
+def _max_report_rows(runtime_config: TenantRuntimeConfig) -> int:
+    return _stage_budget(runtime_config, "max_report_rows", 20000, 100, 200000)
 
 
 def _build_summary(records: list[dict]) -> dict:
@@ -500,7 +1369,26 @@ def _build_summary(records: list[dict]) -> dict:
         summary["status_counts"][status] = summary["status_counts"].get(status, 0) + 1
         responsible = (row.get("responsible") or "unknown").strip() or "unknown"
         summary["responsible_counts"][responsible] = summary["responsible_counts"].get(responsible, 0) + 1
-    return summary
+    return _summary_counts(summary)
+
+
+def _summary_counts(summary: dict) -> dict:
+    # One shape for the Python count and the deals_window_summary RPC (jsonb drops key order):
+    # histograms ordered by count desc, then name, so the report text does not depend on the path.
+    return {
+        "total_deals": int(summary.get("total_deals") or 0),
+        "with_dialogs": int(summary.get("with_dialogs") or 0),
+        "total_messages": int(summary.get("total_messages") or 0),
+        "status_counts": _ordered_counts(summary.get("status_counts")),
+        "responsible_counts": _ordered_counts(summary.get("responsible_counts")),
+    }
+
+
+def _ordered_counts(counts: dict | None) -> dict[str, int]:
+    return {
+        name: int(count)
+        for name, count in sorted((counts or {}).items(), key=lambda item: (-int(item[1]), item[0]))
+    }
 
 
 def _generate_report_text(
@@ -512,6 +1400,7 @@ def _generate_report_text(
     window_end: datetime,
     records: list[dict],
     summary: dict,
+    report_type: str = "daily",
 ) -> tuple[str, dict]:
     ai_config = integrations[IntegrationConfig.Kind.AI]
     ai_public = ai_config.public_config or {}
@@ -539,8 +1428,26 @@ def _generate_report_text(
             )[:5]
         ),
     ]
-    for row in records[:15]:
-        text_preview = (row.get("dialog_norm") or "").strip()
+    if report_type in ROLLUP_REPORT_TYPES:
+        context_lines.append(
+            f"Report type: {report_type} (a deal active on several business days counts on each of them)"
+        )
+    context_lines += _delta_lines(summary)
+    if _coverage_label(summary) != "full":
+        context_lines.append(f"Sync coverage: {_coverage_label(summary)}")
+    # Transcripts only for the rows that go into the prompt (older checkpoints still carry them).
+    sample = records[:AI_SAMPLE_ROWS]
+    transcripts_error = ""
+    try:
+        transcripts = _fetch_transcripts(
+            tenant, integrations, [row.get("deal_id") for row in sample if "dialog_norm" not in row]
+        )
+    except (PipelineError, ConnectorError) as exc:
+        # Previews are optional: the prompt goes out without them.
+        transcripts = {}
+        transcripts_error = str(exc)
+    for row in sample:
+        text_preview = (row.get("dialog_norm", transcripts.get(row.get("deal_id"))) or "").strip()
         if len(text_preview) > 350:
             text_preview = text_preview[:350] + "..."
         context_lines.append(
@@ -549,21 +1456,16 @@ def _generate_report_text(
             f"responsible={row.get('responsible')}; dialog={text_preview or '-'}"
         )
     context = "\n".join(context_lines)
+    meta = {"ai_provider": provider, "ai_model": model}
+    if transcripts_error:
+        meta["transcripts_error"] = transcripts_error
 
     try:
         text = _call_ai(provider=provider, model=model, api_key=api_key, prompt=prompt, context=context)
-        return text, {"ai_provider": provider, "ai_model": model, "ai_fallback": False}
+        return text, {**meta, "ai_fallback": False}
     except PipelineError as exc:
         fallback = _build_fallback_report(config.mode, window_start, window_end, summary)
-        return (
-            fallback,
-            {
-                "ai_provider": provider,
-                "ai_model": model,
-                "ai_fallback": True,
-                "ai_error": str(exc),
-            },
-        )
+        return fallback, {**meta, "ai_fallback": True, "ai_error": str(exc)}
 
 
 def _call_ai(*, provider: str, model: str, api_key: str, prompt: str, context: str) -> str:
@@ -581,25 +1483,15 @@ def _call_ai(*, provider: str, model: str, api_key: str, prompt: str, context: s
             ],
             "temperature": 0.2,
         }
-        req = Request(
+        payload = _post_ai_json(
             "https://api.openai.com/v1/chat/completions",
             headers={
                 "Authorization": f"Bearer {api_key}",
                 "Content-Type": "application/json",
                 "User-Agent": "synkro/1.0",
             },
-            data=json.dumps(body).encode("utf-8"),
-            method="POST",
+            body=body,
         )
-        try:
-            with urlopen(req, timeout=30) as response:
-                payload = json.loads(response.read().decode("utf-8") or "{}")
-        except HTTPError as exc:
-            raise PipelineError(f"AI HTTP {exc.code}") from exc
-        except URLError as exc:
-            raise PipelineError(f"AI network error: {exc.reason}") from exc
-        except (UnicodeDecodeError, json.JSONDecodeError) as exc:
-            raise PipelineError("AI response parse error") from exc
         message = (
             (payload.get("choices") or [{}])[0].get("message", {}).get("content", "").strip()
         )
@@ -623,21 +1515,11 @@ def _call_ai(*, provider: str, model: str, api_key: str, prompt: str, context: s
                 }
             ]
         }
-        req = Request(
+        payload = _post_ai_json(
             endpoint,
             headers={"Content-Type": "application/json", "User-Agent": "synkro/1.0"},
-            data=json.dumps(body).encode("utf-8"),
-            method="POST",
+            body=body,
         )
-        try:
-            with urlopen(req, timeout=30) as response:
-                payload = json.loads(response.read().decode("utf-8") or "{}")
-        except HTTPError as exc:
-            raise PipelineError(f"AI HTTP {exc.code}") from exc
-        except URLError as exc:
-            raise PipelineError(f"AI network error: {exc.reason}") from exc
-        except (UnicodeDecodeError, json.JSONDecodeError) as exc:
-            raise PipelineError("AI response parse error") from exc
 
         candidates = payload.get("candidates") or []
         if not candidates:
@@ -651,6 +1533,54 @@ def _call_ai(*, provider: str, model: str, api_key: str, prompt: str, context: s
     raise PipelineError(f"Unsupported AI provider: {provider}")
 
 
+def _post_ai_json(endpoint: str, *, headers: dict, body: dict) -> dict:
+    try:
+        response = get_http_client().request(
+            "POST",
+            endpoint,
+            headers=headers,
+            body=dumps_bytes(body),
+            timeout=30,
+        )
+    except HTTPTransportError as exc:
+        raise PipelineError(f"AI network error: {exc.reason}") from exc
+    if response.status >= 400:
+        raise PipelineError(f"AI HTTP {response.status}")
+    try:
+        return loads(response.body or b"{}")
+    except (UnicodeDecodeError, JSONDecodeError) as exc:
+        raise PipelineError("AI response parse error") from exc
+
+
+def _coverage_label(summary: dict) -> str:
+    coverage = summary.get("coverage")
+    if coverage is None or coverage >= 1:
+        label = "full"
+    elif summary.get("coverage_source") == "rollups":
+        label = f"{coverage:.0%} (hourly rollups missing for part of the period)"
+    else:
+        label = f"{coverage:.0%} (sync time budget exhausted, least recent activity missing)"
+    if summary.get("capped_hours"):
+        label += f"; {summary['capped_hours']} h undercounted (rows cut at max_report_rows)"
+    return label
+
+
+def _delta_lines(summary: dict) -> list[str]:
+    lines = []
+    for label, delta in (summary.get("deltas") or {}).items():
+        parts = []
+        for key, name in DELTA_NAMES:
+            previous = delta["previous"][key]
+            change = delta["change"][key]
+            percent = f", {change / previous:+.0%}" if previous else ""
+            parts.append(f"{name} {change:+d}{percent} (was {previous})")
+        capped = ""
+        if delta.get("capped_hours"):
+            capped = f" [previous period: {delta['capped_hours']} h undercounted]"
+        lines.append(f"{DELTA_LABELS.get(label, label)}: " + "; ".join(parts) + capped)
+    return lines
+
+
 def _build_fallback_report(mode: str, window_start: datetime, window_end: datetime, summary: dict) -> str:
     status_line = ", ".join(
         f"{name}: {count}"
@@ -670,6 +1600,8 @@ def _build_fallback_report(mode: str, window_start: datetime, window_end: dateti
             f"Total deals: {summary['total_deals']}",
             f"Deals with dialogs: {summary['with_dialogs']}",
             f"Total messages: {summary['total_messages']}",
+            f"Sync coverage: {_coverage_label(summary)}",
+            *_delta_lines(summary),
             f"Statuses: {status_line}",
             f"Responsible: {responsible_line}",
             "Action: verify AI integration if you need narrative insights.",
@@ -692,7 +1624,7 @@ def _save_report(
         job_run=job,
         period_start=local_window_start.date(),
         period_end=(local_window_end - timedelta(seconds=1)).date(),
-        report_type="daily" if job.trigger_type == JobRun.TriggerType.SCHEDULED else "forced",
+        report_type=_report_type(job),
         status=Report.Status.READY,
         summary_text=report_text,
         metadata={
@@ -734,12 +1666,8 @@ def _push_report_to_supabase(
     try:
         _post_supabase_reports(supabase_url, service_key, payload)
         return
-    except HTTPError as exc:
-        body = ""
-        try:
-            body = (exc.read() or b"").decode("utf-8", errors="ignore")
-        except Exception:
-            body = ""
+    except HTTPStatusError as exc:
+        body = (exc.body or b"").decode("utf-8", errors="ignore")
         # Backward compatibility: older schema may not have source_report_id yet.
         if exc.code == 400 and "source_report_id" in body:
             legacy_payload = [
@@ -771,7 +1699,8 @@ def _to_supabase_report_type(report_type: str) -> str:
 
 def _post_supabase_reports(supabase_url: str, service_key: str, payload: list[dict]) -> None:
     endpoint = f"{supabase_url}/rest/v1/reports"
-    req = Request(
+    get_http_client().request(
+        "POST",
         endpoint,
         headers={
             "apikey": service_key,
@@ -780,11 +1709,9 @@ def _post_supabase_reports(supabase_url: str, service_key: str, payload: list[di
             "Prefer": "return=minimal",
             "User-Agent": "synkro/1.0",
         },
-        data=json.dumps(payload).encode("utf-8"),
-        method="POST",
-    )
-    with urlopen(req, timeout=15):
-            return
+        body=dumps_bytes(payload),
+        timeout=15,
+    ).raise_for_status()
 
 
 def _send_telegram_notification(
@@ -800,18 +1727,20 @@ def _send_telegram_notification(
     if not chat_id or not bot_token:
         return False
 
-    text = f"[Synkro] Отчет {tenant.name}\n\n{report.summary_text}"
+    title = REPORT_TITLES.get(report.report_type, "Отчет")
+    text = f"[Synkro] {title} {tenant.name}\n\n{report.summary_text}"
     if len(text) > 3900:
         text = text[:3900] + "..."
-    req = Request(
-        f"https://api.telegram.org/bot{bot_token}/sendMessage",
-        headers={"Content-Type": "application/json"},
-        data=json.dumps({"chat_id": chat_id, "text": text}).encode("utf-8"),
-        method="POST",
-    )
     try:
-        with urlopen(req, timeout=12) as response:
-            return response.status < 400
+        response = get_http_client().request(
+            "POST",
+            f"https://api.telegram.org/bot{bot_token}/sendMessage",
+            headers={"Content-Type": "application/json"},
+            body=dumps_bytes({"chat_id": chat_id, "text": text}),
+            timeout=12,
+        )
+        response.raise_for_status()
+        return True
     except Exception:
         logger.exception("Telegram notification failed for tenant %s", tenant.slug)
         return False
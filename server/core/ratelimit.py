@@ -0,0 +1,119 @@
+import hashlib
+import random
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+# Requests per second and burst size per integration kind. amoCRM documents 7 req/s
+# per integration; Radist and Supabase values are conservative defaults.
+DEFAULT_RATE_LIMITS = {
+    "amocrm": {"rate": 7.0, "burst": 7},
+    "radist": {"rate": 5.0, "burst": 10},
+    "supabase": {"rate": 20.0, "burst": 40},
+}
+MAX_RETRY_AFTER_SECONDS = 120.0
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int, *, key: str = "", kind: str = ""):
+        self.rate = rate
+        self.burst = burst
+        # Integration identity (kind:host:credential hash), shared with the circuit breaker.
+        self.key = key
+        self.kind = kind
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def configure(self, rate: float, burst: int) -> None:
+        with self._lock:
+            self.rate = rate
+            self.burst = burst
+            self._tokens = min(self._tokens, float(burst))
+
+    def acquire(self) -> float:
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                else:
+                    elapsed = max(0.0, now - self._updated)
+                    self._tokens = min(float(self.burst), self._tokens + elapsed * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return waited
+                    delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds: float) -> None:
+        # Throttled by upstream: every thread sharing this bucket waits, then refills from empty.
+        with self._lock:
+            until = time.monotonic() + max(0.0, seconds)
+            if until > self._paused_until:
+                self._paused_until = until
+                self._tokens = 0.0
+                self._updated = until
+
+
+_buckets: dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_rate_limiter(kind: str, url: str, credential: str, public_config: dict | None = None) -> TokenBucket:
+    rate, burst = _resolve_rate(kind, (public_config or {}).get("rate_limit"))
+    host = (urlsplit(url).hostname or url).lower()
+    fingerprint = hashlib.sha256((credential or "").encode("utf-8")).hexdigest()[:16]
+    key = f"{kind}:{host}:{fingerprint}"
+    with _buckets_lock:
+        bucket = _buckets.get(key)
+        if bucket is None:
+            bucket = _buckets[key] = TokenBucket(rate, burst, key=key, kind=kind)
+            return bucket
+    if bucket.rate != rate or bucket.burst != burst:
+        bucket.configure(rate, burst)
+    return bucket
+
+
+def parse_retry_after(value) -> float | None:
+    text = str(value or "").strip()
+    if not text:
+        return None
+    try:
+        seconds = float(text)
+    except ValueError:
+        try:
+            retry_at = parsedate_to_datetime(text)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=dt_timezone.utc)
+        seconds = (retry_at - datetime.now(dt_timezone.utc)).total_seconds()
+    return max(0.0, min(MAX_RETRY_AFTER_SECONDS, seconds))
+
+
+def backoff_delay(attempt: int, *, base: float = 1.0, cap: float = 30.0) -> float:
+    # Full jitter: uniform in [0, min(cap, base * 2^(attempt-1))].
+    return random.uniform(0, min(cap, base * (2 ** max(0, attempt - 1))))
+
+
+def _resolve_rate(kind: str, override) -> tuple[float, int]:
+    defaults = DEFAULT_RATE_LIMITS.get(kind) or {"rate": 5.0, "burst": 5}
+    rate = float(defaults["rate"])
+    burst = int(defaults["burst"])
+    if isinstance(override, dict):
+        try:
+            rate = float(override.get("rate") or rate)
+        except (TypeError, ValueError):
+            pass
+        try:
+            burst = int(override.get("burst") or burst)
+        except (TypeError, ValueError):
+            pass
+    return max(0.1, min(rate, 100.0)), max(1, min(burst, 200))
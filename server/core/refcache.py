@@ -0,0 +1,67 @@
+import hashlib
+import logging
+import time
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_CACHE_PREFIX = "synkro:ref"
+DEFAULT_REFERENCE_TTL = 6 * 60 * 60
+# Entries outlive their TTL so that expired ones can still be revalidated with ETag/Last-Modified.
+REFERENCE_RETENTION_SECONDS = 7 * 24 * 60 * 60
+REFERENCE_NAMES = {
+    "amocrm": ("pipelines",),
+    "radist": ("sources",),
+}
+
+
+def reference_cache_key(kind: str, scope: str, name: str) -> str:
+    scope_hash = hashlib.sha256((scope or "").strip().lower().encode("utf-8")).hexdigest()[:16]
+    return f"{REFERENCE_CACHE_PREFIX}:{kind}:{scope_hash}:{name}"
+
+
+def get_reference(key: str) -> dict | None:
+    try:
+        entry = cache.get(key)
+    except Exception:
+        logger.warning("Reference cache read failed for %s", key, exc_info=True)
+        return None
+    return entry if isinstance(entry, dict) else None
+
+
+def set_reference(key: str, payload, *, ttl: int, etag: str = "", last_modified: str = "") -> None:
+    entry = {
+        "payload": payload,
+        "etag": etag,
+        "last_modified": last_modified,
+        "expires_at": time.time() + ttl,
+    }
+    try:
+        cache.set(key, entry, timeout=max(ttl, REFERENCE_RETENTION_SECONDS))
+    except Exception:
+        logger.warning("Reference cache write failed for %s", key, exc_info=True)
+
+
+def invalidate_references(kind: str, scope: str) -> None:
+    keys = [reference_cache_key(kind, scope, name) for name in REFERENCE_NAMES.get(kind, ())]
+    if not keys:
+        return
+    try:
+        cache.delete_many(keys)
+    except Exception:
+        logger.warning("Reference cache invalidation failed for %s", kind, exc_info=True)
+
+
+def amocrm_reference_scope(public_config: dict | None) -> str:
+    domain = ((public_config or {}).get("domain") or "").strip().lower()
+    for prefix in ("https://", "http://"):
+        if domain.startswith(prefix):
+            domain = domain[len(prefix) :]
+    return domain.rstrip("/")
+
+
+def radist_reference_scope(public_config: dict | None) -> str:
+    public_config = public_config or {}
+    base_url = (public_config.get("api_base_url") or "https://api.radist.online/v2").strip().rstrip("/")
+    return f"{base_url.lower()}|{public_config.get('company_id') or ''}"
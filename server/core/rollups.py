@@ -0,0 +1,227 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from zoneinfo import ZoneInfo
+
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+from .models import HourlyRollup, JobRun, Tenant
+
+# Reports built by merging the hourly rollups of scheduled daily windows instead of a sync.
+ROLLUP_REPORT_TYPES = ("weekly", "monthly")
+COUNT_KEYS = ("total_deals", "with_dialogs", "total_messages")
+HISTOGRAM_KEYS = ("status_counts", "responsible_counts")
+# A comparison period is reported only when its rollups cover at least this share of it.
+MIN_COMPARISON_COVERAGE = 0.95
+# Weekly/monthly reports are queued only when rollups cover at least this share of the period
+# (rollup_min_coverage in TenantRuntimeConfig.metadata).
+MIN_REPORT_COVERAGE = 0.9
+
+
+def hour_buckets(window_start: datetime, window_end: datetime) -> list[tuple[datetime, datetime]]:
+    # UTC clock hours of the window; the first and last are cut at the window edges, so the
+    # buckets of back-to-back windows never overlap whatever the business day start.
+    start = window_start.astimezone(dt_timezone.utc)
+    end = window_end.astimezone(dt_timezone.utc)
+    buckets = []
+    while start < end:
+        bucket_end = min(start.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1), end)
+        buckets.append((start, bucket_end))
+        start = bucket_end
+    return buckets
+
+
+def bucket_records(
+    records: list[dict], field: str, window_start: datetime, window_end: datetime
+) -> dict[datetime, list[dict]]:
+    # Window records by the start of the bucket their filter field (last_message_at/updated_at)
+    # falls in; every bucket of the window is present, empty ones included.
+    start = window_start.astimezone(dt_timezone.utc)
+    end = window_end.astimezone(dt_timezone.utc)
+    grouped: dict[datetime, list[dict]] = {bucket_start: [] for bucket_start, _ in hour_buckets(start, end)}
+    for record in records:
+        value = _to_utc(record.get(field))
+        if value is None or not start <= value < end:
+            continue
+        grouped[max(value.replace(minute=0, second=0, microsecond=0), start)].append(record)
+    return grouped
+
+
+def oldest_record_time(records: list[dict], field: str) -> datetime | None:
+    values = [value for value in (_to_utc(record.get(field)) for record in records) if value is not None]
+    return min(values) if values else None
+
+
+def parse_bucket_summaries(payload: list) -> dict[datetime, dict]:
+    # Rows of the deals_hourly_summary RPC (supabase migration 005), keyed like bucket_records.
+    summaries = {}
+    for row in payload:
+        bucket_start = _to_utc(row.get("bucket_start"))
+        if bucket_start is not None:
+            summaries[bucket_start] = row
+    return summaries
+
+
+def merge_summaries(summaries) -> dict:
+    merged = {key: 0 for key in COUNT_KEYS}
+    merged.update({key: {} for key in HISTOGRAM_KEYS})
+    for summary in summaries:
+        for key in COUNT_KEYS:
+            merged[key] += int(summary.get(key) or 0)
+        for key in HISTOGRAM_KEYS:
+            counts = merged[key]
+            for name, count in (summary.get(key) or {}).items():
+                counts[name] = counts.get(name, 0) + int(count)
+    return merged
+
+
+def store_rollups(
+    job: JobRun,
+    summaries: dict[datetime, dict],
+    *,
+    coverage: float = 1.0,
+    capped_until: datetime | None = None,
+) -> int:
+    # Replaces every rollup overlapping the job's window, so a rerun or a moved business day
+    # start never leaves overlapping buckets behind. capped_until: the oldest row kept when the
+    # window rows were cut at max_report_rows (they are read newest first), so that hour and
+    # every earlier one are flagged as capped.
+    buckets = hour_buckets(job.window_start, job.window_end)
+    capped_until = _to_utc(capped_until)
+    rows = [
+        HourlyRollup(
+            tenant=job.tenant,
+            job_run=job,
+            bucket_start=bucket_start,
+            bucket_end=bucket_end,
+            coverage=coverage,
+            capped=capped_until is not None and bucket_start <= capped_until,
+            **_rollup_counts(summaries.get(bucket_start) or {}),
+        )
+        for bucket_start, bucket_end in buckets
+    ]
+    with transaction.atomic():
+        HourlyRollup.objects.filter(
+            tenant=job.tenant, bucket_start__lt=job.window_end, bucket_end__gt=job.window_start
+        ).delete()
+        HourlyRollup.objects.bulk_create(rows)
+    return len(rows)
+
+
+def load_rollups(
+    tenant: Tenant, window_start: datetime, window_end: datetime
+) -> tuple[dict, float, int]:
+    # Merged counts of the buckets inside the window, the share of the window they cover
+    # (weighted by each bucket's sync coverage) and the number of capped buckets among them.
+    rows = list(
+        _window_rollups(tenant, window_start, window_end).values(
+            "bucket_start", "bucket_end", "coverage", "capped", *COUNT_KEYS, *HISTOGRAM_KEYS
+        )
+    )
+    capped = sum(1 for row in rows if row["capped"])
+    return merge_summaries(rows), _covered_share(rows, window_start, window_end), capped
+
+
+def rollup_coverage(tenant: Tenant, window_start: datetime, window_end: datetime) -> float:
+    rows = _window_rollups(tenant, window_start, window_end).values("bucket_start", "bucket_end", "coverage")
+    return _covered_share(rows, window_start, window_end)
+
+
+def rollup_window(report_type: str, window_end: datetime, tz: ZoneInfo) -> tuple[datetime, datetime]:
+    # The week or calendar month of business days that ends with the daily window ending at
+    # window_end; the day's local end time carries over to every boundary.
+    end_local = window_end.astimezone(tz)
+    if report_type == "weekly":
+        return _shift_days(window_end, tz, -7), window_end
+    if report_type == "monthly":
+        last_day = (end_local - timedelta(seconds=1)).date()
+        offset = end_local.date() - last_day
+        first_end = datetime.combine(last_day.replace(day=1) + offset, end_local.time(), tzinfo=tz)
+        return _shift_days(first_end, tz, -1), window_end
+    raise ValueError(f"Unsupported rollup report type: {report_type}")
+
+
+def due_rollup_reports(metadata: dict, window_end: datetime, tz: ZoneInfo) -> list[str]:
+    # Rollup reports whose period closes with the daily window ending at window_end; opt-in
+    # through rollup_reports.
+    enabled = metadata.get("rollup_reports", [])
+    if not isinstance(enabled, list):
+        return []
+    last_day = (window_end.astimezone(tz) - timedelta(seconds=1)).date()
+    try:
+        weekday = int(metadata.get("weekly_report_weekday", 6))
+    except (TypeError, ValueError):
+        weekday = 6
+    due = []
+    if "weekly" in enabled and last_day.weekday() == weekday:
+        due.append("weekly")
+    if "monthly" in enabled and (last_day + timedelta(days=1)).day == 1:
+        due.append("monthly")
+    return due
+
+
+def comparison_windows(
+    report_type: str, window_start: datetime, window_end: datetime, tz: ZoneInfo
+) -> dict[str, tuple[datetime, datetime]]:
+    if report_type == "weekly":
+        return {"week_over_week": rollup_window("weekly", window_start, tz)}
+    if report_type == "monthly":
+        return {"month_over_month": rollup_window("monthly", window_start, tz)}
+    return {
+        "day_over_day": (_shift_days(window_start, tz, -1), _shift_days(window_end, tz, -1)),
+        "week_over_week": (_shift_days(window_start, tz, -7), _shift_days(window_end, tz, -7)),
+    }
+
+
+def summary_deltas(
+    tenant: Tenant, summary: dict, windows: dict[str, tuple[datetime, datetime]]
+) -> dict[str, dict]:
+    deltas = {}
+    for label, (start, end) in windows.items():
+        previous, coverage, capped = load_rollups(tenant, start, end)
+        if coverage < MIN_COMPARISON_COVERAGE:
+            continue
+        deltas[label] = {
+            "window_start": start.isoformat(),
+            "window_end": end.isoformat(),
+            "previous": {key: previous[key] for key in COUNT_KEYS},
+            "change": {key: int(summary.get(key) or 0) - previous[key] for key in COUNT_KEYS},
+        }
+        if capped:
+            deltas[label]["capped_hours"] = capped
+    return deltas
+
+
+def _window_rollups(tenant: Tenant, window_start: datetime, window_end: datetime):
+    return HourlyRollup.objects.filter(
+        tenant=tenant, bucket_start__gte=window_start, bucket_end__lte=window_end
+    )
+
+
+def _covered_share(rows, window_start: datetime, window_end: datetime) -> float:
+    covered = sum((row["bucket_end"] - row["bucket_start"]).total_seconds() * row["coverage"] for row in rows)
+    total = (window_end - window_start).total_seconds()
+    return round(covered / total, 4) if total > 0 else 0.0
+
+
+def _rollup_counts(summary: dict) -> dict:
+    return {
+        **{key: int(summary.get(key) or 0) for key in COUNT_KEYS},
+        **{key: dict(summary.get(key) or {}) for key in HISTOGRAM_KEYS},
+    }
+
+
+def _shift_days(value: datetime, tz: ZoneInfo, days: int) -> datetime:
+    # Same local wall time `days` days away (DST-safe), back in UTC.
+    local = value.astimezone(tz)
+    shifted = datetime.combine(local.date() + timedelta(days=days), local.time(), tzinfo=tz)
+    return shifted.astimezone(dt_timezone.utc)
+
+
+def _to_utc(value) -> datetime | None:
+    if isinstance(value, str):
+        value = parse_datetime(value)
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=dt_timezone.utc)
+    return value.astimezone(dt_timezone.utc)
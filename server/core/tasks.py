@@ -8,10 +8,13 @@ from .models import JobRun, Tenant
 from .pipeline import (
     build_job_idempotency_key,
     compute_last_closed_window,
+    enqueue_pipeline_stage,
     execute_pipeline_job,
+    execute_pipeline_stage,
     get_or_create_runtime_config,
     is_schedule_due,
     queue_report_job,
+    recover_stale_jobs,
 )
 
 logger = logging.getLogger(__name__)
@@ -51,6 +54,10 @@ def scheduler_tick() -> int:
                 queued += 1
         except Exception:
             logger.exception("Failed to queue scheduled job for tenant %s", config.tenant.slug)
+    try:
+        recover_stale_jobs(now_utc)
+    except Exception:
+        logger.exception("Failed to recover stale report jobs")
     try:
         process_telegram_followups()
     except Exception:
@@ -58,6 +65,16 @@ def scheduler_tick() -> int:
     return queued
 
 
-@shared_task(name="core.run_pipeline_job")
-def run_pipeline_job(job_id: int) -> None:
-    execute_pipeline_job(job_id)
+# Whole job in one task; kept for messages queued before the staged pipeline and manual reruns.
+@shared_task(bind=True, name="core.run_pipeline_job")
+def run_pipeline_job(self, job_id: int) -> None:
+    execute_pipeline_job(job_id, task_id=self.request.id or "")
+
+
+# acks_late + reject_on_worker_lost: a stage whose worker dies is redelivered and resumes there;
+# the redelivery keeps the task id, which lets it take over the dead worker's stage lock.
+@shared_task(bind=True, name="core.run_pipeline_stage", acks_late=True, reject_on_worker_lost=True)
+def run_pipeline_stage(self, job_id: int, stage: str) -> None:
+    next_stage = execute_pipeline_stage(job_id, stage, task_id=self.request.id or "")
+    if next_stage:
+        enqueue_pipeline_stage(JobRun.objects.get(id=job_id), next_stage)
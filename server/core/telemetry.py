@@ -0,0 +1,206 @@
+import bisect
+import re
+import threading
+from urllib.parse import urlsplit
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended.
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+_ID_SEGMENT = re.compile(r"^(\d+|[0-9a-f]{8}-[0-9a-f-]{27})$", re.IGNORECASE)
+
+
+def integration_kind(url: str) -> str:
+    path = urlsplit(url).path
+    if path.startswith("/rest/v1/"):
+        return "supabase"
+    if path.startswith("/api/v4/"):
+        return "amocrm"
+    if "/messaging/" in path:
+        return "radist"
+    return "other"
+
+
+def endpoint_class(url: str) -> str:
+    # Coarse endpoint name with ids stripped, e.g. "amocrm:leads", "radist:chats/with_contacts".
+    parts = urlsplit(url)
+    segments = [segment for segment in parts.path.split("/") if segment]
+    kind = integration_kind(url)
+    if kind in ("supabase", "amocrm"):
+        segments = segments[2:]
+    elif kind == "radist":
+        segments = segments[segments.index("messaging") + 1 :]
+    elif (parts.hostname or "") == "api.telegram.org":
+        # /bot<token>/<method>: never let the token into metrics.
+        return f"telegram:{segments[-1] if segments else ''}"
+    else:
+        return f"other:{parts.hostname or ''}{'/' + segments[-1] if segments else ''}"
+    name = "/".join("{id}" if _ID_SEGMENT.match(segment) else segment for segment in segments[:3])
+    return f"{kind}:{name}"
+
+
+class _Endpoint:
+    __slots__ = (
+        "requests",
+        "retries",
+        "errors",
+        "status",
+        "bytes_out",
+        "bytes_in",
+        "wire_bytes_in",
+        "latency_total_ms",
+        "latency_max_ms",
+        "buckets",
+    )
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+        self.status: dict[str, int] = {}
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.wire_bytes_in = 0
+        self.latency_total_ms = 0.0
+        self.latency_max_ms = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def summary(self) -> dict:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "errors": self.errors,
+            "status": dict(self.status),
+            "bytes_out": self.bytes_out,
+            "bytes_in": self.bytes_in,
+            "wire_bytes_in": self.wire_bytes_in,
+            "latency_ms": {
+                "p50": self._percentile(0.50),
+                "p95": self._percentile(0.95),
+                "max": round(self.latency_max_ms, 1),
+                "total": round(self.latency_total_ms, 1),
+            },
+            "histogram": list(self.buckets),
+        }
+
+    @classmethod
+    def from_summary(cls, summary: dict) -> "_Endpoint":
+        stats = cls()
+        stats.requests = summary.get("requests", 0)
+        stats.retries = summary.get("retries", 0)
+        stats.errors = summary.get("errors", 0)
+        stats.status = dict(summary.get("status") or {})
+        stats.bytes_out = summary.get("bytes_out", 0)
+        stats.bytes_in = summary.get("bytes_in", 0)
+        stats.wire_bytes_in = summary.get("wire_bytes_in", 0)
+        latency = summary.get("latency_ms") or {}
+        stats.latency_total_ms = latency.get("total", 0.0)
+        stats.latency_max_ms = latency.get("max", 0.0)
+        histogram = summary.get("histogram") or []
+        if len(histogram) == len(stats.buckets):
+            stats.buckets = list(histogram)
+        return stats
+
+    def _percentile(self, fraction: float) -> float:
+        # Histogram estimate: upper bound of the bucket holding the rank, never above the true max.
+        observed = sum(self.buckets)
+        if not observed:
+            return 0.0
+        rank = max(1, round(observed * fraction))
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                bound = LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else self.latency_max_ms
+                return round(min(bound, self.latency_max_ms), 1)
+        return round(self.latency_max_ms, 1)
+
+
+# Per-job HTTP telemetry: pipeline opens a collector for the job and every HTTP call made by
+# this process meanwhile (connectors and pipeline alike) is counted into it. A job split into
+# stage tasks seeds each stage's collector with the summary stored so far.
+class HTTPTelemetry:
+    def __init__(self, previous: dict | None = None):
+        endpoints = (previous or {}).get("endpoints") or {}
+        self._endpoints: dict[str, _Endpoint] = {
+            name: _Endpoint.from_summary(item) for name, item in endpoints.items()
+        }
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        endpoint: str,
+        *,
+        status: int | None,
+        elapsed_ms: float,
+        bytes_out: int = 0,
+        bytes_in: int = 0,
+        wire_bytes_in: int = 0,
+    ) -> None:
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = _Endpoint()
+            stats.requests += 1
+            if status is None:
+                stats.errors += 1
+            else:
+                code = str(status)
+                stats.status[code] = stats.status.get(code, 0) + 1
+            stats.bytes_out += bytes_out
+            stats.bytes_in += bytes_in
+            stats.wire_bytes_in += wire_bytes_in
+            stats.latency_total_ms += elapsed_ms
+            if elapsed_ms > stats.latency_max_ms:
+                stats.latency_max_ms = elapsed_ms
+            stats.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+
+    def record_retry(self, endpoint: str) -> None:
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = _Endpoint()
+            stats.retries += 1
+
+    def summary(self) -> dict:
+        with self._lock:
+            endpoints = {name: stats.summary() for name, stats in sorted(self._endpoints.items())}
+        return {
+            "requests": sum(item["requests"] for item in endpoints.values()),
+            "retries": sum(item["retries"] for item in endpoints.values()),
+            "errors": sum(item["errors"] for item in endpoints.values()),
+            "latency_total_ms": round(sum(item["latency_ms"]["total"] for item in endpoints.values()), 1),
+            "endpoints": endpoints,
+        }
+
+
+_active: list[HTTPTelemetry] = []
+_active_lock = threading.Lock()
+
+
+def begin_http_telemetry(previous: dict | None = None) -> HTTPTelemetry:
+    collector = HTTPTelemetry(previous)
+    with _active_lock:
+        _active.append(collector)
+    return collector
+
+
+def end_http_telemetry(collector: HTTPTelemetry) -> dict:
+    with _active_lock:
+        if collector in _active:
+            _active.remove(collector)
+    return collector.summary()
+
+
+def record_http_request(url: str, *, status: int | None, elapsed_ms: float, **sizes) -> None:
+    if not _active:
+        return
+    endpoint = endpoint_class(url)
+    for collector in list(_active):
+        collector.record(endpoint, status=status, elapsed_ms=elapsed_ms, **sizes)
+
+
+def record_http_retry(url: str) -> None:
+    if not _active:
+        return
+    endpoint = endpoint_class(url)
+    for collector in list(_active):
+        collector.record_retry(endpoint)
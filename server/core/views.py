@@ -33,14 +33,20 @@ from .models import (
     UserRole,
 )
 from .followups import build_report_followup_answer
+from .refcache import amocrm_reference_scope, invalidate_references, radist_reference_scope
 from .pipeline import (
     PipelineError,
     build_job_idempotency_key,
+    can_retry_report_job,
     compute_last_closed_window,
     get_or_create_runtime_config,
     queue_report_job,
+    retry_report_job,
     validate_forced_window,
 )
+from .watermarks import clear_watermarks
+
+RUNTIME_PUBLIC_CONFIG_KEYS = ("rate_limit", "gzip_upserts")
 
 
 def _is_authed(request):
@@ -165,6 +171,10 @@ def dashboard_reports(request):
                         window_start,
                         window_end,
                     )
+                    job_metadata = {"source": "dashboard_reports"}
+                    if forced_form.cleaned_data.get("full_resync"):
+                        idempotency_key = f"{idempotency_key}:full"
+                        job_metadata["full_resync"] = True
                     try:
                         job, created = queue_report_job(
                             tenant=tenant,
@@ -174,7 +184,7 @@ def dashboard_reports(request):
                             window_end=window_end,
                             requested_by=request.user,
                             idempotency_key=idempotency_key,
-                            metadata={"source": "dashboard_reports"},
+                            metadata=job_metadata,
                         )
                         if created:
                             message = f"Forced report queued. Job #{job.id}."
@@ -208,8 +218,27 @@ def dashboard_reports(request):
                     message = f"Job #{job.id} stopped and Celery task revoked."
                 else:
                     message = f"Job #{job.id} marked as stopped."
+    elif request.method == "POST" and action == "retry_report_job":
+        if not tenant:
+            message = "Tenant not found."
+        elif not can_force_report:
+            message = "Retry is allowed only from a client account."
+        else:
+            job = JobRun.objects.filter(
+                id=request.POST.get("job_id"),
+                tenant=tenant,
+                job_type=JobRun.JobType.REPORT_BUILD,
+            ).first()
+            if not job:
+                message = "Job not found."
+            else:
+                try:
+                    stage = retry_report_job(job, requested_by=request.user)
+                    message = f"Job #{job.id} queued for retry from stage '{stage}'."
+                except PipelineError as exc:
+                    message = str(exc)
 
-    if (request.method != "POST" or action == "stop_report_job") and runtime_config:
+    if (request.method != "POST" or action in ("stop_report_job", "retry_report_job")) and runtime_config:
         default_end = timezone.now()
         default_start = default_end - timedelta(hours=min(runtime_config.max_force_window_hours, 24))
         forced_form = ForcedReportForm(
@@ -238,6 +267,7 @@ def dashboard_reports(request):
                 if delta.total_seconds() >= 300:
                     stalled_minutes = int(delta.total_seconds() // 60)
             job.stalled_minutes = stalled_minutes
+            job.can_retry = can_retry_report_job(job)
 
         active_report_job = (
             JobRun.objects.filter(
@@ -525,7 +555,9 @@ def dashboard_settings(request):
                     anon = supabase_form.cleaned_data["supabase_anon_key"].strip()
                     service_key = supabase_form.cleaned_data["supabase_service_role_key"].strip()
 
-                    supabase_config.public_config = {"url": url, "anon_key": anon}
+                    supabase_config.public_config = _keep_runtime_public_keys(
+                        supabase_config.public_config, {"url": url, "anon_key": anon}
+                    )
                     if service_key:
                         supabase_config.secret_data_encrypted = encrypt_payload(
                             {"service_role_key": service_key}
@@ -554,10 +586,13 @@ def dashboard_settings(request):
                 amocrm_form = AmoCRMSettingsForm(request.POST)
                 if amocrm_form.is_valid():
                     domain = amocrm_form.cleaned_data["domain"].strip()
-                    amocrm_config.public_config = {
-                        "domain": domain,
-                        "client_id": amocrm_form.cleaned_data["client_id"].strip(),
-                    }
+                    amocrm_config.public_config = _keep_runtime_public_keys(
+                        amocrm_config.public_config,
+                        {
+                            "domain": domain,
+                            "client_id": amocrm_form.cleaned_data["client_id"].strip(),
+                        },
+                    )
                     secret_payload = amocrm_secret.copy()
                     access_token = amocrm_form.cleaned_data["access_token"].strip()
                     if access_token:
@@ -569,6 +604,7 @@ def dashboard_settings(request):
                     if refresh_token:
                         secret_payload["refresh_token"] = refresh_token
                     amocrm_config.secret_data_encrypted = encrypt_payload(secret_payload)
+                    invalidate_references("amocrm", amocrm_reference_scope(amocrm_config.public_config))
                     if action == "check_amocrm":
                         ok, error = _check_amocrm(domain, secret_payload.get("access_token", ""))
                         amocrm_config.status = (
@@ -590,10 +626,13 @@ def dashboard_settings(request):
             elif action in {"save_radist", "check_radist"}:
                 radist_form = RadistSettingsForm(request.POST)
                 if radist_form.is_valid():
-                    radist_config.public_config = {
-                        "api_base_url": radist_form.cleaned_data["api_base_url"].strip(),
-                        "company_id": radist_form.cleaned_data["company_id"],
-                    }
+                    radist_config.public_config = _keep_runtime_public_keys(
+                        radist_config.public_config,
+                        {
+                            "api_base_url": radist_form.cleaned_data["api_base_url"].strip(),
+                            "company_id": radist_form.cleaned_data["company_id"],
+                        },
+                    )
                     secret_payload = radist_secret.copy()
                     api_key = radist_form.cleaned_data["api_key"].strip()
                     if api_key:
@@ -604,6 +643,10 @@ def dashboard_settings(request):
                         message = "Radist: API key обязателен."
                     else:
                         radist_config.secret_data_encrypted = encrypt_payload(secret_payload)
+                        invalidate_references(
+                            "radist", radist_reference_scope(radist_config.public_config)
+                        )
+                        clear_watermarks(tenant)
                     if active_api_key:
                         if action == "check_radist":
                             ok, error = _check_radist(
@@ -627,6 +670,14 @@ def dashboard_settings(request):
                 else:
                     message = "Radist: проверьте заполнение полей."
 
+            elif action == "reset_amocrm_cache":
+                invalidate_references("amocrm", amocrm_reference_scope(amocrm_config.public_config))
+                message = "amoCRM: кэш справочников сброшен."
+
+            elif action == "reset_radist_cache":
+                invalidate_references("radist", radist_reference_scope(radist_config.public_config))
+                message = "Radist: кэш справочников сброшен."
+
             elif action in {"save_ai", "check_ai", "load_ai_models"}:
                 ai_form = AISettingsForm(request.POST, model_choices=ai_model_choices)
                 if ai_form.is_valid():
@@ -869,6 +920,14 @@ def _check_supabase(url: str, anon_key: str) -> tuple[bool, str]:
         return False, f"Network error: {exc.reason}"
 
 
+def _keep_runtime_public_keys(previous: dict | None, updated: dict) -> dict:
+    # Keys tuned by operators outside the settings form survive a form save.
+    for key in RUNTIME_PUBLIC_CONFIG_KEYS:
+        if key in (previous or {}):
+            updated.setdefault(key, previous[key])
+    return updated
+
+
 def _get_or_create_config(tenant: Tenant, kind: str) -> IntegrationConfig:
     config, _ = IntegrationConfig.objects.get_or_create(tenant=tenant, kind=kind)
     return config
@@ -0,0 +1,75 @@
+from django.db import transaction
+from django.utils import timezone
+
+from .models import RadistWatermark, Tenant
+
+# Chats kept per tenant; the least recently covered ones are dropped first.
+RADIST_WATERMARKS_LIMIT = 2000
+
+
+def load_watermarks(tenant: Tenant) -> dict[str, dict]:
+    # {chat_id: {from, until, message_id}}, the shape the Radist connector reads.
+    rows = RadistWatermark.objects.filter(tenant=tenant).values_list(
+        "chat_id", "covered_from", "covered_until", "message_id"
+    )
+    return {
+        str(chat_id): {"from": covered_from, "until": covered_until, "message_id": message_id}
+        for chat_id, covered_from, covered_until, message_id in rows
+    }
+
+
+def save_watermarks(tenant: Tenant, updates: dict) -> None:
+    # Row per chat under select_for_update, so concurrent syncs only touch the chats they
+    # fetched; a watermark older than the stored one (a slower, earlier run) is ignored.
+    # None drops the chat's watermark.
+    updates = {int(chat_id): watermark for chat_id, watermark in updates.items()}
+    if not updates:
+        return
+    with transaction.atomic():
+        existing = {
+            row.chat_id: row
+            for row in RadistWatermark.objects.select_for_update().filter(
+                tenant=tenant, chat_id__in=list(updates)
+            )
+        }
+        dropped = [chat_id for chat_id, watermark in updates.items() if watermark is None]
+        changed = []
+        created = []
+        for chat_id, watermark in updates.items():
+            if watermark is None:
+                continue
+            row = existing.get(chat_id)
+            if row is None:
+                created.append(
+                    RadistWatermark(
+                        tenant=tenant,
+                        chat_id=chat_id,
+                        covered_from=watermark["from"],
+                        covered_until=watermark["until"],
+                        message_id=watermark["message_id"],
+                    )
+                )
+            elif watermark["until"] >= row.covered_until:
+                row.covered_from = watermark["from"]
+                row.covered_until = watermark["until"]
+                row.message_id = watermark["message_id"]
+                row.updated_at = timezone.now()
+                changed.append(row)
+        if dropped:
+            RadistWatermark.objects.filter(tenant=tenant, chat_id__in=dropped).delete()
+        if changed:
+            RadistWatermark.objects.bulk_update(
+                changed, ["covered_from", "covered_until", "message_id", "updated_at"]
+            )
+        if created:
+            # A concurrent run may have created the same chat meanwhile: keep its row.
+            RadistWatermark.objects.bulk_create(created, ignore_conflicts=True)
+    stale_ids = list(
+        RadistWatermark.objects.filter(tenant=tenant).values_list("id", flat=True)[RADIST_WATERMARKS_LIMIT:]
+    )
+    if stale_ids:
+        RadistWatermark.objects.filter(id__in=stale_ids).delete()
+
+
+def clear_watermarks(tenant: Tenant) -> None:
+    RadistWatermark.objects.filter(tenant=tenant).delete()
@@ -111,11 +111,28 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+REDIS_URL = os.environ.get("REDIS_URL", "")
+# Shared across web and worker processes when Redis is available (reference lookups, etc.).
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
 CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL", os.environ.get("REDIS_URL", "redis://127.0.0.1:6379/0"))
 CELERY_RESULT_BACKEND = os.environ.get("CELERY_RESULT_BACKEND", CELERY_BROKER_URL)
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 60 * 30
 CELERY_TIMEZONE = TIME_ZONE
+# Optional Celery queue per report pipeline stage, e.g. PIPELINE_REPORT_QUEUE=ai; empty = default queue.
+PIPELINE_STAGE_QUEUES = {
+    stage: os.environ.get(f"PIPELINE_{stage.upper()}_QUEUE", "")
+    for stage in ("sync", "load", "summarize", "report", "push", "notify")
+}
 
 TEMP_LOGIN_USER = os.environ.get("TEMP_LOGIN_USER", "demo")
 TEMP_LOGIN_PASSWORD = os.environ.get("TEMP_LOGIN_PASSWORD", "demo")
@@ -0,0 +1,6 @@
+-- Content fingerprint of each synced deal row (sha256 of canonical JSON).
+-- The ETL compares it before upserting and skips rows whose content is unchanged,
+-- so unchanged deals no longer fire the updated_at trigger on every run.
+
+alter table if exists public.deals
+  add column if not exists content_hash text null;
@@ -0,0 +1,88 @@
+-- Report summary aggregates for one tenant and window, computed in the database so the
+-- pipeline no longer downloads every deal row just to count them.
+-- Called via PostgREST: POST /rest/v1/rpc/deals_window_summary.
+-- Mirrors _build_summary in server/core/pipeline.py: blank status/responsible count as 'unknown',
+-- only positive messages_count values count as dialogs/messages.
+
+-- Status/responsible as _build_summary counts them: trimmed like Python str.strip() (every
+-- character str.isspace() accepts, NBSP and the other Unicode spaces included, not just \s),
+-- 'unknown' when nothing is left. Re-run this file after changing it: all objects are replaced.
+create or replace function public.deals_summary_label(p_value text)
+returns text
+language sql
+immutable
+as $$
+  select coalesce(
+    nullif(
+      regexp_replace(
+        p_value,
+        '^[\u0009-\u000d\u001c-\u0020\u0085\u00a0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000]+'
+        '|[\u0009-\u000d\u001c-\u0020\u0085\u00a0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000]+$',
+        '',
+        'g'
+      ),
+      ''
+    ),
+    'unknown'
+  )
+$$;
+
+create or replace function public.deals_window_summary(
+  p_tenant_id text,
+  p_window_start timestamptz,
+  p_window_end timestamptz,
+  p_filter_field text default 'last_message_at',
+  p_min_messages integer default 0
+)
+returns jsonb
+language plpgsql
+stable
+as $$
+declare
+  result jsonb;
+begin
+  if p_filter_field not in ('last_message_at', 'updated_at') then
+    raise exception 'deals_window_summary: unsupported filter field %', p_filter_field;
+  end if;
+
+  with window_deals as (
+    select
+      public.deals_summary_label(d.status) as status,
+      public.deals_summary_label(d.responsible) as responsible,
+      d.messages_count
+    from public.deals d
+    where d.tenant_id = p_tenant_id
+      and d.messages_count >= p_min_messages
+      and (
+        (p_filter_field = 'last_message_at'
+          and d.last_message_at >= p_window_start and d.last_message_at < p_window_end)
+        or (p_filter_field = 'updated_at'
+          and d.updated_at >= p_window_start and d.updated_at < p_window_end)
+      )
+  )
+  select jsonb_build_object(
+    'total_deals', count(*),
+    'with_dialogs', count(*) filter (where messages_count > 0),
+    'total_messages', coalesce(sum(messages_count) filter (where messages_count > 0), 0),
+    'status_counts', coalesce(
+      (select jsonb_object_agg(s.status, s.n)
+       from (select status, count(*) as n from window_deals group by status) s),
+      '{}'::jsonb
+    ),
+    'responsible_counts', coalesce(
+      (select jsonb_object_agg(r.responsible, r.n)
+       from (select responsible, count(*) as n from window_deals group by responsible) r),
+      '{}'::jsonb
+    )
+  )
+  into result
+  from window_deals;
+
+  return result;
+end;
+$$;
+
+create index if not exists deals_updated_at_idx on public.deals (tenant_id, updated_at desc);
+
+-- Let PostgREST pick up the new function without a restart.
+notify pgrst, 'reload schema';
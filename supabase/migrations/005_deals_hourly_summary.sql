@@ -0,0 +1,91 @@
+-- Report summary aggregates per hour of a window, for the hourly rollups that weekly and monthly
+-- reports merge (server/core/rollups.py). Called via PostgREST: POST /rest/v1/rpc/deals_hourly_summary.
+-- Same rows and counting rules as deals_window_summary (004, which also defines deals_summary_label);
+-- buckets are UTC clock hours cut at the window edges (rollups.hour_buckets), buckets without deals
+-- are omitted.
+
+create or replace function public.deals_hourly_summary(
+  p_tenant_id text,
+  p_window_start timestamptz,
+  p_window_end timestamptz,
+  p_filter_field text default 'last_message_at',
+  p_min_messages integer default 0
+)
+returns jsonb
+language plpgsql
+stable
+as $$
+declare
+  result jsonb;
+begin
+  if p_filter_field not in ('last_message_at', 'updated_at') then
+    raise exception 'deals_hourly_summary: unsupported filter field %', p_filter_field;
+  end if;
+
+  with window_deals as (
+    select
+      greatest(
+        date_trunc('hour', (case when p_filter_field = 'last_message_at'
+                                 then d.last_message_at else d.updated_at end) at time zone 'UTC')
+          at time zone 'UTC',
+        p_window_start
+      ) as bucket_start,
+      public.deals_summary_label(d.status) as status,
+      public.deals_summary_label(d.responsible) as responsible,
+      d.messages_count
+    from public.deals d
+    where d.tenant_id = p_tenant_id
+      and d.messages_count >= p_min_messages
+      and (
+        (p_filter_field = 'last_message_at'
+          and d.last_message_at >= p_window_start and d.last_message_at < p_window_end)
+        or (p_filter_field = 'updated_at'
+          and d.updated_at >= p_window_start and d.updated_at < p_window_end)
+      )
+  ),
+  buckets as (
+    select
+      bucket_start,
+      count(*) as total_deals,
+      count(*) filter (where messages_count > 0) as with_dialogs,
+      coalesce(sum(messages_count) filter (where messages_count > 0), 0) as total_messages
+    from window_deals
+    group by bucket_start
+  ),
+  statuses as (
+    select bucket_start, jsonb_object_agg(status, n) as counts
+    from (select bucket_start, status, count(*) as n from window_deals group by bucket_start, status) s
+    group by bucket_start
+  ),
+  responsibles as (
+    select bucket_start, jsonb_object_agg(responsible, n) as counts
+    from (
+      select bucket_start, responsible, count(*) as n from window_deals group by bucket_start, responsible
+    ) r
+    group by bucket_start
+  )
+  select coalesce(
+    jsonb_agg(
+      jsonb_build_object(
+        'bucket_start', b.bucket_start,
+        'total_deals', b.total_deals,
+        'with_dialogs', b.with_dialogs,
+        'total_messages', b.total_messages,
+        'status_counts', s.counts,
+        'responsible_counts', r.counts
+      )
+      order by b.bucket_start
+    ),
+    '[]'::jsonb
+  )
+  into result
+  from buckets b
+  join statuses s using (bucket_start)
+  join responsibles r using (bucket_start);
+
+  return result;
+end;
+$$;
+
+-- Let PostgREST pick up the new function without a restart.
+notify pgrst, 'reload schema';